@@ -0,0 +1,110 @@
+"""Measure the hand-over latency of the combined worker's in-process queues.
+
+A location submitted to the Ingestor, built with the default ingestion
+settings the way combined.py builds it, travels through LocalQueues to the TAK
+worker, which hands it to a stand-in TAK output that records when it arrived.
+For comparison, the codec work the Redis queues add per location (encoding
+and decoding both the CoT event and the Signal message) is timed as well;
+the two Redis round-trips come on top of that.
+
+Run from the repository root:
+    PYTHONPATH=signal_bot python benchmarks/bench_combined.py
+"""
+
+import asyncio
+import time
+import timeit
+
+import combined
+import config
+import cot_formatter
+import local_queue
+import models
+import queue_codec
+import redis_client
+import tak_worker
+
+POINTS = 10_000
+
+
+class OutputStub:
+    """Just enough of TakClient for the TakWorker."""
+
+    servers = ["stub:0"]
+
+    def __init__(self):
+        self.received = 0
+        self.arrived = asyncio.Event()
+
+    async def submit_many(self, events):
+        self.received += len(events)
+        self.arrived.set()
+
+        return len(events)
+
+
+def make_points() -> list:
+    return [
+        models.GeoLocation(lat=40.7 + i * 1e-6, lon=-74.0, description="Tank")
+        for i in range(POINTS)
+    ]
+
+
+async def measure_latency(points: list) -> list:
+    queues = local_queue.LocalQueues(config.CombinedConfig())
+    output = OutputStub()
+    ingestor = combined.create_ingestor(queues, config.IngestConfig())
+    worker = asyncio.create_task(tak_worker.TakWorker(queues, output).run())
+    latencies = []
+
+    for point in points:
+        output.arrived.clear()
+        started = time.perf_counter()
+
+        await ingestor.submit([point])
+        await output.arrived.wait()
+
+        latencies.append(time.perf_counter() - started)
+        # Signal messages are not consumed here.
+        await queues.dequeue_many(redis_client.RedisClient.SIGNAL_QUEUE, max_wait=0)
+
+    worker.cancel()
+    await asyncio.gather(worker, return_exceptions=True)
+
+    return sorted(latencies)
+
+
+def measure_codec(points: list) -> float:
+    formatter = cot_formatter.CotFormatter()
+    codec = queue_codec.JsonCodec()
+
+    def round_trip():
+        for point in points:
+            event = formatter.create_event(point)
+            message = models.SignalMessage(geolocation=point)
+            codec.decode(models.CotEvent, codec.encode(event))
+            codec.decode(models.SignalMessage, codec.encode(message))
+
+    def create():
+        for point in points:
+            formatter.create_event(point)
+            models.SignalMessage(geolocation=point)
+
+    seconds = min(timeit.repeat(round_trip, number=1, repeat=3))
+    seconds -= min(timeit.repeat(create, number=1, repeat=3))
+
+    return seconds / len(points)
+
+
+def main():
+    points = make_points()
+    latencies = asyncio.run(measure_latency(points))
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[-len(latencies) // 100]
+
+    print(f"in-process ingest -> TAK  p50 {p50 * 1e6:6.1f} us  p99 {p99 * 1e6:6.1f} us")
+    print(f"redis codec passes        {measure_codec(points) * 1e6:6.1f} us per point")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Compare CoT serialization throughput of the ElementTree and template paths.
+
+Run from the repository root:
+    PYTHONPATH=signal_bot python benchmarks/bench_cot_formatter.py
+"""
+
+import datetime
+import timeit
+
+import cot_formatter
+import models
+
+EVENTS = 10_000
+
+
+def make_events(n: int) -> list:
+    formatter = cot_formatter.CotFormatter()
+    start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+    return [
+        formatter.create_event(
+            models.GeoLocation(
+                lat=40.7128 + i * 1e-5,
+                lon=-74.0060,
+                hae=100.0,
+                ce=10.0,
+                le=10.0,
+                timestamp=start + datetime.timedelta(milliseconds=i * 100),
+            )
+        )
+        for i in range(n)
+    ]
+
+
+def bench(serializer: str, events: list) -> float:
+    formatter = cot_formatter.CotFormatter(serializer)
+
+    seconds = min(
+        timeit.repeat(
+            lambda: [formatter.format_event(event) for event in events],
+            number=1,
+            repeat=5,
+        )
+    )
+
+    return len(events) / seconds
+
+
+def main():
+    events = make_events(EVENTS)
+
+    etree = bench(cot_formatter.CotFormatter.SERIALIZER_ETREE, events)
+    template = bench(cot_formatter.CotFormatter.SERIALIZER_TEMPLATE, events)
+
+    print(f"etree:    {etree:12,.0f} events/sec")
+    print(f"template: {template:12,.0f} events/sec ({template / etree:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
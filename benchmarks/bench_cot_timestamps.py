@@ -0,0 +1,51 @@
+"""Compare the per-event timestamp formatting cost of plain strftime calls
+with the cached CotFormatter path.
+
+Run from the repository root:
+    PYTHONPATH=signal_bot python benchmarks/bench_cot_timestamps.py
+"""
+
+import timeit
+
+import cot_formatter
+
+import bench_cot_formatter
+
+
+def strftime_times(event) -> tuple:
+    # What format_event did before caching: time, start, stale and flow tag.
+    return (
+        event.time.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+        event.start.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+        event.stale.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+        event.time.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+    )
+
+
+def main():
+    events = bench_cot_formatter.make_events(bench_cot_formatter.EVENTS)
+    formatter = cot_formatter.CotFormatter()
+
+    for event in events:
+        assert formatter._event_times(event) == strftime_times(event)[:3]
+
+    plain = min(
+        timeit.repeat(
+            lambda: [strftime_times(event) for event in events], number=1, repeat=5
+        )
+    )
+    cached = min(
+        timeit.repeat(
+            lambda: [formatter._event_times(event) for event in events],
+            number=1,
+            repeat=5,
+        )
+    )
+
+    per_event = 1_000_000 / len(events)
+    print(f"strftime: {plain * per_event:6.2f} us/event")
+    print(f"cached:   {cached * per_event:6.2f} us/event ({plain / cached:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
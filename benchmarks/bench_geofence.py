@@ -0,0 +1,64 @@
+"""Compare geofence lookups through the grid index with a linear scan.
+
+5000 hexagonal areas of 0.5 to 5 km are scattered over a 2 x 2 degree region
+and queried with random points in the same region.
+
+Run from the repository root:
+    PYTHONPATH=signal_bot python benchmarks/bench_geofence.py
+"""
+
+import math
+import random
+import timeit
+
+import geofence
+
+AREAS = 5_000
+QUERIES = 10_000
+
+
+def make_areas(rng: random.Random) -> list:
+    areas = []
+
+    for i in range(AREAS):
+        lat, lon = rng.uniform(40, 42), rng.uniform(-75, -73)
+        radius = rng.uniform(0.5, 5) / 111
+        ring = [
+            (
+                lat + radius * math.sin(k * math.pi / 3),
+                lon + radius * math.cos(k * math.pi / 3),
+            )
+            for k in range(6)
+        ]
+        areas.append(geofence.Area(f"area-{i}", polygons=[[ring]]))
+
+    return areas
+
+
+def main():
+    rng = random.Random(0)
+    areas = make_areas(rng)
+    points = [(rng.uniform(40, 42), rng.uniform(-75, -73)) for _ in range(QUERIES)]
+
+    for cell_size in (0.05, 0.1, 0.5):
+        index = geofence.GridIndex(cell_size)
+
+        for area in areas:
+            index.insert(area)
+
+        seconds = timeit.timeit(
+            lambda: [index.query(lat, lon) for lat, lon in points], number=1
+        )
+        print(f"grid {cell_size:<4}  {seconds / QUERIES * 1e6:8.2f} us/point")
+
+    seconds = timeit.timeit(
+        lambda: [
+            [area for area in areas if area.contains(lat, lon)] for lat, lon in points
+        ],
+        number=1,
+    )
+    print(f"linear     {seconds / QUERIES * 1e6:8.2f} us/point")
+
+
+if __name__ == "__main__":
+    main()
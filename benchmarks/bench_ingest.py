@@ -0,0 +1,95 @@
+"""Measure ingestion throughput of location reports.
+
+Parses text and NDJSON reports on their own, then streams text reports over
+loopback TCP into the ingestion server, with a stand-in Redis client that
+encodes every queued item with the binary codec.
+
+Run from the repository root:
+    PYTHONPATH=signal_bot python benchmarks/bench_ingest.py
+"""
+
+import asyncio
+import json
+import time
+import timeit
+
+import config
+import ingest
+import queue_codec
+
+LINES = 50_000
+
+
+class QueueStub:
+    """Just enough of RedisClient for the Ingestor."""
+
+    def __init__(self):
+        self.codec = queue_codec.BinaryCodec()
+        self.enqueued = 0
+        self.done = asyncio.Event()
+
+    async def enqueue_batches(self, batches):
+        for items in batches.values():
+            for item in items:
+                self.codec.encode(item)
+
+        self.enqueued += len(next(iter(batches.values())))
+
+        if self.enqueued >= LINES:
+            self.done.set()
+
+
+def make_lines() -> dict:
+    return {
+        "text": [
+            f"{-74.0 + i * 1e-6} {40.7 + i * 1e-6} unit-{i % 100}".encode()
+            for i in range(LINES)
+        ],
+        "ndjson": [
+            json.dumps(
+                {"lat": 40.7 + i * 1e-6, "lon": -74.0 + i * 1e-6, "description": "x"}
+            ).encode()
+            for i in range(LINES)
+        ],
+    }
+
+
+async def measure_tcp(lines: list) -> float:
+    redis = QueueStub()
+    cfg = config.IngestConfig(host="127.0.0.1", tcp_port=0, http_port=0)
+    ingestor = ingest.Ingestor(redis, cfg)
+    server = await asyncio.start_server(
+        ingest.IngestServer(ingestor, cfg)._handle_tcp, "127.0.0.1", 0
+    )
+    _, writer = await asyncio.open_connection(
+        "127.0.0.1", server.sockets[0].getsockname()[1]
+    )
+    payload = b"\n".join(lines) + b"\n"
+
+    started = time.perf_counter()
+
+    writer.write(payload)
+    await writer.drain()
+    writer.close()
+    await redis.done.wait()
+
+    elapsed = time.perf_counter() - started
+
+    server.close()
+
+    return LINES / elapsed
+
+
+def main():
+    for name, lines in make_lines().items():
+        seconds = timeit.timeit(
+            lambda: [ingest.parse_line(line) for line in lines], number=1
+        )
+        print(f"parse {name:<8} {LINES / seconds:9.0f} lines/s")
+
+    lines = make_lines()["text"]
+    print(f"tcp -> queues  {asyncio.run(measure_tcp(lines)):9.0f} lines/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Compare payload size and encode/decode cost of the queue codecs.
+
+Run from the repository root:
+    PYTHONPATH=signal_bot python benchmarks/bench_queue_codec.py
+"""
+
+import json
+import timeit
+
+import cot_formatter
+import models
+import queue_codec
+
+ITEMS = 10_000
+
+
+class LegacyJsonCodec(queue_codec.JsonCodec):
+    """The previous RedisClient decode path: json.loads() then model(**data)."""
+
+    def decode(self, model, payload):
+        return model(**json.loads(payload))
+
+
+def main():
+    formatter = cot_formatter.CotFormatter()
+    points = [
+        models.GeoLocation(lat=40.7128, lon=-74.0060, hae=10.0, description="Tank")
+        for _ in range(ITEMS)
+    ]
+    samples = {
+        "SignalMessage": [models.SignalMessage(geolocation=p) for p in points],
+        "CotEvent": [formatter.create_event(p) for p in points],
+    }
+    codecs = {
+        "json (loads)": LegacyJsonCodec(),
+        "json": queue_codec.JsonCodec(),
+        "binary": queue_codec.BinaryCodec(),
+    }
+
+    for name, items in samples.items():
+        model = type(items[0])
+        print(name)
+
+        for codec_name, codec in codecs.items():
+            payloads = [codec.encode(item) for item in items]
+            size = sum(map(len, payloads)) / ITEMS
+
+            encode = min(
+                timeit.repeat(
+                    lambda: [codec.encode(item) for item in items], number=1, repeat=3
+                )
+            )
+            decode = min(
+                timeit.repeat(
+                    lambda: [codec.decode(model, p) for p in payloads],
+                    number=1,
+                    repeat=3,
+                )
+            )
+
+            print(
+                f"  {codec_name:<17} {size:6.0f} bytes/item  "
+                f"encode {encode / ITEMS * 1e6:5.2f} us  "
+                f"decode {decode / ITEMS * 1e6:5.2f} us"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Compare memory and allocation cost of pydantic models and slotted records.
+
+Run from the repository root:
+    PYTHONPATH=signal_bot python benchmarks/bench_records.py
+"""
+
+import timeit
+import tracemalloc
+
+import cot_formatter
+import models
+import queue_codec
+import records
+
+ITEMS = 10_000
+
+
+def measure_memory(build):
+    tracemalloc.start()
+    items = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del items
+
+    return size
+
+
+def main():
+    formatter = cot_formatter.CotFormatter(
+        cot_formatter.CotFormatter.SERIALIZER_TEMPLATE
+    )
+    points = [
+        models.GeoLocation(lat=40.7128, lon=-74.0060, hae=10.0, description="Tank")
+        for _ in range(ITEMS)
+    ]
+    point_records = [records.GeoLocationRecord.from_model(p) for p in points]
+
+    builders = {
+        "create_event (model)": lambda: [formatter.create_event(p) for p in points],
+        "create_record (record)": lambda: [
+            formatter.create_record(p) for p in point_records
+        ],
+    }
+
+    print(f"Building {ITEMS} CoT events")
+
+    for name, build in builders.items():
+        elapsed = min(timeit.repeat(build, number=1, repeat=5))
+        size = measure_memory(build)
+
+        print(
+            f"  {name:<24} {elapsed / ITEMS * 1e6:5.2f} us/item  "
+            f"{size / ITEMS:6.0f} bytes/item"
+        )
+
+    print(f"Dequeue and format {ITEMS} CoT events")
+
+    for codec in (queue_codec.JsonCodec(), queue_codec.BinaryCodec()):
+        payloads = [codec.encode(formatter.create_event(p)) for p in points]
+        paths = {
+            "decode": lambda: [
+                formatter.format_event(codec.decode(models.CotEvent, p))
+                for p in payloads
+            ],
+            "decode_record": lambda: [
+                formatter.format_event(codec.decode_record(models.CotEvent, p))
+                for p in payloads
+            ],
+        }
+
+        for name, path in paths.items():
+            elapsed = min(timeit.repeat(path, number=1, repeat=3))
+
+            print(
+                f"  {type(codec).__name__ + '.' + name:<26} "
+                f"{elapsed / ITEMS * 1e6:5.2f} us/item"
+            )
+
+
+if __name__ == "__main__":
+    main()
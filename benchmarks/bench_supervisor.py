@@ -0,0 +1,75 @@
+"""Measure how CoT formatting throughput scales with supervised processes.
+
+Each supervised child formats CoT events in a loop, the CPU-bound part of
+the TAK worker, until the supervisor drains it. Throughput should grow close
+to linearly up to the number of cores.
+
+Run from the repository root:
+    PYTHONPATH=signal_bot python benchmarks/bench_supervisor.py
+"""
+
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+
+import bench_cot_formatter
+import config
+import cot_formatter
+import supervisor
+
+SECONDS = 3.0
+EVENTS = bench_cot_formatter.make_events(1000)
+# Inherited by the forked children.
+FORMATTED = multiprocessing.get_context("fork").Value("q", 0)
+
+
+async def format_until_drained():
+    stopping = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopping.set)
+    formatter = cot_formatter.CotFormatter()
+
+    while not stopping.is_set():
+        for event in EVENTS:
+            formatter.format_event(event)
+
+        with FORMATTED.get_lock():
+            FORMATTED.value += len(EVENTS)
+
+        await asyncio.sleep(0)
+
+
+def measure(processes: int) -> float:
+    cfg = config.SupervisorConfig(processes=processes, heartbeat_interval=0.1)
+    workers = supervisor.Supervisor(cfg, format_until_drained)
+    workers.start()
+
+    # Let every child start formatting.
+    time.sleep(0.5)
+
+    started, count = time.perf_counter(), FORMATTED.value
+    time.sleep(SECONDS)
+    elapsed, count = time.perf_counter() - started, FORMATTED.value - count
+
+    workers.stop()
+
+    return count / elapsed
+
+
+def main():
+    cores = os.cpu_count() or 1
+    baseline = None
+
+    for processes in sorted({1, 2, max(1, cores // 2), cores}):
+        throughput = measure(processes)
+        baseline = baseline or throughput
+
+        print(
+            f"{processes:3d} processes {throughput:10.0f} events/s  "
+            f"x{throughput / baseline:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Compare wire size and encode cost of XML CoT and TAK protobuf output.
+
+Run from the repository root:
+    PYTHONPATH=signal_bot python benchmarks/bench_tak_protobuf.py
+"""
+
+import timeit
+
+import cot_formatter
+import tak_protobuf
+
+import bench_cot_formatter
+
+EVENTS = bench_cot_formatter.EVENTS
+
+
+def main():
+    events = bench_cot_formatter.make_events(EVENTS)
+    formatters = {
+        "xml (etree)": cot_formatter.CotFormatter(
+            cot_formatter.CotFormatter.SERIALIZER_ETREE
+        ),
+        "xml (template)": cot_formatter.CotFormatter(
+            cot_formatter.CotFormatter.SERIALIZER_TEMPLATE
+        ),
+        "protobuf": tak_protobuf.TakProtobufFormatter(),
+    }
+
+    for name, formatter in formatters.items():
+        size = sum(len(formatter.format_event(event)) for event in events) / EVENTS
+        seconds = min(
+            timeit.repeat(
+                lambda: [formatter.format_event(event) for event in events],
+                number=1,
+                repeat=5,
+            )
+        )
+
+        print(
+            f"{name:<15} {size:6.0f} bytes/event  "
+            f"{seconds / EVENTS * 1e6:5.2f} us/event"
+        )
+
+
+if __name__ == "__main__":
+    main()
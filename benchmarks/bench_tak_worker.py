@@ -0,0 +1,158 @@
+"""Compare the PyTAK worker pipeline with the native TAK worker.
+
+Both workers read a stand-in Redis queue and write to a local TCP sink that
+counts received events. Throughput drains a backlog in batches; latency sends
+one event at a time and waits for the sink to receive it.
+
+Run from the repository root:
+    PYTHONPATH=signal_bot python benchmarks/bench_tak_worker.py
+"""
+
+import asyncio
+import logging
+import time
+import typing
+
+import config
+import pytak
+import pytak_client
+import tak_client
+import tak_worker
+
+import bench_cot_formatter
+
+EVENTS = bench_cot_formatter.EVENTS
+BATCH = 100
+LATENCY_SAMPLES = 500
+
+
+class QueueStub:
+    """Just enough of RedisClient for the workers, backed by asyncio.Queue."""
+
+    def __init__(self):
+        self.batches: asyncio.Queue = asyncio.Queue()
+
+    async def dequeue_many(self, queue, max_items=None, max_wait=None, trusted=False):
+        return await self.batches.get()
+
+    async def ack(self, model):
+        pass
+
+    async def ack_many(self, items):
+        pass
+
+    async def nack(self, model, requeue=True):
+        pass
+
+
+class Sink:
+    def __init__(self):
+        self.received = 0
+        self.changed = asyncio.Event()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        tail = b""
+
+        # Keep the end of each read so a marker split across reads is counted.
+        while data := await reader.read(1 << 16):
+            data = tail + data
+            self.received += data.count(b"</event>")
+            tail = data[-7:]
+            self.changed.set()
+
+        writer.close()
+
+    async def wait_for(self, count: int):
+        while self.received < count:
+            self.changed.clear()
+            await self.changed.wait()
+
+
+async def start_pytak(
+    redis: QueueStub, port: int
+) -> typing.Callable[[], typing.Awaitable[None]]:
+    cfg = {"COT_URL": f"tcp://127.0.0.1:{port}"}
+    tx_queue: asyncio.Queue = asyncio.Queue()
+    _, writer = await asyncio.open_connection("127.0.0.1", port)
+
+    tasks = [
+        asyncio.create_task(pytak_client.PytakWorker(tx_queue, cfg, redis).run()),
+        asyncio.create_task(pytak.TXWorker(tx_queue, cfg, writer).run()),
+    ]
+
+    async def stop():
+        await cancel(tasks)
+        writer.close()
+
+    return stop
+
+
+async def start_native(
+    redis: QueueStub, port: int
+) -> typing.Callable[[], typing.Awaitable[None]]:
+    client = tak_client.TakClient(
+        config.TakConfig(server_url="127.0.0.1", port=port, buffer_max_events=EVENTS)
+    )
+    await client.start()
+
+    tasks = [asyncio.create_task(tak_worker.TakWorker(redis, client).run())]
+
+    async def stop():
+        await cancel(tasks)
+        await client.stop()
+
+    return stop
+
+
+async def cancel(tasks: list):
+    for task in tasks:
+        task.cancel()
+
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def measure(start, events: list):
+    sink = Sink()
+    server = await asyncio.start_server(sink.handle, "127.0.0.1", 0)
+    redis = QueueStub()
+    stop = await start(redis, server.sockets[0].getsockname()[1])
+
+    started = time.perf_counter()
+
+    for i in range(0, len(events), BATCH):
+        redis.batches.put_nowait(events[i : i + BATCH])
+
+    await sink.wait_for(len(events))
+    throughput = len(events) / (time.perf_counter() - started)
+
+    latencies = []
+
+    for event in events[:LATENCY_SAMPLES]:
+        started = time.perf_counter()
+        redis.batches.put_nowait([event])
+        await sink.wait_for(sink.received + 1)
+        latencies.append(time.perf_counter() - started)
+
+    await stop()
+    server.close()
+
+    latencies.sort()
+
+    return throughput, latencies[len(latencies) // 2], latencies[-len(latencies) // 100]
+
+
+async def main():
+    logging.getLogger("pytak").setLevel(logging.WARNING)
+    events = bench_cot_formatter.make_events(EVENTS)
+
+    for name, start in (("pytak", start_pytak), ("native", start_native)):
+        throughput, p50, p99 = await measure(start, events)
+
+        print(
+            f"{name:<7} {throughput:9.0f} events/s  "
+            f"p50 {p50 * 1e6:6.1f} us  p99 {p99 * 1e6:6.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
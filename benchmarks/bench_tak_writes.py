@@ -0,0 +1,81 @@
+"""Compare per-event write/drain with the coalescing TAK flusher.
+
+Streams events to a local TCP sink that discards its input.
+
+Run from the repository root:
+    PYTHONPATH=signal_bot python benchmarks/bench_tak_writes.py
+"""
+
+import asyncio
+import time
+
+import config
+import tak_client
+
+import bench_cot_formatter
+
+EVENTS = bench_cot_formatter.EVENTS
+
+
+async def sink(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    while await reader.read(1 << 16):
+        pass
+
+    writer.close()
+
+
+async def per_event(cfg: config.TakConfig, points) -> float:
+    async with tak_client.TakClient(cfg) as client:
+        started = time.perf_counter()
+
+        for point in points:
+            await client.send_point(point)
+
+        return time.perf_counter() - started
+
+
+async def send_points(cfg: config.TakConfig, points) -> float:
+    async with tak_client.TakClient(cfg) as client:
+        started = time.perf_counter()
+
+        await client.send_points(points)
+
+        return time.perf_counter() - started
+
+
+async def flusher(cfg: config.TakConfig, points) -> float:
+    client = tak_client.TakClient(cfg)
+    events = [client._formatter.create_record(point) for point in points]
+
+    await client.start()
+    started = time.perf_counter()
+
+    for event in events:
+        await client.submit(event)
+
+    await client.stop(timeout=60)
+
+    return time.perf_counter() - started
+
+
+async def main():
+    server = await asyncio.start_server(sink, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    cfg = config.TakConfig(server_url="127.0.0.1", port=port, buffer_max_events=EVENTS)
+    points = [event.point for event in bench_cot_formatter.make_events(EVENTS)]
+
+    for name, run in (
+        ("write+drain per event", per_event),
+        ("send_points", send_points),
+        ("flusher", flusher),
+    ):
+        seconds = min([await run(cfg, points) for _ in range(5)])
+
+        print(f"{name:<22} {seconds / EVENTS * 1e6:6.2f} us/event")
+
+    server.close()
+    await server.wait_closed()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
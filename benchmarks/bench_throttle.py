@@ -0,0 +1,69 @@
+"""Measure how much a chatty feed is reduced by the position throttle.
+
+A simulated feed reports 100 entities at 10 Hz for a minute, each creeping
+along at walking speed with sub-meter GPS jitter.
+
+Run from the repository root:
+    PYTHONPATH=signal_bot python benchmarks/bench_throttle.py
+"""
+
+import asyncio
+import random
+import time
+
+import config
+import records
+import throttle
+
+ENTITIES = 100
+RATE_HZ = 10
+SECONDS = 60
+
+
+def make_feed() -> list:
+    rng = random.Random(0)
+    start = [
+        (40.7 + rng.uniform(0, 0.1), -74.0 + rng.uniform(0, 0.1))
+        for _ in range(ENTITIES)
+    ]
+    feed = []
+
+    for tick in range(SECONDS * RATE_HZ):
+        for uid, (lat, lon) in enumerate(start):
+            # About 1.4 m/s north plus up to half a meter of jitter.
+            lat += tick / RATE_HZ * 1.4 / 111_000 + rng.uniform(-4.5e-6, 4.5e-6)
+            lon += rng.uniform(-4.5e-6, 4.5e-6)
+            feed.append(
+                (
+                    tick / RATE_HZ,
+                    records.GeoLocationRecord(
+                        lat, lon, None, None, None, f"unit-{uid}", None
+                    ),
+                )
+            )
+
+    return feed
+
+
+async def main():
+    feed = make_feed()
+    now = 0.0
+    positions = throttle.PositionThrottle(config.ThrottleConfig(), clock=lambda: now)
+    sent = 0
+
+    started = time.perf_counter()
+
+    for now, point in feed:
+        sent += len(await positions.filter([point]))
+        sent += len(await positions.pop_due())
+
+    elapsed = time.perf_counter() - started
+
+    print(f"reports  {len(feed):8d}")
+    print(f"sent     {sent:8d}  ({len(feed) / sent:.1f}x fewer)")
+    print(f"cost     {elapsed / len(feed) * 1e6:8.2f} us/report")
+    print(positions.stats)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
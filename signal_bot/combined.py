@@ -0,0 +1,99 @@
+import asyncio
+import dataclasses
+import logging
+import typing
+
+import config
+import geofence
+import ingest
+import local_queue
+import redis_client
+import signal_client
+import signal_receiver
+import tak_worker
+import throttle
+
+
+def create_ingestor(
+    queues: local_queue.LocalQueues,
+    cfg: config.IngestConfig,
+    positions: typing.Optional[throttle.PositionThrottle] = None,
+) -> ingest.Ingestor:
+    """Build an Ingestor that hands every submitted chunk over at once.
+
+    Batching only saves Redis round-trips, so in-process the points of each
+    received chunk go straight to the queues instead of waiting for
+    batch_size or the flush interval. The flusher is still needed to
+    release throttled points.
+    """
+    return ingest.Ingestor(queues, dataclasses.replace(cfg, batch_size=1), positions)
+
+
+async def main():
+    cfg = config.load_config()
+    logger = logging.getLogger(__name__)
+
+    spill: typing.Optional[redis_client.RedisClient] = None
+
+    if cfg.combined.redis:
+        spill = redis_client.create_client(cfg.redis)
+
+        await spill.connect()
+
+    queues = local_queue.LocalQueues(cfg.combined, spill)
+    output = tak_worker.create_output(cfg.tak)
+    positions = (
+        throttle.PositionThrottle(cfg.throttle, spill) if cfg.throttle.enabled else None
+    )
+    ingestor = create_ingestor(queues, cfg.ingest, positions)
+    server = ingest.IngestServer(ingestor, cfg.ingest)
+    tasks: typing.List[asyncio.Task] = []
+
+    await output.start()
+
+    try:
+        router = await geofence.create_router(cfg.geofence, spill)
+
+        await server.start()
+
+        tasks += [
+            asyncio.create_task(ingestor.run_flusher()),
+            asyncio.create_task(tak_worker.TakWorker(queues, output, router).run()),
+            asyncio.create_task(signal_client.run_sender(cfg.signal, queues, router)),
+        ]
+
+        if cfg.combined.signal_receiver:
+            receiver = signal_receiver.SignalReceiver(cfg.signal, queues, positions)
+            tasks.append(asyncio.create_task(receiver.run()))
+
+        if spill is not None and spill.is_reliable:
+            tasks += [
+                asyncio.create_task(spill.run_reaper(queue))
+                for queue in redis_client.RedisClient.QUEUE_MODELS
+            ]
+
+        logger.info(f"Combined worker running {len(tasks)} tasks")
+
+        # Any task ending means a failure; the rest run until cancelled.
+        await asyncio.gather(*tasks)
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        await server.stop()
+
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await ingestor.flush()
+        await queues.close()
+        await output.stop()
+
+        if spill is not None:
+            await spill.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,5 +1,6 @@
 import dataclasses
 import os
+import socket
 import typing
 
 import dotenv
@@ -13,6 +14,17 @@ class SignalConfig:
     api_url: str
     recipients: typing.List[str]
     max_reconnect_attempts: int = 3
+    pool_limit_per_host: int = 10
+    keepalive_timeout: float = 30.0
+    dns_cache_ttl: int = 300
+    pool_stats_interval: float = 300.0
+    max_in_flight: int = 8
+    coalesce_window_ms: int = 0
+    coalesce_max_reports: int = 10
+    coalesce_max_chars: int = 2000
+    receive_queue_size: int = 1000
+    receive_backoff_max: float = 30.0
+    receive_allowed_senders: typing.List[str] = dataclasses.field(default_factory=list)
 
 
 @dataclasses.dataclass
@@ -21,6 +33,28 @@ class TakConfig:
     port: int
     max_reconnect_attempts: int = 3
     connection_timeout: int = 10
+    cot_serializer: str = "template"
+    protocol: str = "xml"
+    reconnect_backoff_base: float = 1.0
+    reconnect_backoff_max: float = 60.0
+    buffer_max_events: int = 10_000
+    buffer_spill_path: typing.Optional[str] = None
+    buffer_spill_max_bytes: int = 64 * 1024 * 1024
+    backpressure_timeout: float = 5.0
+    flush_interval_ms: int = 0
+    flush_max_bytes: int = 64 * 1024
+    write_high_water: int = 256 * 1024
+    extra_servers: typing.List[str] = dataclasses.field(default_factory=list)
+    tls_cert_file: typing.Optional[str] = None
+    tls_key_file: typing.Optional[str] = None
+    tls_key_password: typing.Optional[str] = None
+    tls_ca_file: typing.Optional[str] = None
+    tls_verify_hostname: bool = True
+    udp_mtu: int = 1500
+    udp_ttl: int = 1
+    udp_interface: typing.Optional[str] = None
+    udp_max_bytes_per_second: int = 0
+    udp_pack_events: bool = False
 
 
 @dataclasses.dataclass
@@ -29,6 +63,62 @@ class RedisConfig:
     port: int
     db: int
     password: typing.Optional[str] = None
+    block_timeout: float = 5.0
+    batch_size: int = 100
+    reliable_queue: bool = False
+    visibility_timeout: float = 60.0
+    consumer_name: str = dataclasses.field(default_factory=socket.gethostname)
+    backend: str = "list"
+    consumer_group: str = "workers"
+    stream_maxlen: int = 100_000
+    codec: str = "json"
+
+
+@dataclasses.dataclass
+class ThrottleConfig:
+    enabled: bool = False
+    min_distance: float = 5.0
+    min_interval: float = 1.0
+    max_interval: float = 60.0
+    cache_size: int = 10_000
+    ttl: float = 600.0
+    shared: bool = False
+
+
+@dataclasses.dataclass
+class GeofenceConfig:
+    file: typing.Optional[str] = None
+    redis: bool = False
+    unmatched: str = "drop"
+    cell_size: float = 0.1
+
+
+@dataclasses.dataclass
+class IngestConfig:
+    host: str = "0.0.0.0"
+    tcp_port: int = 5555
+    http_port: int = 8000
+    batch_size: int = 500
+    flush_interval_ms: int = 50
+    max_line_bytes: int = 4096
+
+
+@dataclasses.dataclass
+class CombinedConfig:
+    queue_size: int = 10_000
+    batch_size: int = 100
+    block_timeout: float = 1.0
+    redis: bool = False
+    signal_receiver: bool = False
+
+
+@dataclasses.dataclass
+class SupervisorConfig:
+    processes: int = 1
+    heartbeat_interval: float = 1.0
+    heartbeat_timeout: float = 10.0
+    drain_timeout: float = 30.0
+    restart_backoff_max: float = 30.0
 
 
 @dataclasses.dataclass
@@ -38,6 +128,15 @@ class AppConfig:
     redis: RedisConfig
     log_level: str
     log_file: str
+    throttle: ThrottleConfig = dataclasses.field(default_factory=ThrottleConfig)
+    geofence: GeofenceConfig = dataclasses.field(default_factory=GeofenceConfig)
+    ingest: IngestConfig = dataclasses.field(default_factory=IngestConfig)
+    combined: CombinedConfig = dataclasses.field(default_factory=CombinedConfig)
+    supervisor: SupervisorConfig = dataclasses.field(default_factory=SupervisorConfig)
+
+
+def _parse_bool(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
 
 
 def load_config() -> AppConfig:
@@ -48,11 +147,68 @@ def load_config() -> AppConfig:
             phone_number=os.environ["SIGNAL_PHONE_NUMBER"],
             api_url=os.environ["SIGNAL_API_URL"],
             recipients=os.environ["SIGNAL_RECIPIENTS"].split(","),
+            pool_limit_per_host=int(os.environ.get("SIGNAL_POOL_LIMIT", "10")),
+            keepalive_timeout=float(os.environ.get("SIGNAL_KEEPALIVE_TIMEOUT", "30")),
+            dns_cache_ttl=int(os.environ.get("SIGNAL_DNS_CACHE_TTL", "300")),
+            pool_stats_interval=float(
+                os.environ.get("SIGNAL_POOL_STATS_INTERVAL", "300")
+            ),
+            max_in_flight=int(os.environ.get("SIGNAL_MAX_IN_FLIGHT", "8")),
+            coalesce_window_ms=int(os.environ.get("SIGNAL_COALESCE_WINDOW_MS", "0")),
+            coalesce_max_reports=int(
+                os.environ.get("SIGNAL_COALESCE_MAX_REPORTS", "10")
+            ),
+            coalesce_max_chars=int(os.environ.get("SIGNAL_COALESCE_MAX_CHARS", "2000")),
+            receive_queue_size=int(os.environ.get("SIGNAL_RECEIVE_QUEUE_SIZE", "1000")),
+            receive_backoff_max=float(
+                os.environ.get("SIGNAL_RECEIVE_BACKOFF_MAX", "30")
+            ),
+            receive_allowed_senders=[
+                sender
+                for sender in os.environ.get(
+                    "SIGNAL_RECEIVE_ALLOWED_SENDERS", ""
+                ).split(",")
+                if sender
+            ],
         )
 
         tak_config = TakConfig(
             server_url=os.environ["TAK_SERVER_URL"],
             port=int(os.environ["TAK_SERVER_PORT"]),
+            cot_serializer=os.environ.get("TAK_COT_SERIALIZER", "template"),
+            protocol=os.environ.get("TAK_PROTOCOL", "xml"),
+            reconnect_backoff_base=float(
+                os.environ.get("TAK_RECONNECT_BACKOFF_BASE", "1")
+            ),
+            reconnect_backoff_max=float(
+                os.environ.get("TAK_RECONNECT_BACKOFF_MAX", "60")
+            ),
+            buffer_max_events=int(os.environ.get("TAK_BUFFER_MAX_EVENTS", "10000")),
+            buffer_spill_path=os.environ.get("TAK_BUFFER_SPILL_PATH") or None,
+            buffer_spill_max_bytes=int(
+                os.environ.get("TAK_BUFFER_SPILL_MAX_BYTES", str(64 * 1024 * 1024))
+            ),
+            backpressure_timeout=float(os.environ.get("TAK_BACKPRESSURE_TIMEOUT", "5")),
+            flush_interval_ms=int(os.environ.get("TAK_FLUSH_INTERVAL_MS", "0")),
+            flush_max_bytes=int(os.environ.get("TAK_FLUSH_MAX_BYTES", "65536")),
+            write_high_water=int(os.environ.get("TAK_WRITE_HIGH_WATER", "262144")),
+            extra_servers=[
+                server
+                for server in os.environ.get("TAK_EXTRA_SERVERS", "").split(",")
+                if server
+            ],
+            tls_cert_file=os.environ.get("TAK_TLS_CERT_FILE") or None,
+            tls_key_file=os.environ.get("TAK_TLS_KEY_FILE") or None,
+            tls_key_password=os.environ.get("TAK_TLS_KEY_PASSWORD") or None,
+            tls_ca_file=os.environ.get("TAK_TLS_CA_FILE") or None,
+            tls_verify_hostname=_parse_bool(
+                os.environ.get("TAK_TLS_VERIFY_HOSTNAME", "true")
+            ),
+            udp_mtu=int(os.environ.get("TAK_UDP_MTU", "1500")),
+            udp_ttl=int(os.environ.get("TAK_UDP_TTL", "1")),
+            udp_interface=os.environ.get("TAK_UDP_INTERFACE") or None,
+            udp_max_bytes_per_second=int(os.environ.get("TAK_UDP_MAX_RATE", "0")),
+            udp_pack_events=_parse_bool(os.environ.get("TAK_UDP_PACK", "false")),
         )
 
         redis_config = RedisConfig(
@@ -60,6 +216,65 @@ def load_config() -> AppConfig:
             port=int(os.environ.get("REDIS_PORT", "6379")),
             password=os.environ.get("REDIS_PASSWORD"),
             db=int(os.environ.get("REDIS_DB", "0")),
+            block_timeout=float(os.environ.get("REDIS_BLOCK_TIMEOUT", "5")),
+            batch_size=int(os.environ.get("REDIS_BATCH_SIZE", "100")),
+            reliable_queue=_parse_bool(os.environ.get("REDIS_RELIABLE_QUEUE", "false")),
+            visibility_timeout=float(os.environ.get("REDIS_VISIBILITY_TIMEOUT", "60")),
+            consumer_name=os.environ.get("REDIS_CONSUMER_NAME", socket.gethostname()),
+            backend=os.environ.get("REDIS_BACKEND", "list"),
+            consumer_group=os.environ.get("REDIS_CONSUMER_GROUP", "workers"),
+            stream_maxlen=int(os.environ.get("REDIS_STREAM_MAXLEN", "100000")),
+            codec=os.environ.get("REDIS_CODEC", "json"),
+        )
+
+        throttle_config = ThrottleConfig(
+            enabled=_parse_bool(os.environ.get("THROTTLE_ENABLED", "false")),
+            min_distance=float(os.environ.get("THROTTLE_MIN_DISTANCE", "5")),
+            min_interval=float(os.environ.get("THROTTLE_MIN_INTERVAL", "1")),
+            max_interval=float(os.environ.get("THROTTLE_MAX_INTERVAL", "60")),
+            cache_size=int(os.environ.get("THROTTLE_CACHE_SIZE", "10000")),
+            ttl=float(os.environ.get("THROTTLE_TTL", "600")),
+            shared=_parse_bool(os.environ.get("THROTTLE_SHARED", "false")),
+        )
+
+        geofence_config = GeofenceConfig(
+            file=os.environ.get("GEOFENCE_FILE") or None,
+            redis=_parse_bool(os.environ.get("GEOFENCE_REDIS", "false")),
+            unmatched=os.environ.get("GEOFENCE_UNMATCHED", "drop"),
+            cell_size=float(os.environ.get("GEOFENCE_CELL_SIZE", "0.1")),
+        )
+
+        ingest_config = IngestConfig(
+            host=os.environ.get("INGEST_HOST", "0.0.0.0"),
+            tcp_port=int(os.environ.get("INGEST_TCP_PORT", "5555")),
+            http_port=int(os.environ.get("INGEST_HTTP_PORT", "8000")),
+            batch_size=int(os.environ.get("INGEST_BATCH_SIZE", "500")),
+            flush_interval_ms=int(os.environ.get("INGEST_FLUSH_INTERVAL_MS", "50")),
+            max_line_bytes=int(os.environ.get("INGEST_MAX_LINE_BYTES", "4096")),
+        )
+
+        combined_config = CombinedConfig(
+            queue_size=int(os.environ.get("COMBINED_QUEUE_SIZE", "10000")),
+            batch_size=int(os.environ.get("COMBINED_BATCH_SIZE", "100")),
+            block_timeout=float(os.environ.get("COMBINED_BLOCK_TIMEOUT", "1")),
+            redis=_parse_bool(os.environ.get("COMBINED_REDIS", "false")),
+            signal_receiver=_parse_bool(
+                os.environ.get("COMBINED_SIGNAL_RECEIVER", "false")
+            ),
+        )
+
+        supervisor_config = SupervisorConfig(
+            processes=int(os.environ.get("SUPERVISOR_PROCESSES", "1")),
+            heartbeat_interval=float(
+                os.environ.get("SUPERVISOR_HEARTBEAT_INTERVAL", "1")
+            ),
+            heartbeat_timeout=float(
+                os.environ.get("SUPERVISOR_HEARTBEAT_TIMEOUT", "10")
+            ),
+            drain_timeout=float(os.environ.get("SUPERVISOR_DRAIN_TIMEOUT", "30")),
+            restart_backoff_max=float(
+                os.environ.get("SUPERVISOR_RESTART_BACKOFF_MAX", "30")
+            ),
         )
 
         return AppConfig(
@@ -68,6 +283,11 @@ def load_config() -> AppConfig:
             redis=redis_config,
             log_level=os.environ.get("LOG_LEVEL", "INFO"),
             log_file=os.environ.get("LOG_FILE", "./logs/app.log"),
+            throttle=throttle_config,
+            geofence=geofence_config,
+            ingest=ingest_config,
+            combined=combined_config,
+            supervisor=supervisor_config,
         )
 
     except KeyError as e:
@@ -1,8 +1,16 @@
 import xml.etree.ElementTree as ET
 import datetime
+import os
+import time
+import typing
 import uuid
 
+import exceptions
 import models
+import records
+
+CotEventLike = typing.Union[models.CotEvent, records.CotEventRecord]
+GeoLocationLike = typing.Union[models.GeoLocation, records.GeoLocationRecord]
 
 
 class CotFormatter:
@@ -23,27 +31,47 @@ class CotFormatter:
     )
     DEFAULT_HOST_ID = "signal-bot"
     UUID_PREFIX = "signal:atak:bot"
+    DATETIME_CACHE_SIZE = 4096
+    SERIALIZER_ETREE = "etree"
+    SERIALIZER_TEMPLATE = "template"
+    # Mirrors ET.tostring() output byte for byte, attribute order included.
+    EVENT_TEMPLATE = (
+        '<event version="2.0" type="%s" uid="%s" how="%s" time="%s" start="%s" '
+        'stale="%s"><point lat="%s" lon="%s" le="%s" hae="%s" ce="%s" />'
+        "<detail><_flow-tags_ " + DEFAULT_HOST_ID + '-v1="%s" /></detail></event>'
+    )
+
+    def __init__(self, serializer: str = SERIALIZER_ETREE):
+        """Initialize CoT formatter
+
+        Args:
+            serializer: "etree" builds the XML with ElementTree, "template"
+                fills a precompiled template and produces identical bytes at
+                a fraction of the cost.
+        """
+        if serializer not in (self.SERIALIZER_ETREE, self.SERIALIZER_TEMPLATE):
+            raise ValueError(f"Unknown CoT serializer: {serializer}")
+
+        self._serializer = serializer
+        self._second_prefixes: typing.Dict[typing.Tuple[int, ...], str] = {}
 
-    def __init__(self):
-        """Initialize CoT formatter"""
+    def format_event(self, event: CotEventLike) -> bytes:
+        """Format CoT event or record into XML bytes"""
 
-    def format_event(self, event: models.CotEvent) -> bytes:
-        """Format CoT event into XML bytes"""
+        if self._serializer == self.SERIALIZER_TEMPLATE:
+            return self._format_event_template(event)
 
-        lat = str(event.point.lat or "0.0")
-        lon = str(event.point.lon or "0.0")
-        ce = str(event.point.ce or "9999999.0")
-        hae = str(event.point.hae or "9999999.0")
-        le = str(event.point.le or "9999999.0")
+        lat, lon, ce, hae, le = self._point_values(event.point)
+        time, start, stale = self._event_times(event)
 
         xml = ET.Element("event")
         xml.set("version", "2.0")
         xml.set("type", event.event_type)
         xml.set("uid", event.event_id)
         xml.set("how", event.how)
-        xml.set("time", self._format_datetime(event.time))
-        xml.set("start", self._format_datetime(event.start))
-        xml.set("stale", self._format_datetime(event.stale))
+        xml.set("time", time)
+        xml.set("start", start)
+        xml.set("stale", stale)
 
         point = ET.Element("point")
         point.set("lat", lat)
@@ -54,7 +82,7 @@ class CotFormatter:
 
         flow_tags = ET.Element("_flow-tags_")
         _ft_tag: str = f"{self.DEFAULT_HOST_ID}-v1"
-        flow_tags.set(_ft_tag, self._format_datetime(event.time))
+        flow_tags.set(_ft_tag, time)
 
         detail = ET.Element("detail")
         detail.append(flow_tags)
@@ -81,14 +109,273 @@ class CotFormatter:
             point=point,
         )
 
+    def create_record(
+        self,
+        point: GeoLocationLike,
+        event_type: str = "default",
+        how: str = "default",
+        stale_minutes: int = 2,
+    ) -> records.CotEventRecord:
+        """Build the same event as create_event() without revalidating point.
+
+        The point is stored as given, so callers must only pass locations that
+        were already validated at the ingestion boundary.
+        """
+        return records.CotEventRecord(
+            self.UUID_PREFIX + str(uuid.uuid4()),
+            self._get_event_type(event_type),
+            point.timestamp,
+            point.timestamp,
+            point.timestamp + datetime.timedelta(minutes=stale_minutes),
+            self._get_how_value(how),
+            point,
+            "pending",
+        )
+
+    def format_batch(
+        self,
+        lat: typing.Sequence[float],
+        lon: typing.Sequence[float],
+        timestamps: typing.Sequence[float],
+        hae: typing.Optional[typing.Sequence[float]] = None,
+        ce: typing.Optional[typing.Sequence[float]] = None,
+        le: typing.Optional[typing.Sequence[float]] = None,
+        event_type: str = "default",
+        how: str = "default",
+        stale_minutes: int = 2,
+    ) -> bytes:
+        """Format columnar points into one concatenated buffer of CoT events.
+
+        Each event is identical to format_event(create_event(...)) for the same
+        point, apart from the random uid, but no models are built and work is
+        shared across the batch: one range check per column, the date part of
+        a timestamp rendered once per distinct second and all uids drawn from
+        one urandom call. This is plain Python looping over the values, not
+        vectorized array code, as NumPy is not a dependency.
+
+        Args:
+            lat: Latitudes in degrees.
+            lon: Longitudes in degrees.
+            timestamps: UTC POSIX timestamps in seconds.
+            hae: Optional heights above ellipsoid.
+            ce: Optional circular errors.
+            le: Optional linear errors.
+            event_type: Key of EVENT_TYPES applied to every event.
+            how: Key of HOW_VALUES applied to every event.
+            stale_minutes: Minutes until each event goes stale.
+
+        Columns may be lists, array.array buffers or NumPy arrays alike.
+
+        Raises:
+            MessageValidationError: If column lengths differ or a coordinate is
+                out of range.
+        """
+        count = len(lat)
+        columns = {"lon": lon, "timestamps": timestamps, "hae": hae, "ce": ce, "le": le}
+
+        for name, column in columns.items():
+            if column is not None and len(column) != count:
+                raise exceptions.MessageValidationError(
+                    f"Column {name} has {len(column)} values, expected {count}"
+                )
+
+        if not count:
+            return b""
+
+        self._check_range("lat", lat, 90)
+        self._check_range("lon", lon, 180)
+
+        missing = ("9999999.0",) * count
+        head = _EVENT_HEAD % (
+            self._get_event_type(event_type),
+            self.UUID_PREFIX,
+        )
+        how_value = self._get_how_value(how)
+        stale_seconds = stale_minutes * 60
+
+        xml = [
+            head
+            + _EVENT_BODY
+            % (
+                uid,
+                how_value,
+                timestamp,
+                timestamp,
+                stale,
+                str(float(lat_value) or "0.0"),
+                str(float(lon_value) or "0.0"),
+                le_value,
+                hae_value,
+                ce_value,
+                timestamp,
+            )
+            for uid, timestamp, stale, lat_value, lon_value, le_value, hae_value, ce_value in zip(
+                _uuid4_batch(count),
+                _format_timestamps(timestamps),
+                _format_timestamps(ts + stale_seconds for ts in timestamps),
+                lat,
+                lon,
+                _optional_column(le) or missing,
+                _optional_column(hae) or missing,
+                _optional_column(ce) or missing,
+            )
+        ]
+
+        return "".join(xml).encode("ascii", "xmlcharrefreplace")
+
+    def _format_event_template(self, event: CotEventLike) -> bytes:
+        lat, lon, ce, hae, le = self._point_values(event.point)
+        time, start, stale = self._event_times(event)
+
+        xml = self.EVENT_TEMPLATE % (
+            _escape_attrib(event.event_type),
+            _escape_attrib(event.event_id),
+            _escape_attrib(event.how),
+            time,
+            start,
+            stale,
+            lat,
+            lon,
+            le,
+            hae,
+            ce,
+            time,
+        )
+
+        # ET.tostring() defaults to us-ascii with character references.
+        return b"\n".join(
+            [
+                self.DEFAULT_XML_DECLARATION,
+                xml.encode("ascii", "xmlcharrefreplace"),
+            ]
+        )
+
+    @staticmethod
+    def _point_values(point: GeoLocationLike) -> typing.Tuple[str, ...]:
+        return (
+            str(point.lat or "0.0"),
+            str(point.lon or "0.0"),
+            str(point.ce or "9999999.0"),
+            str(point.hae or "9999999.0"),
+            str(point.le or "9999999.0"),
+        )
+
+    @staticmethod
+    def _check_range(name: str, column: typing.Sequence[float], limit: float):
+        # sum() propagates NaN, which min()/max() may silently skip.
+        total = sum(column)
+
+        if total != total or min(column) < -limit or max(column) > limit:
+            raise exceptions.MessageValidationError(
+                f"Column {name} has values outside [-{limit}, {limit}]"
+            )
+
     def _get_event_type(self, type_key: str) -> str:
         return self.EVENT_TYPES.get(type_key, self.EVENT_TYPES["default"])
 
     def _get_how_value(self, how_key: str) -> str:
         return self.HOW_VALUES.get(how_key, self.HOW_VALUES["default"])
 
+    def _event_times(self, event: CotEventLike) -> typing.Tuple[str, str, str]:
+        time = self._format_datetime(event.time)
+        # create_event always sets start to time, so skip formatting it twice.
+        start = (
+            time if event.start == event.time else self._format_datetime(event.start)
+        )
+
+        return time, start, self._format_datetime(event.stale)
+
     def _format_datetime(self, dt: datetime.datetime) -> str:
-        return dt.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        # strftime dominates formatting cost, so the part up to the seconds is
+        # rendered once per distinct second and only microseconds per call.
+        key = (dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second)
+
+        if (prefix := self._second_prefixes.get(key)) is None:
+            if len(self._second_prefixes) >= self.DATETIME_CACHE_SIZE:
+                self._second_prefixes.clear()
+
+            prefix = self._second_prefixes[key] = dt.strftime("%Y-%m-%dT%H:%M:%S.")
+
+        return f"{prefix}{dt.microsecond:06d}Z"
+
+
+# EVENT_TEMPLATE split so that the constant type and uid prefix of a batch are
+# rendered once; the leading declaration reproduces format_event's framing.
+_EVENT_HEAD = (
+    CotFormatter.DEFAULT_XML_DECLARATION.decode()
+    + '\n<event version="2.0" type="%s" uid="%s'
+)
+_EVENT_BODY = CotFormatter.EVENT_TEMPLATE[
+    CotFormatter.EVENT_TEMPLATE.index('uid="%s"') + len('uid="') :
+]
+
+
+def _format_timestamps(timestamps: typing.Iterable[float]) -> typing.List[str]:
+    # Points in a batch mostly share their second, so the date part is rendered
+    # once per distinct second and only the microseconds per point.
+    prefixes: typing.Dict[int, str] = {}
+    formatted = []
+
+    for ts in timestamps:
+        second, micro = divmod(round(float(ts) * 1_000_000), 1_000_000)
+
+        if (prefix := prefixes.get(second)) is None:
+            prefix = prefixes[second] = time.strftime(
+                "%Y-%m-%dT%H:%M:%S.", time.gmtime(second)
+            )
+
+        formatted.append(f"{prefix}{micro:06d}Z")
+
+    return formatted
+
+
+def _uuid4_batch(count: int) -> typing.List[str]:
+    # One urandom call for the whole batch; version and variant bits are set
+    # on the hex digits exactly as uuid.uuid4() would.
+    digits = os.urandom(16 * count).hex()
+    uids = []
+
+    for offset in range(0, 32 * count, 32):
+        h = digits[offset : offset + 32]
+
+        uids.append(
+            f"{h[0:8]}-{h[8:12]}-4{h[13:16]}-"
+            f"{_UUID_VARIANT[h[16]]}{h[17:20]}-{h[20:32]}"
+        )
+
+    return uids
+
+
+_UUID_VARIANT = {digit: "89ab"[int(digit, 16) & 0x3] for digit in "0123456789abcdef"}
+
+
+def _optional_column(
+    column: typing.Optional[typing.Sequence[float]],
+) -> typing.Optional[typing.List[str]]:
+    if column is None:
+        return None
+
+    return [str(float(value) or "9999999.0") for value in column]
+
+
+def _escape_attrib(text: str) -> str:
+    # Same replacements, in the same order, as ElementTree's attribute escaping.
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    if '"' in text:
+        text = text.replace('"', "&quot;")
+    if "\r" in text:
+        text = text.replace("\r", "&#13;")
+    if "\n" in text:
+        text = text.replace("\n", "&#10;")
+    if "\t" in text:
+        text = text.replace("\t", "&#09;")
+
+    return text
 
 
 if __name__ == "__main__":
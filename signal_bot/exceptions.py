@@ -20,3 +20,7 @@ class RedisError(SignalBotError):
 
 class MessageValidationError(SignalBotError):
     pass
+
+
+class TakBackpressureError(TakClientError):
+    pass
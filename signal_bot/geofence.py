@@ -0,0 +1,324 @@
+import collections
+import dataclasses
+import functools
+import json
+import logging
+import math
+import typing
+
+import config
+import exceptions
+import models
+import records
+import throttle
+
+if typing.TYPE_CHECKING:
+    import redis_client
+
+Point = typing.Union[models.GeoLocation, records.GeoLocationRecord]
+Ring = typing.List[typing.Tuple[float, float]]
+
+METERS_PER_DEGREE = throttle.EARTH_RADIUS_M * math.pi / 180
+
+UNMATCHED_DROP = "drop"
+UNMATCHED_ALL = "all"
+
+
+@dataclasses.dataclass
+class Area:
+    """Area of interest with the subscribers of points inside it.
+
+    The shape is either polygons, given as (lat, lon) rings where the first
+    ring of each polygon is its outline and the rest are holes, or a circle
+    of radius meters around center.
+
+    tak_servers lists the TAK servers, as "host:port", that receive points in
+    the area; None means every configured server.
+    """
+
+    name: str
+    recipients: typing.List[str] = dataclasses.field(default_factory=list)
+    tak_servers: typing.Optional[typing.List[str]] = None
+    polygons: typing.List[typing.List[Ring]] = dataclasses.field(default_factory=list)
+    center: typing.Optional[typing.Tuple[float, float]] = None
+    radius: float = 0.0
+
+    @functools.cached_property
+    def bounds(self) -> typing.Tuple[float, float, float, float]:
+        """(min lat, min lon, max lat, max lon) of the area."""
+        if self.center is not None:
+            lat, lon = self.center
+            dlat = self.radius / METERS_PER_DEGREE
+            dlon = dlat / max(math.cos(math.radians(lat)), 1e-6)
+
+            return lat - dlat, lon - dlon, lat + dlat, lon + dlon
+
+        outlines = [polygon[0] for polygon in self.polygons]
+        lats = [lat for ring in outlines for lat, _ in ring]
+        lons = [lon for ring in outlines for _, lon in ring]
+
+        return min(lats), min(lons), max(lats), max(lons)
+
+    def contains(self, lat: float, lon: float) -> bool:
+        min_lat, min_lon, max_lat, max_lon = self.bounds
+
+        if not (min_lat <= lat <= max_lat and min_lon <= lon <= max_lon):
+            return False
+
+        if self.center is not None:
+            return (
+                throttle.distance(self.center[0], self.center[1], lat, lon)
+                <= self.radius
+            )
+
+        return any(
+            _in_ring(polygon[0], lat, lon)
+            and not any(_in_ring(hole, lat, lon) for hole in polygon[1:])
+            for polygon in self.polygons
+        )
+
+    def to_feature(self) -> dict:
+        """GeoJSON Feature of the area, as read by area_from_feature()."""
+        properties: dict = {"name": self.name, "recipients": self.recipients}
+        properties["tak"] = True if self.tak_servers is None else self.tak_servers
+
+        if self.center is not None:
+            properties["radius"] = self.radius
+            geometry = {
+                "type": "Point",
+                "coordinates": [self.center[1], self.center[0]],
+            }
+
+        else:
+            geometry = {
+                "type": "MultiPolygon",
+                "coordinates": [
+                    [[[lon, lat] for lat, lon in ring] for ring in polygon]
+                    for polygon in self.polygons
+                ],
+            }
+
+        return {"type": "Feature", "geometry": geometry, "properties": properties}
+
+
+def area_from_feature(feature: dict) -> Area:
+    """Build an area from a GeoJSON Feature.
+
+    Polygon and MultiPolygon geometries are used as they are, a Point needs a
+    "radius" property in meters. Properties: "name", "recipients" (Signal
+    numbers, none by default) and "tak" (true for every TAK server, the
+    default, false for none, or a list of "host:port").
+
+    Raises:
+        ConfigurationError: If the feature is not a supported area.
+    """
+    try:
+        geometry = feature["geometry"]
+        properties = feature.get("properties") or {}
+        name = str(properties.get("name") or feature.get("id") or "")
+        tak = properties.get("tak", True)
+        area = Area(
+            name=name,
+            recipients=list(properties.get("recipients") or []),
+            tak_servers=None if tak is True else list(tak or []),
+        )
+
+        if geometry["type"] == "Point":
+            lon, lat = geometry["coordinates"][:2]
+            area.center = (float(lat), float(lon))
+            area.radius = float(properties["radius"])
+
+        elif geometry["type"] in ("Polygon", "MultiPolygon"):
+            polygons = geometry["coordinates"]
+
+            if geometry["type"] == "Polygon":
+                polygons = [polygons]
+
+            area.polygons = [
+                [[(float(lat), float(lon)) for lon, lat, *_ in ring] for ring in rings]
+                for rings in polygons
+            ]
+
+            if not area.polygons or any(len(p[0]) < 3 for p in area.polygons):
+                raise ValueError("polygon needs at least three points")
+
+        else:
+            raise ValueError(f"unsupported geometry {geometry['type']!r}")
+
+    except (KeyError, TypeError, ValueError, IndexError) as e:
+        raise exceptions.ConfigurationError(
+            f"Invalid geofence area {feature.get('id') or ''}: {str(e)}"
+        ) from e
+
+    return area
+
+
+def load_areas(path: str) -> typing.List[Area]:
+    """Read areas from a GeoJSON FeatureCollection file.
+
+    Raises:
+        ConfigurationError: If the file cannot be read or holds invalid areas.
+    """
+    try:
+        with open(path, encoding="utf-8") as file:
+            collection = json.load(file)
+
+    except (OSError, ValueError) as e:
+        raise exceptions.ConfigurationError(
+            f"Failed to read geofence file {path}: {str(e)}"
+        ) from e
+
+    return [area_from_feature(feature) for feature in collection.get("features", [])]
+
+
+class GridIndex:
+    def __init__(self, cell_size: float):
+        """In-memory spatial index of areas on a regular lat/lon grid.
+
+        Every area is listed in each cell its bounding box touches, so a
+        lookup reads one cell and runs the exact test only on the few areas
+        listed there.
+
+        Args:
+            cell_size: Cell edge in degrees.
+        """
+        self._cell_size = cell_size
+        self._cells: typing.DefaultDict[typing.Tuple[int, int], typing.List[Area]] = (
+            collections.defaultdict(list)
+        )
+        self._areas: typing.List[Area] = []
+
+    def __len__(self) -> int:
+        return len(self._areas)
+
+    def insert(self, area: Area):
+        min_lat, min_lon, max_lat, max_lon = area.bounds
+
+        for row in range(self._cell(min_lat), self._cell(max_lat) + 1):
+            for column in range(self._cell(min_lon), self._cell(max_lon) + 1):
+                self._cells[row, column].append(area)
+
+        self._areas.append(area)
+
+    def query(self, lat: float, lon: float) -> typing.List[Area]:
+        """Areas containing the point."""
+        candidates = self._cells.get((self._cell(lat), self._cell(lon)))
+
+        if not candidates:
+            return []
+
+        return [area for area in candidates if area.contains(lat, lon)]
+
+    def _cell(self, degrees: float) -> int:
+        return math.floor(degrees / self._cell_size)
+
+
+class GeofenceRouter:
+    def __init__(self, areas: typing.Iterable[Area], cfg: config.GeofenceConfig):
+        """Route points to the recipients and TAK servers subscribed to them.
+
+        Args:
+            areas: Areas of interest.
+            cfg: Geofence configuration; unmatched decides whether points
+                outside every area go to everyone ("all") or no one ("drop").
+
+        Raises:
+            ConfigurationError: If unmatched is not "all" or "drop".
+        """
+        if cfg.unmatched not in (UNMATCHED_ALL, UNMATCHED_DROP):
+            raise exceptions.ConfigurationError(
+                f"Unknown geofence unmatched policy {cfg.unmatched!r}, "
+                f"expected {UNMATCHED_ALL!r} or {UNMATCHED_DROP!r}"
+            )
+
+        self._index = GridIndex(cfg.cell_size)
+        self._unmatched_all = cfg.unmatched == UNMATCHED_ALL
+
+        for area in areas:
+            self._index.insert(area)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def match(self, point: Point) -> typing.List[Area]:
+        return self._index.query(point.lat, point.lon)
+
+    def recipients(self, point: Point) -> typing.Optional[typing.List[str]]:
+        """Signal recipients of the point, None for all configured ones."""
+        areas = self.match(point)
+
+        if not areas:
+            return None if self._unmatched_all else []
+
+        return sorted({number for area in areas for number in area.recipients})
+
+    def tak_servers(self, point: Point) -> typing.Optional[typing.FrozenSet[str]]:
+        """TAK servers receiving the point, None for all configured ones."""
+        areas = self.match(point)
+
+        if not areas:
+            return None if self._unmatched_all else frozenset()
+
+        if any(area.tak_servers is None for area in areas):
+            return None
+
+        return frozenset(server for area in areas for server in area.tak_servers)
+
+
+async def create_router(
+    cfg: config.GeofenceConfig, redis: typing.Optional["redis_client.RedisClient"]
+) -> typing.Optional[GeofenceRouter]:
+    """Build the router from the configured areas, None if geofencing is off.
+
+    Areas come from cfg.file; with cfg.redis they are also mirrored to Redis,
+    and processes without a file load the mirrored areas instead.
+
+    Raises:
+        ConfigurationError: If the areas cannot be loaded.
+        RedisError: If the Redis mirror cannot be read or written.
+    """
+    logger = logging.getLogger(__name__)
+
+    if cfg.file:
+        areas = load_areas(cfg.file)
+
+        if cfg.redis and redis is not None:
+            await redis.save_areas(
+                {area.name: area.to_feature() for area in areas},
+                {area.name: _center(area) for area in areas},
+            )
+
+    elif cfg.redis and redis is not None:
+        areas = [area_from_feature(f) for f in await redis.load_areas()]
+
+    else:
+        return None
+
+    logger.info(f"Loaded {len(areas)} geofence areas")
+
+    return GeofenceRouter(areas, cfg)
+
+
+def _center(area: Area) -> typing.Tuple[float, float]:
+    if area.center is not None:
+        return area.center
+
+    min_lat, min_lon, max_lat, max_lon = area.bounds
+
+    return (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+
+
+def _in_ring(ring: Ring, lat: float, lon: float) -> bool:
+    # Ray casting along the latitude; rings may be open or closed.
+    inside = False
+    lat1, lon1 = ring[-1]
+
+    for lat2, lon2 in ring:
+        if (lat1 > lat) != (lat2 > lat) and lon < (lon2 - lon1) * (lat - lat1) / (
+            lat2 - lat1
+        ) + lon1:
+            inside = not inside
+
+        lat1, lon1 = lat2, lon2
+
+    return inside
@@ -0,0 +1,344 @@
+import asyncio
+import dataclasses
+import logging
+import typing
+
+import aiohttp.web
+import pydantic
+
+import config
+import cot_formatter
+import exceptions
+import models
+import redis_client
+import throttle
+
+
+@dataclasses.dataclass
+class IngestStats:
+    received: int = 0
+    rejected: int = 0
+    enqueued: int = 0
+    batches: int = 0
+
+
+class LineSplitter:
+    def __init__(self, max_line_bytes: int):
+        """Split a byte stream into lines as chunks arrive.
+
+        Only the unterminated tail of a chunk is kept between feeds. Lines
+        longer than max_line_bytes are skipped up to their newline.
+
+        Args:
+            max_line_bytes: Longest accepted line, newline excluded.
+        """
+        self._max_line_bytes = max_line_bytes
+        self._tail = b""
+        self._skipping = False
+        self.oversized = 0
+
+    def feed(self, data: bytes) -> typing.List[bytes]:
+        """Complete lines in data, without their line endings."""
+        lines = (self._tail + data if self._tail else data).split(b"\n")
+        self._tail = lines.pop()
+
+        if self._skipping:
+            if not lines:
+                self._tail = b""
+
+                return []
+
+            # The rest of the oversized line, already counted.
+            lines.pop(0)
+            self._skipping = False
+
+        if len(self._tail) > self._max_line_bytes:
+            self.oversized += 1
+            self._tail = b""
+            self._skipping = True
+
+        kept = [line for line in lines if len(line) <= self._max_line_bytes]
+        self.oversized += len(lines) - len(kept)
+
+        return kept
+
+    def close(self) -> typing.List[bytes]:
+        """The last line if the stream did not end with a newline."""
+        tail, self._tail = self._tail, b""
+
+        return [tail] if tail and not self._skipping else []
+
+
+def parse_line(line: bytes) -> typing.Optional[models.GeoLocation]:
+    """Parse one report, None for a blank line.
+
+    Accepts the "<lon> <lat> <description>" text form of SignalMessage.content
+    and NDJSON objects with the GeoLocation fields. A description of
+    "Unknown", which content() renders for a missing one, reads back as None.
+
+    Raises:
+        MessageValidationError: If the line is not a valid location.
+    """
+    line = line.strip()
+
+    if not line:
+        return None
+
+    try:
+        if line[:1] == b"{":
+            return models.GeoLocation.model_validate_json(line)
+
+        fields = line.split(None, 2)
+
+        if len(fields) < 2:
+            raise ValueError("expected '<lon> <lat> <description>'")
+
+        description = fields[2].decode("utf-8") if len(fields) > 2 else None
+
+        return models.GeoLocation(
+            lat=float(fields[1]),
+            lon=float(fields[0]),
+            description=None if description == "Unknown" else description,
+        )
+
+    except (ValueError, pydantic.ValidationError) as e:
+        # ValidationError and UnicodeDecodeError are both ValueErrors.
+        raise exceptions.MessageValidationError(
+            f"Invalid location {line[:80]!r}: {str(e)}"
+        ) from e
+
+
+class Ingestor:
+    def __init__(
+        self,
+        redis: redis_client.RedisClient,
+        cfg: config.IngestConfig,
+        positions: typing.Optional[throttle.PositionThrottle] = None,
+    ):
+        """Batch validated locations into both queues.
+
+        Locations are collected until batch_size is reached or the flush
+        interval passes, then pushed as CoT events and Signal messages in one
+        pipelined round-trip. Producers wait while a full batch is flushed,
+        which pushes back on senders faster than Redis.
+
+        Args:
+            redis: Connected queue client.
+            cfg: Ingestion configuration parameters.
+            positions: Optional throttle applied before enqueueing.
+        """
+        self._redis = redis
+        self._cfg = cfg
+        self._positions = positions
+        self._formatter = cot_formatter.CotFormatter()
+        self._pending: typing.List[models.GeoLocation] = []
+        self._lock = asyncio.Lock()
+        self._logger = logging.getLogger(__name__)
+        self.stats = IngestStats()
+
+    async def submit(self, points: typing.Sequence[models.GeoLocation]):
+        self._pending.extend(points)
+        self.stats.received += len(points)
+
+        if len(self._pending) >= self._cfg.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        # The lock keeps batches in arrival order across connections.
+        async with self._lock:
+            points, self._pending = self._pending, []
+
+            if self._positions is not None:
+                points = await self._positions.filter(points)
+                points += await self._positions.pop_due()
+
+            if not points:
+                return
+
+            await self._redis.enqueue_batches(
+                {
+                    redis_client.RedisClient.TAK_QUEUE: [
+                        self._formatter.create_event(point) for point in points
+                    ],
+                    redis_client.RedisClient.SIGNAL_QUEUE: [
+                        models.SignalMessage(geolocation=point) for point in points
+                    ],
+                }
+            )
+
+            self.stats.enqueued += len(points)
+            self.stats.batches += 1
+
+    async def run_flusher(self):
+        """Flush partial batches every flush interval until cancelled."""
+        while True:
+            await asyncio.sleep(self._cfg.flush_interval_ms / 1000)
+
+            try:
+                await self.flush()
+
+            except exceptions.SignalBotError as e:
+                self._logger.error(f"Failed to flush ingested locations: {str(e)}")
+
+    async def ingest_lines(
+        self, lines: typing.Iterable[bytes], source: str
+    ) -> typing.Tuple[int, int]:
+        """Parse and submit lines.
+
+        Returns:
+            Numbers of accepted and rejected lines.
+        """
+        points = []
+        rejected = 0
+        error = None
+
+        for line in lines:
+            try:
+                point = parse_line(line)
+
+            except exceptions.MessageValidationError as e:
+                rejected += 1
+                error = e
+                continue
+
+            if point is not None:
+                points.append(point)
+
+        if rejected:
+            self.stats.rejected += rejected
+            self._logger.warning(f"Rejected {rejected} lines from {source}: {error}")
+
+        await self.submit(points)
+
+        return len(points), rejected
+
+
+class IngestServer:
+    def __init__(self, ingestor: Ingestor, cfg: config.IngestConfig):
+        """Accept location reports over raw TCP and HTTP.
+
+        TCP clients stream newline-separated reports. HTTP clients POST them
+        to /locations and get the accepted and rejected counts back. Either
+        listener is disabled by setting its port to 0.
+
+        Args:
+            ingestor: Ingestor to hand the parsed locations to.
+            cfg: Ingestion configuration parameters.
+        """
+        self._ingestor = ingestor
+        self._cfg = cfg
+        self._tcp_server: typing.Optional[asyncio.AbstractServer] = None
+        self._http_runner: typing.Optional[aiohttp.web.AppRunner] = None
+        self._logger = logging.getLogger(__name__)
+
+    async def start(self):
+        if self._cfg.tcp_port:
+            self._tcp_server = await asyncio.start_server(
+                self._handle_tcp, self._cfg.host, self._cfg.tcp_port
+            )
+            self._logger.info(
+                f"Accepting TCP location reports on {self._cfg.host}:"
+                f"{self._cfg.tcp_port}"
+            )
+
+        if self._cfg.http_port:
+            app = aiohttp.web.Application()
+            app.router.add_post("/locations", self._handle_http)
+
+            self._http_runner = aiohttp.web.AppRunner(app, access_log=None)
+            await self._http_runner.setup()
+            await aiohttp.web.TCPSite(
+                self._http_runner, self._cfg.host, self._cfg.http_port
+            ).start()
+            self._logger.info(
+                f"Accepting HTTP location reports on {self._cfg.host}:"
+                f"{self._cfg.http_port}/locations"
+            )
+
+    async def stop(self):
+        if self._tcp_server:
+            self._tcp_server.close()
+            await self._tcp_server.wait_closed()
+
+        if self._http_runner:
+            await self._http_runner.cleanup()
+
+    async def _handle_tcp(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        peer = writer.get_extra_info("peername")
+        source = f"{peer[0]}:{peer[1]}" if peer else "tcp"
+        splitter = LineSplitter(self._cfg.max_line_bytes)
+
+        try:
+            while data := await reader.read(65536):
+                await self._ingestor.ingest_lines(splitter.feed(data), source)
+
+            await self._ingestor.ingest_lines(splitter.close(), source)
+
+        except (ConnectionError, exceptions.SignalBotError) as e:
+            self._logger.error(f"Dropping TCP client {source}: {str(e)}")
+
+        finally:
+            self._reject_oversized(splitter, source)
+            writer.close()
+
+    async def _handle_http(self, request: aiohttp.web.Request) -> aiohttp.web.Response:
+        source = request.remote or "http"
+        splitter = LineSplitter(self._cfg.max_line_bytes)
+        accepted = rejected = 0
+
+        async for data in request.content.iter_chunked(65536):
+            counts = await self._ingestor.ingest_lines(splitter.feed(data), source)
+            accepted, rejected = accepted + counts[0], rejected + counts[1]
+
+        counts = await self._ingestor.ingest_lines(splitter.close(), source)
+        accepted, rejected = accepted + counts[0], rejected + counts[1]
+        rejected += self._reject_oversized(splitter, source)
+
+        return aiohttp.web.json_response(
+            {"accepted": accepted, "rejected": rejected},
+            status=400 if rejected and not accepted else 202,
+        )
+
+    def _reject_oversized(self, splitter: LineSplitter, source: str) -> int:
+        if splitter.oversized:
+            self._ingestor.stats.rejected += splitter.oversized
+            self._logger.warning(
+                f"Skipped {splitter.oversized} lines over "
+                f"{self._cfg.max_line_bytes} bytes from {source}"
+            )
+
+        return splitter.oversized
+
+
+async def main():
+    cfg = config.load_config()
+
+    redis = redis_client.create_client(cfg.redis)
+
+    await redis.connect()
+
+    positions = (
+        throttle.PositionThrottle(cfg.throttle, redis) if cfg.throttle.enabled else None
+    )
+    ingestor = Ingestor(redis, cfg.ingest, positions)
+    server = IngestServer(ingestor, cfg.ingest)
+    flusher = asyncio.create_task(ingestor.run_flusher())
+
+    try:
+        await server.start()
+        await asyncio.Event().wait()
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        await server.stop()
+        flusher.cancel()
+        await ingestor.flush()
+        await redis.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
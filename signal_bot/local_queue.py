@@ -0,0 +1,239 @@
+import asyncio
+import collections
+import logging
+import typing
+
+import config
+import redis_client
+
+QueueItem = redis_client.QueueItem
+
+
+class LocalQueues:
+    def __init__(
+        self,
+        cfg: config.CombinedConfig,
+        spill: typing.Optional[redis_client.RedisClient] = None,
+    ):
+        """Bounded in-process queues behind the RedisClient queue interface.
+
+        Producers and workers running in one event loop hand items over as
+        objects, skipping the Redis round-trips and codec passes. Without a
+        spill client a full queue makes producers wait. With one, overflow is
+        pushed to Redis and taken back once the in-process queue runs dry, in
+        FIFO order, while requeued and dead-lettered items are kept in Redis
+        too. Retries wait in-process.
+
+        Args:
+            cfg: Combined worker configuration with the queue bounds.
+            spill: Connected Redis client for overflow, requeues and dead
+                letters; items already waiting in Redis are picked up too.
+        """
+        self._cfg = cfg
+        self._spill = spill
+        self._queues: typing.Dict[str, asyncio.Queue] = {
+            queue: asyncio.Queue(cfg.queue_size)
+            for queue in redis_client.RedisClient.QUEUE_MODELS
+        }
+        self._returned: typing.Dict[str, typing.Deque[QueueItem]] = {
+            queue: collections.deque() for queue in self._queues
+        }
+        # Whether Redis may hold items of the queue; while it does, producers
+        # keep spilling so nothing overtakes the backlog.
+        self._spilled = {queue: spill is not None for queue in self._queues}
+        self._spilling = {queue: 0 for queue in self._queues}
+        self._retries: typing.Set[asyncio.Task] = set()
+        self._logger = logging.getLogger(__name__)
+
+    @property
+    def is_reliable(self) -> bool:
+        return self._spill is not None and self._spill.is_reliable
+
+    def qsize(self, queue: str) -> int:
+        """Number of items waiting in-process on a queue."""
+        return self._queues[queue].qsize() + len(self._returned[queue])
+
+    async def enqueue_many(self, queue: str, items: typing.Sequence[QueueItem]):
+        await self._put(queue, items)
+
+    async def enqueue_batches(
+        self, batches: typing.Mapping[str, typing.Sequence[QueueItem]]
+    ):
+        for queue, items in batches.items():
+            await self._put(queue, items)
+
+    async def dequeue_many(
+        self,
+        queue: str,
+        max_items: typing.Optional[int] = None,
+        max_wait: typing.Optional[float] = None,
+        trusted: bool = False,
+    ) -> typing.List[QueueItem]:
+        """Take up to max_items items from a queue.
+
+        Requeued items come first, then the in-process queue, then whatever
+        was spilled to Redis. An idle queue is waited on for up to max_wait
+        seconds, after which Redis is checked once for items pushed there by
+        other processes.
+
+        Args:
+            queue: Queue name, must be present in RedisClient.QUEUE_MODELS.
+            max_items: Batch size, defaults to CombinedConfig.batch_size.
+            max_wait: Seconds to wait on an empty queue, defaults to
+                CombinedConfig.block_timeout.
+            trusted: Passed on to the spill client for items read from Redis.
+
+        Returns:
+            Items in FIFO order, empty if the wait timed out.
+        """
+        max_items = max_items or self._cfg.batch_size
+        max_wait = self._cfg.block_timeout if max_wait is None else max_wait
+        local = self._queues[queue]
+        items = self._take(queue, max_items)
+
+        if len(items) < max_items and self._spilled[queue]:
+            items += await self._unspill(queue, max_items - len(items), trusted)
+
+        if items or max_wait <= 0:
+            return items
+
+        try:
+            items.append(await asyncio.wait_for(local.get(), max_wait))
+
+        except asyncio.TimeoutError:
+            if self._spill is None:
+                return items
+
+            self._spilled[queue] = True
+
+            return await self._unspill(queue, max_items, trusted)
+
+        return items + self._take(queue, max_items - 1)
+
+    async def ack(self, model: QueueItem):
+        await self.ack_many([model])
+
+    async def ack_many(self, items: typing.Sequence[QueueItem]):
+        # Only items read back from a reliable Redis queue are held there.
+        if self._spill is not None:
+            await self._spill.ack_many(items)
+
+    async def nack(self, model: QueueItem, requeue: bool = True):
+        """Requeue a dequeued item or dead-letter it.
+
+        Without a spill client requeued items are handed out first by the
+        next dequeue, and dead letters are logged and dropped.
+        """
+        if self._spill is not None:
+            queue = redis_client.RedisClient.queue_of(model)
+
+            if requeue:
+                self._spilled[queue] = True
+
+            await self._spill.nack(model, requeue)
+
+            return
+
+        if requeue:
+            self._returned[redis_client.RedisClient.queue_of(model)].append(model)
+
+            return
+
+        self._logger.error(
+            f"Dropping {type(model).__name__} without a dead letter queue"
+        )
+
+    async def requeue_many(self, items: typing.Sequence[QueueItem]):
+        """Requeue dequeued items so they are handed out first, in order."""
+        if self._spill is not None:
+            for item in items:
+                self._spilled[redis_client.RedisClient.queue_of(item)] = True
+
+            await self._spill.requeue_many(items)
+
+            return
+
+        for item in reversed(items):
+            self._returned[redis_client.RedisClient.queue_of(item)].appendleft(item)
+
+    async def schedule_retry(self, model: QueueItem, delay: float):
+        """Put a dequeued item back on its queue after delay seconds."""
+        await self.ack_many([model])
+
+        task = asyncio.create_task(self._retry(model, delay))
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def close(self):
+        """Cancel pending retries; with a spill client they are requeued to
+        Redis instead of being lost."""
+        for task in list(self._retries):
+            task.cancel()
+
+        await asyncio.gather(*self._retries, return_exceptions=True)
+
+    async def _retry(self, model: QueueItem, delay: float):
+        queue = redis_client.RedisClient.queue_of(model)
+
+        try:
+            await asyncio.sleep(delay)
+
+        except asyncio.CancelledError:
+            if self._spill is not None:
+                await self._spill.enqueue_many(queue, [model])
+
+            raise
+
+        await self._put(queue, [model])
+
+    async def _put(self, queue: str, items: typing.Sequence[QueueItem]):
+        local = self._queues[queue]
+
+        if self._spill is None:
+            for item in items:
+                await local.put(item)
+
+            return
+
+        if not self._spilled[queue]:
+            count = min(len(items), local.maxsize - local.qsize())
+
+            for item in items[:count]:
+                local.put_nowait(item)
+
+            items = items[count:]
+
+        if not items:
+            return
+
+        self._spilled[queue] = True
+        self._spilling[queue] += 1
+
+        try:
+            await self._spill.enqueue_many(queue, items)
+
+        finally:
+            self._spilling[queue] -= 1
+
+    def _take(self, queue: str, max_items: int) -> typing.List[QueueItem]:
+        returned = self._returned[queue]
+        local = self._queues[queue]
+        items = []
+
+        while returned and len(items) < max_items:
+            items.append(returned.popleft())
+
+        while not local.empty() and len(items) < max_items:
+            items.append(local.get_nowait())
+
+        return items
+
+    async def _unspill(
+        self, queue: str, max_items: int, trusted: bool
+    ) -> typing.List[QueueItem]:
+        items = await self._spill.dequeue_many(queue, max_items, 0, trusted)
+
+        if len(items) < max_items and not self._spilling[queue]:
+            self._spilled[queue] = False
+
+        return items
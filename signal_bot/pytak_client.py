@@ -1,10 +1,12 @@
 import asyncio
+import typing
 
 import pytak
 
 import config
 import cot_formatter
 import models
+import records
 import redis_client
 
 
@@ -16,23 +18,29 @@ class PytakWorker(pytak.QueueWorker):
 
         self._redis = redis
 
-    async def handle_event(self, event: models.CotEvent):
+    async def handle_event(
+        self, event: typing.Union[models.CotEvent, records.CotEventRecord]
+    ):
         formatter = cot_formatter.CotFormatter()
 
         await self.put_queue(formatter.format_event(event))
 
     async def run(self):
         while True:
-            event = await self._redis.dequeue_tak_event()
+            # Only this bot produces TAK events, so they skip revalidation.
+            events = await self._redis.dequeue_many(
+                redis_client.RedisClient.TAK_QUEUE, trusted=True
+            )
 
-            if event:
+            for event in events:
                 await self.handle_event(event)
+                await self._redis.ack(event)
 
 
 async def main():
     cfg = config.load_config()
 
-    redis = redis_client.RedisClient(cfg.redis)
+    redis = redis_client.create_client(cfg.redis)
 
     pytak_cfg = {"COT_URL": f"tcp://{cfg.tak.server_url}:{cfg.tak.port}"}
 
@@ -44,6 +52,11 @@ async def main():
 
     clitool.add_tasks({PytakWorker(clitool.tx_queue, pytak_cfg, redis)})
 
+    if redis.is_reliable:
+        reaper = asyncio.create_task(
+            redis.run_reaper(redis_client.RedisClient.TAK_QUEUE)
+        )
+
     try:
         await clitool.run()
 
@@ -51,6 +64,9 @@ async def main():
         pass
 
     finally:
+        if redis.is_reliable:
+            reaper.cancel()
+
         await redis.disconnect()
 
 
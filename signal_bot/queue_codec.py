@@ -0,0 +1,342 @@
+import datetime
+import struct
+import typing
+import uuid
+
+import exceptions
+import models
+import records
+
+QueueModel = typing.Union[models.SignalMessage, models.CotEvent]
+
+
+class JsonCodec:
+    """Pydantic JSON payloads, the original queue format."""
+
+    def encode(self, model: QueueModel) -> bytes:
+        return model.model_dump_json().encode("utf-8")
+
+    def decode(self, model: type[QueueModel], payload: bytes) -> QueueModel:
+        return model.model_validate_json(payload)
+
+    def decode_record(
+        self, model: type[QueueModel], payload: bytes
+    ) -> records.QueueRecord:
+        """Decode into a record, validating once on the way in.
+
+        pydantic-core parses JSON faster than json.loads() plus hand-rolled
+        datetime parsing, so the record is built from the validated model.
+        """
+        return records.MODEL_RECORDS[model].from_model(self.decode(model, payload))
+
+
+class BinaryCodec:
+    """Compact struct-packed payloads for queued models.
+
+    Each model is one fixed-width struct, starting with a header of magic byte,
+    format version and model tag, followed by its UTF-8 strings. Datetimes are
+    stored as int64 microseconds since the epoch, UUIDs as 16 raw bytes and
+    absent optional floats as zero plus a presence flag. Payloads starting with
+    "{" are decoded as JSON so items queued before a codec switch stay readable.
+    """
+
+    MAGIC = 0xCE
+    VERSION = 1
+    MODEL_TAGS = {models.SignalMessage: 1, models.CotEvent: 2}
+
+    # magic, version, tag, message_id, timestamp, retry_count, naive flags,
+    # point flags, lat, lon, hae, ce, le, point timestamp, len(status),
+    # len(description)
+    _SIGNAL_MESSAGE = struct.Struct("<BBB16sqIBB5dqHH")
+    # magic, version, tag, time, start, stale, naive flags, point flags, lat,
+    # lon, hae, ce, le, point timestamp, len(event_id), len(event_type),
+    # len(how), len(status), len(description)
+    _COT_EVENT = struct.Struct("<BBBqqqBB5dqHHHHH")
+
+    # Point presence flags.
+    _HAS_HAE = 0x01
+    _HAS_CE = 0x02
+    _HAS_LE = 0x04
+    _HAS_DESCRIPTION = 0x08
+
+    def __init__(self):
+        """Initialize binary codec"""
+        self._json = JsonCodec()
+
+    def encode(self, model: QueueModel) -> bytes:
+        point = model.point if isinstance(model, models.CotEvent) else model.geolocation
+        description = (point.description or "").encode("utf-8")
+        status = model.status.encode("utf-8")
+        flags = (
+            (self._HAS_HAE if point.hae is not None else 0)
+            | (self._HAS_CE if point.ce is not None else 0)
+            | (self._HAS_LE if point.le is not None else 0)
+            | (self._HAS_DESCRIPTION if point.description is not None else 0)
+        )
+
+        try:
+            if isinstance(model, models.SignalMessage):
+                return (
+                    self._SIGNAL_MESSAGE.pack(
+                        self.MAGIC,
+                        self.VERSION,
+                        self.MODEL_TAGS[models.SignalMessage],
+                        model.message_id.bytes,
+                        _pack_datetime(model.timestamp),
+                        model.retry_count,
+                        _naive_flags(model.timestamp, point.timestamp),
+                        flags,
+                        point.lat,
+                        point.lon,
+                        point.hae or 0.0,
+                        point.ce or 0.0,
+                        point.le or 0.0,
+                        _pack_datetime(point.timestamp),
+                        len(status),
+                        len(description),
+                    )
+                    + status
+                    + description
+                )
+
+            event_id = model.event_id.encode("utf-8")
+            event_type = model.event_type.encode("utf-8")
+            how = model.how.encode("utf-8")
+
+            return b"".join(
+                [
+                    self._COT_EVENT.pack(
+                        self.MAGIC,
+                        self.VERSION,
+                        self.MODEL_TAGS[models.CotEvent],
+                        _pack_datetime(model.time),
+                        _pack_datetime(model.start),
+                        _pack_datetime(model.stale),
+                        _naive_flags(
+                            model.time, model.start, model.stale, point.timestamp
+                        ),
+                        flags,
+                        point.lat,
+                        point.lon,
+                        point.hae or 0.0,
+                        point.ce or 0.0,
+                        point.le or 0.0,
+                        _pack_datetime(point.timestamp),
+                        len(event_id),
+                        len(event_type),
+                        len(how),
+                        len(status),
+                        len(description),
+                    ),
+                    event_id,
+                    event_type,
+                    how,
+                    status,
+                    description,
+                ]
+            )
+
+        except struct.error as e:
+            raise exceptions.MessageValidationError(
+                f"Failed to encode {type(model).__name__}: {str(e)}"
+            ) from e
+
+    def decode(self, model: type[QueueModel], payload: bytes) -> QueueModel:
+        if payload[:1] == b"{":
+            return self._json.decode(model, payload)
+
+        # Validation runs in pydantic-core and costs less than model_construct(),
+        # so the unpacked fields go through it rather than around it.
+        return model.model_validate(self._unpack(model, payload))
+
+    def decode_record(
+        self, model: type[QueueModel], payload: bytes
+    ) -> records.QueueRecord:
+        """Decode into an unvalidated record, for trusted producers only."""
+        if payload[:1] == b"{":
+            return self._json.decode_record(model, payload)
+
+        fields = self._unpack(model, payload)
+
+        if model is models.SignalMessage:
+            fields["message_id"] = uuid.UUID(bytes=fields["message_id"])
+
+        return _to_record(model, fields)
+
+    def _unpack(self, model: type[QueueModel], payload: bytes) -> dict:
+        layout = (
+            self._SIGNAL_MESSAGE if model is models.SignalMessage else self._COT_EVENT
+        )
+
+        try:
+            values = layout.unpack_from(payload)
+            magic, version, tag = values[:3]
+
+            if magic != self.MAGIC or version != self.VERSION:
+                raise exceptions.MessageValidationError(
+                    f"Unsupported payload format {magic:#x}/{version}"
+                )
+
+            if tag != self.MODEL_TAGS[model]:
+                raise exceptions.MessageValidationError(
+                    f"Payload tag {tag} does not match {model.__name__}"
+                )
+
+            if model is models.SignalMessage:
+                (
+                    message_id,
+                    timestamp,
+                    retry_count,
+                    naive,
+                    flags,
+                    lat,
+                    lon,
+                    hae,
+                    ce,
+                    le,
+                    point_timestamp,
+                ) = values[3:-2]
+                status, description = _unpack_strings(payload, layout.size, values[-2:])
+
+                point = self._point(
+                    flags,
+                    lat,
+                    lon,
+                    hae,
+                    ce,
+                    le,
+                    description,
+                    point_timestamp,
+                    naive & 2,
+                )
+                fields = {
+                    "geolocation": point,
+                    "message_id": message_id,  # pydantic accepts the raw 16 bytes
+                    "timestamp": _unpack_datetime(timestamp, naive & 1),
+                    "status": status,
+                    "retry_count": retry_count,
+                }
+
+            else:
+                (
+                    time,
+                    start,
+                    stale,
+                    naive,
+                    flags,
+                    lat,
+                    lon,
+                    hae,
+                    ce,
+                    le,
+                    point_timestamp,
+                ) = values[3:-5]
+                event_id, event_type, how, status, description = _unpack_strings(
+                    payload, layout.size, values[-5:]
+                )
+
+                point = self._point(
+                    flags,
+                    lat,
+                    lon,
+                    hae,
+                    ce,
+                    le,
+                    description,
+                    point_timestamp,
+                    naive & 8,
+                )
+                fields = {
+                    "event_id": event_id,
+                    "event_type": event_type,
+                    "time": _unpack_datetime(time, naive & 1),
+                    "start": _unpack_datetime(start, naive & 2),
+                    "stale": _unpack_datetime(stale, naive & 4),
+                    "how": how,
+                    "point": point,
+                    "status": status,
+                }
+
+        except (struct.error, UnicodeDecodeError) as e:
+            raise exceptions.MessageValidationError(
+                f"Malformed {model.__name__} payload: {str(e)}"
+            ) from e
+
+        return fields
+
+    def _point(self, flags, lat, lon, hae, ce, le, description, timestamp, naive):
+        return {
+            "lat": lat,
+            "lon": lon,
+            "hae": hae if flags & self._HAS_HAE else None,
+            "ce": ce if flags & self._HAS_CE else None,
+            "le": le if flags & self._HAS_LE else None,
+            "description": description if flags & self._HAS_DESCRIPTION else None,
+            "timestamp": _unpack_datetime(timestamp, naive),
+        }
+
+
+def _unpack_strings(
+    payload: bytes, offset: int, lengths: typing.Sequence[int]
+) -> typing.List[str]:
+    if offset + sum(lengths) != len(payload):
+        raise struct.error(f"expected {offset + sum(lengths)} bytes")
+
+    strings = []
+
+    for length in lengths:
+        strings.append(payload[offset : offset + length].decode("utf-8"))
+        offset += length
+
+    return strings
+
+
+def _to_record(model: type[QueueModel], fields: dict) -> records.QueueRecord:
+    if model is models.SignalMessage:
+        return records.SignalMessageRecord(
+            records.GeoLocationRecord(**fields["geolocation"]),
+            fields["message_id"],
+            fields["timestamp"],
+            fields["status"],
+            fields["retry_count"],
+        )
+
+    fields["point"] = records.GeoLocationRecord(**fields["point"])
+
+    return records.CotEventRecord(**fields)
+
+
+def _naive_flags(*values: datetime.datetime) -> int:
+    flags = 0
+
+    for i, value in enumerate(values):
+        if value.tzinfo is None:
+            flags |= 1 << i
+
+    return flags
+
+
+def _pack_datetime(value: datetime.datetime) -> int:
+    return (value - (_EPOCH if value.tzinfo else _NAIVE_EPOCH)) // _MICROSECOND
+
+
+def _unpack_datetime(value: int, naive: int) -> datetime.datetime:
+    return (_NAIVE_EPOCH if naive else _EPOCH) + datetime.timedelta(microseconds=value)
+
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_NAIVE_EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def create_codec(name: str) -> typing.Union[JsonCodec, BinaryCodec]:
+    """Build the queue payload codec selected in the configuration."""
+    if name == "json":
+        return JsonCodec()
+
+    if name == "binary":
+        return BinaryCodec()
+
+    raise exceptions.ConfigurationError(
+        f"Unknown queue codec {name!r}, expected 'json' or 'binary'"
+    )
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import signal
+
+import config
+import geofence
+import redis_client
+import signal_client
+import tak_worker
+
+QUEUES = [redis_client.RedisClient.TAK_QUEUE, redis_client.RedisClient.SIGNAL_QUEUE]
+
+
+class QueueWorker:
+    def __init__(
+        self,
+        redis: redis_client.RedisClient,
+        tak: tak_worker.TakWorker,
+        dispatcher: signal_client.SignalDispatcher,
+    ):
+        """Serve both Redis queues from one consumer.
+
+        A single dequeue_any() waits on the TAK and Signal queues at once, so
+        an idle worker blocks in Redis and a flood on one queue does not
+        starve the other. For small deployments that want the Redis queues
+        without running a worker per queue.
+
+        Args:
+            redis: Connected queue client.
+            tak: TAK worker whose output is started.
+            dispatcher: Signal dispatcher with a connected client.
+        """
+        self._redis = redis
+        self._tak = tak
+        self._dispatcher = dispatcher
+        self._running = False
+        self._logger = logging.getLogger(__name__)
+
+    async def run(self):
+        """Forward batches until stop() is called."""
+        self._running = True
+
+        while self._running:
+            # Only this bot produces TAK events, so they skip revalidation.
+            batches = await self._redis.dequeue_any(
+                QUEUES, trusted=[redis_client.RedisClient.TAK_QUEUE]
+            )
+
+            if events := batches.get(redis_client.RedisClient.TAK_QUEUE):
+                await self._tak.forward(events)
+
+            for message in batches.get(redis_client.RedisClient.SIGNAL_QUEUE, []):
+                await self._dispatcher.dispatch([message])
+
+    def stop(self):
+        """Let run() return once the batch in hand is handed over."""
+        self._running = False
+
+
+async def main():
+    cfg = config.load_config()
+
+    redis = redis_client.create_client(cfg.redis)
+    output = tak_worker.create_output(cfg.tak)
+
+    await redis.connect()
+    await output.start()
+
+    tasks = [
+        asyncio.create_task(
+            redis.run_retry_scheduler(redis_client.RedisClient.SIGNAL_QUEUE)
+        )
+    ]
+
+    if redis.is_reliable:
+        tasks += [asyncio.create_task(redis.run_reaper(queue)) for queue in QUEUES]
+
+    try:
+        router = await geofence.create_router(cfg.geofence, redis)
+
+        async with signal_client.SignalClient(cfg.signal) as client:
+            dispatcher = signal_client.SignalDispatcher(
+                client,
+                redis,
+                cfg.signal.max_in_flight,
+                cfg.signal.max_reconnect_attempts,
+                router,
+            )
+            worker = QueueWorker(
+                redis, tak_worker.TakWorker(redis, output, router), dispatcher
+            )
+
+            # Drain on SIGTERM, which is how containers stop us.
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, worker.stop)
+
+            try:
+                await worker.run()
+
+            finally:
+                await dispatcher.drain()
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        for task in tasks:
+            task.cancel()
+
+        await output.stop()
+        await redis.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
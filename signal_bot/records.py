@@ -0,0 +1,146 @@
+import dataclasses
+import datetime
+import typing
+import uuid
+
+import models
+
+
+@dataclasses.dataclass
+class GeoLocationRecord:
+    """Unvalidated, slotted counterpart of models.GeoLocation.
+
+    Records are meant for hand-offs between trusted internal stages; data from
+    outside the process must enter through the pydantic models first.
+    """
+
+    __slots__ = ("lat", "lon", "hae", "ce", "le", "description", "timestamp")
+
+    lat: float
+    lon: float
+    hae: typing.Optional[float]
+    ce: typing.Optional[float]
+    le: typing.Optional[float]
+    description: typing.Optional[str]
+    timestamp: datetime.datetime
+
+    @classmethod
+    def from_model(cls, model: models.GeoLocation) -> "GeoLocationRecord":
+        return cls(
+            model.lat,
+            model.lon,
+            model.hae,
+            model.ce,
+            model.le,
+            model.description,
+            model.timestamp,
+        )
+
+    def to_model(self) -> models.GeoLocation:
+        return models.GeoLocation(
+            lat=self.lat,
+            lon=self.lon,
+            hae=self.hae,
+            ce=self.ce,
+            le=self.le,
+            description=self.description,
+            timestamp=self.timestamp,
+        )
+
+
+@dataclasses.dataclass
+class SignalMessageRecord:
+    """Unvalidated, slotted counterpart of models.SignalMessage."""
+
+    __slots__ = ("geolocation", "message_id", "timestamp", "status", "retry_count")
+
+    geolocation: GeoLocationRecord
+    message_id: uuid.UUID
+    timestamp: datetime.datetime
+    status: str
+    retry_count: int
+
+    @property
+    def content(self) -> str:
+        return (
+            f"{self.geolocation.lon} {self.geolocation.lat} "
+            f"{self.geolocation.description or 'Unknown'}"
+        )
+
+    @classmethod
+    def from_model(cls, model: models.SignalMessage) -> "SignalMessageRecord":
+        return cls(
+            GeoLocationRecord.from_model(model.geolocation),
+            model.message_id,
+            model.timestamp,
+            model.status,
+            model.retry_count,
+        )
+
+    def to_model(self) -> models.SignalMessage:
+        return models.SignalMessage(
+            geolocation=self.geolocation.to_model(),
+            message_id=self.message_id,
+            timestamp=self.timestamp,
+            status=self.status,
+            retry_count=self.retry_count,
+        )
+
+
+@dataclasses.dataclass
+class CotEventRecord:
+    """Unvalidated, slotted counterpart of models.CotEvent."""
+
+    __slots__ = (
+        "event_id",
+        "event_type",
+        "time",
+        "start",
+        "stale",
+        "how",
+        "point",
+        "status",
+    )
+
+    event_id: str
+    event_type: str
+    time: datetime.datetime
+    start: datetime.datetime
+    stale: datetime.datetime
+    how: str
+    point: GeoLocationRecord
+    status: str
+
+    @classmethod
+    def from_model(cls, model: models.CotEvent) -> "CotEventRecord":
+        return cls(
+            model.event_id,
+            model.event_type,
+            model.time,
+            model.start,
+            model.stale,
+            model.how,
+            GeoLocationRecord.from_model(model.point),
+            model.status,
+        )
+
+    def to_model(self) -> models.CotEvent:
+        return models.CotEvent(
+            event_id=self.event_id,
+            event_type=self.event_type,
+            time=self.time,
+            start=self.start,
+            stale=self.stale,
+            how=self.how,
+            point=self.point.to_model(),
+            status=self.status,
+        )
+
+
+QueueRecord = typing.Union[SignalMessageRecord, CotEventRecord]
+
+MODEL_RECORDS: typing.Dict[type, type] = {
+    models.GeoLocation: GeoLocationRecord,
+    models.SignalMessage: SignalMessageRecord,
+    models.CotEvent: CotEventRecord,
+}
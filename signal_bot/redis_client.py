@@ -2,27 +2,116 @@ import asyncio
 import datetime
 import json
 import logging
+import math
+import time
 import typing
 
 import aioredis
 import aioredis.exceptions
+import pydantic
 
 import config
 import cot_formatter
 import exceptions
 import models
+import queue_codec
+import records
+
+QueueItem = typing.Union[
+    models.SignalMessage,
+    models.CotEvent,
+    records.SignalMessageRecord,
+    records.CotEventRecord,
+]
 
 
 class RedisClient:
     SIGNAL_QUEUE = "signal:messages"
     TAK_QUEUE = "tak:events"
     DEAD_LETTER_QUEUE = "dead:letter:messages"
+    QUEUE_MODELS = {
+        SIGNAL_QUEUE: models.SignalMessage,
+        TAK_QUEUE: models.CotEvent,
+    }
+    # Moves up to ARGV[1] items from the queue into a processing list in one call.
+    MOVE_SCRIPT = """
+        local items = {}
+        for i = 1, tonumber(ARGV[1]) do
+            local item = redis.call('RPOPLPUSH', KEYS[1], KEYS[2])
+            if not item then break end
+            items[i] = item
+        end
+        return items
+    """
+    # Requeues an in-flight item unless another reaper already did.
+    REQUEUE_SCRIPT = """
+        if redis.call('LREM', KEYS[1], 1, ARGV[1]) > 0 then
+            redis.call('RPUSH', KEYS[2], ARGV[1])
+            return 1
+        end
+        return 0
+    """
+    # Moves up to ARGV[2] retries due by ARGV[1] from the delayed set to the queue.
+    PROMOTE_SCRIPT = """
+        local items = redis.call(
+            'ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2]
+        )
+        for _, item in ipairs(items) do
+            redis.call('ZREM', KEYS[1], item)
+            redis.call('LPUSH', KEYS[2], item)
+        end
+        return #items
+    """
+    # Decides whether a track update is sent, against the last sent position of
+    # the track on the Redis clock: 1 send, 0 drop (no movement), -1 too soon.
+    # ARGV: lat, lon, min distance (m), min interval, max interval, ttl (ms),
+    # force.
+    TRACK_SCRIPT = """
+        local now = redis.call('TIME')
+        now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+        local last = redis.call('HMGET', KEYS[1], 'lat', 'lon', 'time')
+        if last[3] and ARGV[7] ~= '1' then
+            local elapsed = now - tonumber(last[3])
+            local max_interval = tonumber(ARGV[5])
+            if max_interval <= 0 or elapsed < max_interval then
+                local rad = math.pi / 180
+                local lat1, lat2 = tonumber(last[1]) * rad, tonumber(ARGV[1]) * rad
+                local dlat = lat2 - lat1
+                local dlon = (tonumber(ARGV[2]) - tonumber(last[2])) * rad
+                local h = math.sin(dlat / 2) ^ 2
+                    + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ^ 2
+                local distance = 2 * 6371008.8 * math.asin(math.sqrt(math.min(h, 1)))
+                if distance < tonumber(ARGV[3]) then return 0 end
+                if elapsed < tonumber(ARGV[4]) then return -1 end
+            end
+        end
+        redis.call('HSET', KEYS[1], 'lat', ARGV[1], 'lon', ARGV[2], 'time', now)
+        redis.call('PEXPIRE', KEYS[1], ARGV[6])
+        return 1
+    """
+    # Seconds a reliable-mode dequeue_any blocks on one queue before it looks
+    # at the next, as BLMOVE cannot wait on several keys.
+    RELIABLE_WAIT_SLICE = 0.1
+    TRACK_PREFIX = "track:"
+    GEOFENCE_AREAS = "geofence:areas"
+    GEOFENCE_CENTERS = "geofence:centers"
 
     def __init__(self, config: config.RedisConfig):
         """Initialize Redis client for message queuing"""
         self._config = config
         self._redis: typing.Optional[aioredis.Redis] = None
         self._logger = logging.getLogger(__name__)
+        self._codec = queue_codec.create_codec(config.codec)
+        self._rotation = 0
+        self._in_flight: typing.Dict[
+            int,
+            typing.Tuple[
+                typing.Union[models.SignalMessage, models.CotEvent], str, bytes
+            ],
+        ] = {}
+        self._first_seen: typing.Dict[
+            str, typing.Dict[typing.Tuple[bytes, bytes], float]
+        ] = {}
 
     async def connect(self):
         try:
@@ -31,11 +120,17 @@ class RedisClient:
                 password=self._config.password,
                 db=self._config.db,
                 encoding="utf-8",
-                decode_responses=True,
+                # Payloads may be binary, see queue_codec.
+                decode_responses=False,
             )
 
             await self._redis.ping()
 
+            self._move_script = self._redis.register_script(self.MOVE_SCRIPT)
+            self._requeue_script = self._redis.register_script(self.REQUEUE_SCRIPT)
+            self._promote_script = self._redis.register_script(self.PROMOTE_SCRIPT)
+            self._track_script = self._redis.register_script(self.TRACK_SCRIPT)
+
             self._logger.info("Successfully connected to Redis")
 
         except aioredis.exceptions.RedisError as e:
@@ -53,33 +148,659 @@ class RedisClient:
     async def enqueue_tak_events(self, event: models.CotEvent):
         await self._enqueue_model(event, self.TAK_QUEUE)
 
-    async def dequeue_signal_message(self) -> typing.Optional[models.SignalMessage]:
-        return await self._dequeue_model(models.SignalMessage, self.SIGNAL_QUEUE)
+    async def dequeue_signal_message(
+        self, block: bool = True
+    ) -> typing.Optional[models.SignalMessage]:
+        return await self._dequeue_model(models.SignalMessage, self.SIGNAL_QUEUE, block)
+
+    async def dequeue_tak_event(
+        self, block: bool = True
+    ) -> typing.Optional[models.CotEvent]:
+        return await self._dequeue_model(models.CotEvent, self.TAK_QUEUE, block)
+
+    async def enqueue_many(
+        self,
+        queue: str,
+        items: typing.Sequence[typing.Union[models.SignalMessage, models.CotEvent]],
+    ):
+        """Push a batch of models onto a queue in a single LPUSH round-trip.
+
+        Args:
+            queue: Target queue name.
+            items: Models to enqueue, oldest first.
+        """
+        await self.enqueue_batches({queue: items})
+
+    async def enqueue_batches(
+        self,
+        batches: typing.Mapping[
+            str, typing.Sequence[typing.Union[models.SignalMessage, models.CotEvent]]
+        ],
+    ):
+        """Push batches of models onto several queues in one pipelined round-trip.
+
+        Args:
+            batches: Models to enqueue by queue name, oldest first.
+        """
+        batches = {queue: items for queue, items in batches.items() if items}
+
+        if not batches:
+            return
+
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for queue, items in batches.items():
+                    self._push(pipe, queue, [self._encode(item) for item in items])
+
+                await pipe.execute()
+
+            for queue, items in batches.items():
+                self._logger.info(f"Enqueued {len(items)} items to {queue}")
+
+        except aioredis.exceptions.RedisError as e:
+            for queue, items in batches.items():
+                self._logger.error(
+                    f"Failed to enqueue {len(items)} items to {queue}: {str(e)}"
+                )
+
+                for item in items:
+                    await self._on_failed_enqueuing(item, queue)
+
+    async def dequeue_many(
+        self,
+        queue: str,
+        max_items: typing.Optional[int] = None,
+        max_wait: typing.Optional[float] = None,
+        trusted: bool = False,
+    ) -> typing.List[QueueItem]:
+        """Pop up to max_items models from a queue.
+
+        A backlog is drained with a single RPOP <count>. On an empty queue the
+        call blocks on BRPOP for up to max_wait seconds and then tops the batch
+        up with whatever arrived alongside the first item. In reliable mode the
+        items are moved into the worker's processing list instead and stay
+        there until ack() or nack().
+
+        Args:
+            queue: Queue name, must be present in QUEUE_MODELS.
+            max_items: Batch size, defaults to RedisConfig.batch_size.
+            max_wait: Seconds to wait on an empty queue, defaults to
+                RedisConfig.block_timeout.
+            trusted: Decode into slotted records instead of validated models,
+                for queues fed only by this bot's own producers.
+
+        Returns:
+            Decoded models in FIFO order, empty if the wait timed out.
+        """
+        max_items = max_items or self._config.batch_size
+        max_wait = self._config.block_timeout if max_wait is None else max_wait
+        model = self.QUEUE_MODELS[queue]
+
+        entries = await self._pop_entries(queue, max_items, max_wait)
+
+        return [
+            self._decode(model, queue, receipt, payload, trusted)
+            for receipt, payload in entries
+        ]
+
+    async def dequeue_any(
+        self,
+        queues: typing.Sequence[str],
+        max_items: typing.Optional[int] = None,
+        max_wait: typing.Optional[float] = None,
+        trusted: typing.Collection[str] = (),
+    ) -> typing.Dict[str, typing.List[QueueItem]]:
+        """Wait on several queues at once and pop a batch from those that have
+        items.
+
+        BRPOP serves its keys in the given order, so the order is rotated on
+        every call to keep one busy queue from starving the others. Reliable
+        mode holds the items like dequeue_many(); as BLMOVE waits on a single
+        key, the queues are then waited on in turn, RELIABLE_WAIT_SLICE
+        seconds each.
+
+        Args:
+            queues: Queue names, each must be present in QUEUE_MODELS.
+            max_items: Batch size per queue, defaults to RedisConfig.batch_size.
+            max_wait: Seconds to wait while all queues are empty, defaults to
+                RedisConfig.block_timeout.
+            trusted: Queues to decode into slotted records, see dequeue_many().
+
+        Returns:
+            Decoded models in FIFO order by queue name, empty if the wait
+            timed out.
+        """
+        max_items = max_items or self._config.batch_size
+        max_wait = self._config.block_timeout if max_wait is None else max_wait
+
+        entries = await self._pop_any(queues, max_items, max_wait)
+
+        return {
+            queue: [
+                self._decode(
+                    self.QUEUE_MODELS[queue], queue, receipt, payload, queue in trusted
+                )
+                for receipt, payload in items
+            ]
+            for queue, items in entries.items()
+        }
+
+    @property
+    def is_reliable(self) -> bool:
+        """Whether dequeued models must be acked and expired ones reaped."""
+        return self._config.reliable_queue
+
+    async def ack(self, model: QueueItem):
+        """Confirm that a dequeued model was processed.
+
+        In reliable mode this releases the item held for the worker, otherwise
+        it is a no-op.
+        """
+        await self.ack_many([model])
+
+    async def ack_many(self, items: typing.Sequence[QueueItem]):
+        """Confirm a batch of dequeued models in a single round-trip."""
+        entries = [
+            entry
+            for entry in (self._in_flight.pop(id(item), None) for item in items)
+            if entry
+        ]
+
+        if not entries:
+            return
+
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for _, queue, receipt in entries:
+                    self._release(pipe, queue, receipt)
+
+                await pipe.execute()
+
+        except aioredis.exceptions.RedisError as e:
+            # The reaper will requeue the items, which is the safe failure.
+            self._logger.error(f"Failed to ack {len(entries)} items: {str(e)}")
+
+    async def nack(
+        self,
+        model: QueueItem,
+        requeue: bool = True,
+    ):
+        """Return a dequeued model to its queue or move it to the dead letters.
+
+        Args:
+            model: Model previously returned by a dequeue call.
+            requeue: Push the current model state back onto the queue tail when
+                True, dead-letter it otherwise.
+        """
+        entry = self._in_flight.pop(id(model), None)
+        queue = entry[1] if entry else self.queue_of(model)
+
+        try:
+            async with self._redis.pipeline() as pipe:
+                if entry:
+                    self._release(pipe, queue, entry[2])
+
+                if requeue:
+                    self._push(pipe, queue, [self._encode(model)])
+
+                await pipe.execute()
+
+        except aioredis.exceptions.RedisError as e:
+            self._logger.error(f"Failed to nack item on {queue}: {str(e)}")
+
+            requeue = False
+
+        if not requeue:
+            await self._on_failed_enqueuing(model, queue)
+
+    async def requeue_many(self, items: typing.Sequence[QueueItem]):
+        """Return dequeued models to the front of their queue in one round-trip.
+
+        Unlike nack(), which pushes to the tail, the models are handed out
+        again first and in their original order. Streams cannot be prepended
+        to, so there the models are appended in order instead.
+        """
+        batches: typing.Dict[str, typing.List[typing.Tuple[QueueItem, bytes]]] = {}
+
+        for item in items:
+            entry = self._in_flight.pop(id(item), None)
+            queue = entry[1] if entry else self.queue_of(item)
+            batches.setdefault(queue, []).append((item, entry[2] if entry else None))
+
+        if not batches:
+            return
+
+        try:
+            async with self._redis.pipeline() as pipe:
+                for queue, batch in batches.items():
+                    for _, receipt in batch:
+                        if receipt is not None:
+                            self._release(pipe, queue, receipt)
+
+                    self._push_front(
+                        pipe, queue, [self._encode(item) for item, _ in batch]
+                    )
+
+                await pipe.execute()
+
+        except aioredis.exceptions.RedisError as e:
+            self._logger.error(f"Failed to requeue {len(items)} items: {str(e)}")
+
+            for queue, batch in batches.items():
+                for item, _ in batch:
+                    await self._on_failed_enqueuing(item, queue)
+
+    async def schedule_retry(
+        self,
+        model: QueueItem,
+        delay: float,
+    ):
+        """Park a model in the queue's delayed set until it is due again.
+
+        The in-flight entry, if any, is released in the same transaction, so
+        the worker moves on immediately instead of sleeping through a backoff.
+
+        Args:
+            model: Model previously returned by a dequeue call.
+            delay: Seconds before the model is pushed back onto the queue.
+        """
+        entry = self._in_flight.pop(id(model), None)
+        queue = entry[1] if entry else self.queue_of(model)
+
+        try:
+            async with self._redis.pipeline() as pipe:
+                if entry:
+                    self._release(pipe, queue, entry[2])
+
+                pipe.zadd(
+                    self._delayed_key(queue),
+                    {self._encode(model): time.time() + delay},
+                )
+
+                await pipe.execute()
+
+        except aioredis.exceptions.RedisError as e:
+            self._logger.error(f"Failed to schedule retry on {queue}: {str(e)}")
+
+            await self._on_failed_enqueuing(model, queue)
+
+    async def promote_due(self, queue: str) -> int:
+        """Move retries whose delay has passed back onto the queue.
+
+        Returns:
+            Number of promoted items.
+        """
+        try:
+            return await self._promote_script(
+                keys=[self._delayed_key(queue), self._queue_key(queue)],
+                args=[time.time(), self._config.batch_size, self._config.stream_maxlen],
+            )
+
+        except aioredis.exceptions.RedisError as e:
+            raise exceptions.RedisError(
+                f"Failed to promote delayed items on {queue}: {str(e)}"
+            ) from e
+
+    async def update_tracks(
+        self,
+        cfg: config.ThrottleConfig,
+        positions: typing.Sequence[typing.Tuple[str, float, float]],
+        force: bool = False,
+    ) -> typing.List[int]:
+        """Check track updates against the positions last sent by any worker.
+
+        Positions that pass are stored as the track's last sent position, so
+        workers sharing a Redis throttle each other. See TRACK_SCRIPT.
+
+        Args:
+            cfg: Throttle thresholds.
+            positions: (uid, lat, lon) tuples, one script call each in a
+                single pipeline.
+            force: Store the positions without checking them.
+
+        Returns:
+            1 to send, 0 to drop, -1 if the update came too soon, per position.
+
+        Raises:
+            RedisError: If the pipeline fails.
+        """
+        if not positions:
+            return []
+
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for uid, lat, lon in positions:
+                    await self._track_script(
+                        keys=[f"{self.TRACK_PREFIX}{uid}"],
+                        args=[
+                            lat,
+                            lon,
+                            cfg.min_distance,
+                            cfg.min_interval,
+                            cfg.max_interval,
+                            int(cfg.ttl * 1000),
+                            int(force),
+                        ],
+                        client=pipe,
+                    )
+
+                return [int(result) for result in await pipe.execute()]
+
+        except aioredis.exceptions.RedisError as e:
+            raise exceptions.RedisError(
+                f"Failed to update {len(positions)} tracks: {str(e)}"
+            ) from e
+
+    async def save_areas(
+        self,
+        features: typing.Dict[str, dict],
+        centers: typing.Dict[str, typing.Tuple[float, float]],
+    ):
+        """Replace the shared geofence areas in one transaction.
+
+        Areas are stored as GeoJSON features in a hash, and their centers in a
+        GEO set so other tools can find them with GEOSEARCH.
+
+        Args:
+            features: GeoJSON feature of each area by name.
+            centers: (lat, lon) of each area by name.
+
+        Raises:
+            RedisError: If the areas cannot be stored.
+        """
+        try:
+            async with self._redis.pipeline() as pipe:
+                pipe.delete(self.GEOFENCE_AREAS, self.GEOFENCE_CENTERS)
+
+                if features:
+                    pipe.hset(
+                        self.GEOFENCE_AREAS,
+                        mapping={
+                            name: json.dumps(feature)
+                            for name, feature in features.items()
+                        },
+                    )
+                    pipe.geoadd(
+                        self.GEOFENCE_CENTERS,
+                        *(
+                            value
+                            for name, (lat, lon) in centers.items()
+                            # GEO sets cannot index the polar caps.
+                            if abs(lat) <= 85.05112878
+                            for value in (lon, lat, name)
+                        ),
+                    )
+
+                await pipe.execute()
+
+        except aioredis.exceptions.RedisError as e:
+            raise exceptions.RedisError(
+                f"Failed to store {len(features)} geofence areas: {str(e)}"
+            ) from e
+
+    async def load_areas(self) -> typing.List[dict]:
+        """Read the shared geofence areas as GeoJSON features.
+
+        Raises:
+            RedisError: If the areas cannot be read.
+        """
+        try:
+            values = await self._redis.hvals(self.GEOFENCE_AREAS)
+
+        except aioredis.exceptions.RedisError as e:
+            raise exceptions.RedisError(
+                f"Failed to load geofence areas: {str(e)}"
+            ) from e
+
+        return [json.loads(value) for value in values]
+
+    async def run_retry_scheduler(self, queue: str, interval: float = 0.5):
+        """Periodically promote due retries until cancelled."""
+        while True:
+            try:
+                # Keep going without sleeping while a full batch was promoted.
+                if await self.promote_due(queue) >= self._config.batch_size:
+                    continue
+
+            except exceptions.RedisError as e:
+                self._logger.error(str(e))
+
+            await asyncio.sleep(interval)
+
+    async def reap_expired(self, queue: str) -> int:
+        """Requeue items that sat in any processing list for longer than the
+        visibility timeout.
 
-    async def dequeue_tak_event(self) -> typing.Optional[models.CotEvent]:
-        return await self._dequeue_model(models.CotEvent, self.TAK_QUEUE)
+        Processing lists carry no timestamps, so the reaper remembers when it
+        first saw each item and acts on the next pass after the timeout. This
+        keeps the happy path at one BLMOVE plus one LREM per item.
+
+        Returns:
+            Number of items moved back to the queue.
+        """
+        now = time.monotonic()
+        previous = self._first_seen.get(queue, {})
+        seen: typing.Dict[typing.Tuple[bytes, bytes], float] = {}
+        requeued = 0
+
+        try:
+            async for key in self._redis.scan_iter(match=f"{queue}:processing:*"):
+                for payload in await self._redis.lrange(key, 0, -1):
+                    first_seen = previous.get((key, payload), now)
+
+                    if now - first_seen < self._config.visibility_timeout:
+                        seen[(key, payload)] = first_seen
+                        continue
+
+                    requeued += await self._requeue_script(
+                        keys=[key, queue], args=[payload]
+                    )
+
+        except aioredis.exceptions.RedisError as e:
+            raise exceptions.RedisError(
+                f"Failed to reap expired items on {queue}: {str(e)}"
+            ) from e
+
+        self._first_seen[queue] = seen
+
+        if requeued:
+            self._logger.warning(f"Requeued {requeued} expired items on {queue}")
+
+        return requeued
+
+    async def run_reaper(self, queue: str):
+        """Periodically requeue expired in-flight items until cancelled."""
+        while True:
+            await asyncio.sleep(self._config.visibility_timeout / 2)
+
+            try:
+                await self.reap_expired(queue)
+
+            except exceptions.RedisError as e:
+                self._logger.error(str(e))
 
     async def _dequeue_model(
         self,
         model: type[typing.Union[models.SignalMessage, models.CotEvent]],
         queue: str,
+        block: bool = True,
     ) -> typing.Optional[typing.Union[models.SignalMessage, models.CotEvent]]:
+        # A blocking pop parks the connection server-side until an item arrives
+        # or block_timeout expires, so idle workers do not spin on RPOP.
+        max_wait = self._config.block_timeout if block else 0
+
+        if entries := await self._pop_entries(queue, 1, max_wait):
+            return self._decode(model, queue, *entries[0])
+
+        return None
+
+    async def _pop_entries(
+        self, queue: str, max_items: int, max_wait: float
+    ) -> typing.List[typing.Tuple[bytes, bytes]]:
+        """Pop raw queue items as (receipt, payload) pairs.
+
+        The receipt is whatever _release() needs to drop the item once it is
+        processed; for lists that is the payload itself.
+        """
         try:
-            if data := await self._redis.rpop(queue):
-                return model(**json.loads(data))
+            if self._config.reliable_queue:
+                processing = self._processing_key(queue)
+
+                data = await self._move_script(
+                    keys=[queue, processing], args=[max_items]
+                )
+
+                if not data and max_wait > 0:
+                    if item := await self._redis.execute_command(
+                        "BLMOVE", queue, processing, "RIGHT", "LEFT", max_wait
+                    ):
+                        data = [item]
+
+                        if max_items > 1:
+                            data += await self._move_script(
+                                keys=[queue, processing], args=[max_items - 1]
+                            )
+
+                return [(payload, payload) for payload in data]
 
-            return None
+            data = await self._redis.execute_command("RPOP", queue, max_items) or []
+
+            if not data and max_wait > 0:
+                if item := await self._redis.brpop([queue], timeout=max_wait):
+                    data = [item[1]]
+
+                    if max_items > 1:
+                        data += (
+                            await self._redis.execute_command(
+                                "RPOP", queue, max_items - 1
+                            )
+                            or []
+                        )
+
+            return [(payload, payload) for payload in data]
 
         except aioredis.exceptions.RedisError as e:
             self._logger.error(f"Failed to dequeue {queue}: {str(e)}")
 
             raise exceptions.RedisError(f"Failed to dequeue {queue}: {str(e)}") from e
 
+    async def _pop_any(
+        self, queues: typing.Sequence[str], max_items: int, max_wait: float
+    ) -> typing.Dict[str, typing.List[typing.Tuple[bytes, bytes]]]:
+        """Pop raw items from the first queue, in rotated order, that has any."""
+        offset = self._rotation % len(queues)
+        self._rotation += 1
+        ordered = list(queues[offset:]) + list(queues[:offset])
+
+        for queue in ordered:
+            if entries := await self._pop_entries(queue, max_items, 0):
+                return {queue: entries}
+
+        if max_wait <= 0:
+            return {}
+
+        if self._config.reliable_queue:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + max_wait
+            turn = 0
+
+            # Redis may round a shorter blocking wait down to 0, forever.
+            while (remaining := deadline - loop.time()) >= 0.001:
+                queue = ordered[turn % len(ordered)]
+                turn += 1
+
+                if entries := await self._pop_entries(
+                    queue, max_items, min(remaining, self.RELIABLE_WAIT_SLICE)
+                ):
+                    return {queue: entries}
+
+            return {}
+
+        try:
+            item = await self._redis.brpop(ordered, timeout=max_wait)
+
+        except aioredis.exceptions.RedisError as e:
+            self._logger.error(f"Failed to dequeue {ordered}: {str(e)}")
+
+            raise exceptions.RedisError(f"Failed to dequeue {ordered}: {str(e)}") from e
+
+        if not item:
+            return {}
+
+        queue, payload = item[0].decode(), item[1]
+        entries = [(payload, payload)]
+
+        if max_items > 1:
+            entries += await self._pop_entries(queue, max_items - 1, 0)
+
+        return {queue: entries}
+
+    def _push(
+        self, pipe: aioredis.client.Pipeline, queue: str, payloads: typing.List[bytes]
+    ):
+        pipe.lpush(queue, *payloads)
+
+    def _push_front(
+        self, pipe: aioredis.client.Pipeline, queue: str, payloads: typing.List[bytes]
+    ):
+        # Workers pop from the right, so the first payload goes rightmost.
+        pipe.rpush(queue, *reversed(payloads))
+
+    def _release(self, pipe: aioredis.client.Pipeline, queue: str, receipt: bytes):
+        pipe.lrem(self._processing_key(queue), 1, receipt)
+
+    def _decode(
+        self,
+        model: type[typing.Union[models.SignalMessage, models.CotEvent]],
+        queue: str,
+        receipt: bytes,
+        payload: bytes,
+        trusted: bool = False,
+    ) -> QueueItem:
+        if trusted:
+            item = self._codec.decode_record(model, payload)
+
+        else:
+            item = self._codec.decode(model, payload)
+
+        if self.is_reliable:
+            self._in_flight[id(item)] = (item, queue, receipt)
+
+        return item
+
+    def _queue_key(self, queue: str) -> str:
+        return queue
+
+    def _delayed_key(self, queue: str) -> str:
+        return f"{queue}:delayed"
+
+    def _processing_key(self, queue: str) -> str:
+        return f"{queue}:processing:{self._config.consumer_name}"
+
+    @classmethod
+    def queue_of(cls, model: QueueItem) -> str:
+        """Name of the queue that carries the model's type."""
+        return next(
+            queue
+            for queue, model_type in cls.QUEUE_MODELS.items()
+            if isinstance(model, (model_type, records.MODEL_RECORDS[model_type]))
+        )
+
+    def _encode(self, model: QueueItem) -> bytes:
+        # Records re-enter the queue through the validated models.
+        if not isinstance(model, pydantic.BaseModel):
+            model = model.to_model()
+
+        return self._codec.encode(model)
+
     async def _enqueue_model(
         self, model: typing.Union[models.SignalMessage, models.CotEvent], queue: str
     ):
         try:
-            await self._redis.lpush(queue, model.model_dump_json())
+            async with self._redis.pipeline(transaction=False) as pipe:
+                self._push(pipe, queue, [self._encode(model)])
+
+                await pipe.execute()
 
             self._logger.info(f"Enqueued {model} to {queue}")
 
@@ -88,11 +809,12 @@ class RedisClient:
 
             await self._on_failed_enqueuing(model, queue)
 
-    async def _on_failed_enqueuing(
-        self, model: typing.Union[models.SignalMessage, models.CotEvent], queue: str
-    ):
+    async def _on_failed_enqueuing(self, model: QueueItem, queue: str):
+        if not isinstance(model, pydantic.BaseModel):
+            model = model.to_model()
+
         dead_letter = {
-            "model": model.model_dump(),
+            "model": model.model_dump(mode="json"),
             "queue": queue,
             "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
         }
@@ -114,6 +836,180 @@ class RedisClient:
         await self.disconnect()
 
 
+class RedisStreamClient(RedisClient):
+    """Queue backend on Redis Streams with one consumer group per queue.
+
+    Every replica joins the group under its own consumer name, so entries are
+    partitioned between workers by Redis itself and stay pending until acked.
+    Streams are trimmed to roughly RedisConfig.stream_maxlen entries on XADD.
+    """
+
+    DATA_FIELD = b"data"
+    PROMOTE_SCRIPT = """
+        local items = redis.call(
+            'ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2]
+        )
+        for _, item in ipairs(items) do
+            redis.call('ZREM', KEYS[1], item)
+            redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[3], '*', 'data', item)
+        end
+        return #items
+    """
+
+    async def connect(self):
+        await super().connect()
+
+        for queue in self.QUEUE_MODELS:
+            try:
+                await self._redis.xgroup_create(
+                    self._stream_key(queue),
+                    self._config.consumer_group,
+                    id="0",
+                    mkstream=True,
+                )
+
+            except aioredis.exceptions.ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise exceptions.RedisError(
+                        f"Failed to create consumer group for {queue}: {str(e)}"
+                    ) from e
+
+    @property
+    def is_reliable(self) -> bool:
+        return True
+
+    async def reap_expired(self, queue: str) -> int:
+        """Requeue entries left pending longer than the visibility timeout.
+
+        Entries are claimed with XAUTOCLAIM, which resets their idle time and so
+        cannot be claimed twice, then re-added to the stream and acked.
+
+        Returns:
+            Number of entries moved back to the stream.
+        """
+        stream = self._stream_key(queue)
+        min_idle = int(self._config.visibility_timeout * 1000)
+        cursor = b"0-0"
+        requeued = 0
+
+        try:
+            while True:
+                cursor, claimed, *_ = await self._redis.execute_command(
+                    "XAUTOCLAIM",
+                    stream,
+                    self._config.consumer_group,
+                    self._config.consumer_name,
+                    min_idle,
+                    cursor,
+                    "COUNT",
+                    self._config.batch_size,
+                )
+                # Entries trimmed away while pending come back empty.
+                claimed = [entry for entry in claimed if entry and entry[1]]
+
+                if claimed:
+                    async with self._redis.pipeline() as pipe:
+                        for receipt, fields in claimed:
+                            payload = dict(zip(fields[::2], fields[1::2]))[
+                                self.DATA_FIELD
+                            ]
+
+                            self._push(pipe, queue, [payload])
+                            self._release(pipe, queue, receipt)
+
+                        await pipe.execute()
+
+                    requeued += len(claimed)
+
+                if cursor == b"0-0":
+                    break
+
+        except aioredis.exceptions.RedisError as e:
+            raise exceptions.RedisError(
+                f"Failed to reap expired items on {queue}: {str(e)}"
+            ) from e
+
+        if requeued:
+            self._logger.warning(f"Requeued {requeued} expired items on {queue}")
+
+        return requeued
+
+    async def _pop_entries(
+        self, queue: str, max_items: int, max_wait: float
+    ) -> typing.List[typing.Tuple[bytes, bytes]]:
+        entries = await self._pop_any([queue], max_items, max_wait)
+
+        return entries.get(queue, [])
+
+    async def _pop_any(
+        self, queues: typing.Sequence[str], max_items: int, max_wait: float
+    ) -> typing.Dict[str, typing.List[typing.Tuple[bytes, bytes]]]:
+        """Read new entries of several streams in one XREADGROUP, which serves
+        all of them, so no key rotation is needed."""
+        try:
+            response = await self._redis.xreadgroup(
+                self._config.consumer_group,
+                self._config.consumer_name,
+                {self._stream_key(queue): ">" for queue in queues},
+                count=max_items,
+                # BLOCK 0 means forever, so a zero wait must omit BLOCK instead
+                # and a sub-millisecond one must not round down to it.
+                block=max(1, math.ceil(max_wait * 1000)) if max_wait > 0 else None,
+            )
+
+        except aioredis.exceptions.RedisError as e:
+            self._logger.error(f"Failed to dequeue {list(queues)}: {str(e)}")
+
+            raise exceptions.RedisError(
+                f"Failed to dequeue {list(queues)}: {str(e)}"
+            ) from e
+
+        return {
+            stream.decode().removesuffix(":stream"): [
+                (receipt, fields[self.DATA_FIELD]) for receipt, fields in entries
+            ]
+            for stream, entries in response or []
+            if entries
+        }
+
+    def _push(
+        self, pipe: aioredis.client.Pipeline, queue: str, payloads: typing.List[bytes]
+    ):
+        for payload in payloads:
+            pipe.xadd(
+                self._stream_key(queue),
+                {self.DATA_FIELD: payload},
+                maxlen=self._config.stream_maxlen,
+                approximate=True,
+            )
+
+    def _push_front(
+        self, pipe: aioredis.client.Pipeline, queue: str, payloads: typing.List[bytes]
+    ):
+        self._push(pipe, queue, payloads)
+
+    def _release(self, pipe: aioredis.client.Pipeline, queue: str, receipt: bytes):
+        pipe.xack(self._stream_key(queue), self._config.consumer_group, receipt)
+
+    def _queue_key(self, queue: str) -> str:
+        return self._stream_key(queue)
+
+    def _stream_key(self, queue: str) -> str:
+        return f"{queue}:stream"
+
+
+def create_client(cfg: config.RedisConfig) -> RedisClient:
+    """Build the queue client for the backend selected in the configuration."""
+    backends = {"list": RedisClient, "stream": RedisStreamClient}
+
+    if cfg.backend not in backends:
+        raise exceptions.ConfigurationError(
+            f"Unknown Redis backend {cfg.backend!r}, expected one of {list(backends)}"
+        )
+
+    return backends[cfg.backend](cfg)
+
+
 async def main():
     point = models.GeoLocation(lat=48.8566, lon=2.3522, description="Paris")
     cfg = config.RedisConfig(
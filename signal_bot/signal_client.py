@@ -1,4 +1,5 @@
 import asyncio
+import dataclasses
 import logging
 import typing
 
@@ -6,20 +7,47 @@ import aiohttp
 
 import config
 import exceptions
+import geofence
 import models
 import redis_client
 
 
+@dataclasses.dataclass
+class ConnectionPoolStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+
+        return self.hits / total if total else 0.0
+
+
 class SignalClient:
     def __init__(self, config: config.SignalConfig):
         """Initialize Client for interacting with Signal Messenger REST API"""
         self._config = config
         self._session: typing.Optional[aiohttp.ClientSession] = None
         self._logger = logging.getLogger(__name__)
+        self.pool_stats = ConnectionPoolStats()
 
     async def connect(self):
+        connector = aiohttp.TCPConnector(
+            limit_per_host=self._config.pool_limit_per_host,
+            keepalive_timeout=self._config.keepalive_timeout,
+            ttl_dns_cache=self._config.dns_cache_ttl,
+        )
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+        trace_config.on_connection_create_end.append(self._on_connection_created)
+
         self._session = aiohttp.ClientSession(
-            base_url=self._config.api_url, headers={"Content-Type": "application/json"}
+            base_url=self._config.api_url,
+            headers={"Content-Type": "application/json"},
+            connector=connector,
+            trace_configs=[trace_config],
         )
         self._logger.info("Successfully connected to Signal API")
 
@@ -27,7 +55,22 @@ class SignalClient:
         if self._session:
             await self._session.close()
 
-            self._logger.info("Disconnected from Signal API")
+            self._logger.info(
+                f"Disconnected from Signal API, connection pool hits: "
+                f"{self.pool_stats.hits}, misses: {self.pool_stats.misses}"
+            )
+
+    async def run_pool_stats_logger(self, interval: float):
+        """Periodically log the connection pool hits and misses until
+        cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+
+            self._logger.info(
+                f"Signal API connection pool hits: {self.pool_stats.hits}, "
+                f"misses: {self.pool_stats.misses}, "
+                f"hit ratio: {self.pool_stats.hit_ratio:.2f}"
+            )
 
     async def send_message(self, message: models.SignalMessage):
         """Send GeoLocation through Signal Messenger REST API.
@@ -38,42 +81,90 @@ class SignalClient:
         Raises:
             SignalClientError: If connection fails during send operation.
         """
+        while message.retry_count < self._config.max_reconnect_attempts:
+            if await self.try_send(message):
+                return
+
+            await asyncio.sleep(2**message.retry_count)  # Exponential backoff
+
+        message.status = "failed"
+
+        raise exceptions.SignalClientError(
+            f"Failed to send message after {self._config.max_reconnect_attempts} attempts"
+        )
+
+    async def try_send(self, message: models.SignalMessage) -> bool:
+        """Make a single delivery attempt without any backoff.
+
+        Args:
+            message: Message to send, its retry_count is bumped on failure.
+
+        Returns:
+            True if the message was accepted by the API.
+
+        Raises:
+            SignalClientError: If the client is not connected.
+        """
+        return await self.try_send_many([message])
+
+    async def try_send_many(
+        self,
+        messages: typing.List[models.SignalMessage],
+        recipients: typing.Optional[typing.List[str]] = None,
+    ) -> bool:
+        """Deliver several messages as one multi-line Signal message.
+
+        Args:
+            messages: Messages to merge, one report per line.
+            recipients: Numbers to send to instead of the configured ones.
+
+        Returns:
+            True if the merged message was accepted by the API.
+
+        Raises:
+            SignalClientError: If the client is not connected.
+        """
         if not self._session:
             raise exceptions.SignalClientError("Client not properly connected")
 
-        while message.retry_count < self._config.max_reconnect_attempts:
-            try:
-                async with self._session.post(
-                    "/v2/send",
-                    json={
-                        "recipients": self._config.recipients,
-                        "number": self._config.phone_number,
-                        "message": message.content,
-                    },
-                ) as response:
-                    if 200 <= response.status < 300:
+        message_ids = ", ".join(str(message.message_id) for message in messages)
+
+        try:
+            async with self._session.post(
+                "/v2/send",
+                json={
+                    "recipients": recipients or self._config.recipients,
+                    "number": self._config.phone_number,
+                    "message": "\n".join(message.content for message in messages),
+                },
+            ) as response:
+                if 200 <= response.status < 300:
+                    for message in messages:
                         message.status = "sent"
 
-                        self._logger.info(
-                            f"Message {message.message_id} sent successfully"
-                        )
+                    self._logger.info(f"Message {message_ids} sent successfully")
 
-                        return
+                    return True
 
-            except aiohttp.ClientError as e:
                 self._logger.error(
-                    f"Error sending message {message.message_id}: {str(e)}"
+                    f"Error sending message {message_ids}: HTTP {response.status}"
                 )
 
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._logger.error(
+                f"Error sending message {message_ids}: {str(e) or type(e).__name__}"
+            )
+
+        for message in messages:
             message.retry_count += 1
 
-            await asyncio.sleep(2**message.retry_count)  # Exponential backoff
+        return False
 
-        message.status = "failed"
+    async def _on_connection_reused(self, session, context, params):
+        self.pool_stats.hits += 1
 
-        raise exceptions.SignalClientError(
-            f"Failed to send message after {self._config.max_reconnect_attempts} attempts"
-        )
+    async def _on_connection_created(self, session, context, params):
+        self.pool_stats.misses += 1
 
     async def __aenter__(self):
         await self.connect()
@@ -84,27 +175,268 @@ class SignalClient:
         await self.disconnect()
 
 
+class SignalDispatcher:
+    def __init__(
+        self,
+        client: SignalClient,
+        redis: redis_client.RedisClient,
+        max_in_flight: int,
+        max_attempts: int,
+        router: typing.Optional[geofence.GeofenceRouter] = None,
+    ):
+        """Send messages concurrently while bounding the number in flight.
+
+        Failed attempts are parked in Redis with exponential backoff instead of
+        sleeping, so one slow message never holds up the rest of the queue.
+
+        Args:
+            client: Connected Signal client.
+            redis: Connected queue client the messages were dequeued from.
+            max_in_flight: Maximum number of concurrent send requests.
+            max_attempts: Attempts before a message is dead-lettered.
+            router: Optional geofence router; messages then only go to the
+                recipients subscribed to their location.
+        """
+        self._client = client
+        self._redis = redis
+        self._max_attempts = max_attempts
+        self._router = router
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._tasks: typing.Set[asyncio.Task] = set()
+        self._logger = logging.getLogger(__name__)
+
+    async def dispatch(self, messages: typing.List[models.SignalMessage]):
+        """Start sending messages as one request, waiting only while the window
+        is full.
+
+        With a router the messages are split into one request per set of
+        subscribed recipients, and messages nobody subscribed to are acked
+        without sending.
+        """
+        if self._router is None:
+            await self._start(messages, None)
+
+            return
+
+        groups: typing.Dict[
+            typing.Tuple[str, ...], typing.List[models.SignalMessage]
+        ] = {}
+        unrouted = []
+
+        for message in messages:
+            recipients = self._router.recipients(message.geolocation)
+
+            if recipients is None:
+                groups.setdefault((), []).append(message)
+
+            elif recipients:
+                groups.setdefault(tuple(recipients), []).append(message)
+
+            else:
+                unrouted.append(message)
+
+        if unrouted:
+            await self._redis.ack_many(unrouted)
+
+        for recipients, group in groups.items():
+            await self._start(group, list(recipients) or None)
+
+    async def _start(
+        self,
+        messages: typing.List[models.SignalMessage],
+        recipients: typing.Optional[typing.List[str]],
+    ):
+        await self._semaphore.acquire()
+
+        task = asyncio.create_task(self._send(messages, recipients))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def drain(self):
+        """Wait for all in-flight sends to finish."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _send(
+        self,
+        messages: typing.List[models.SignalMessage],
+        recipients: typing.Optional[typing.List[str]],
+    ):
+        try:
+            if await self._client.try_send_many(messages, recipients):
+                await self._redis.ack_many(messages)
+
+                return
+
+            for message in messages:
+                if message.retry_count < self._max_attempts:
+                    await self._redis.schedule_retry(message, 2**message.retry_count)
+                    continue
+
+                message.status = "failed"
+
+                self._logger.error(
+                    f"Failed to send message {message.message_id} after "
+                    f"{self._max_attempts} attempts"
+                )
+
+                await self._redis.nack(message, requeue=False)
+
+        except exceptions.SignalBotError as e:
+            self._logger.error(f"Error dispatching messages: {str(e)}")
+
+        finally:
+            self._semaphore.release()
+
+
+class SignalCoalescer:
+    def __init__(self, redis: redis_client.RedisClient, cfg: config.SignalConfig):
+        """Group location reports that arrive close together into one send.
+
+        A batch opens with the first dequeued message and closes when the
+        coalescing window elapses or the report or character cap is reached.
+
+        Args:
+            redis: Connected queue client to pull messages from.
+            cfg: Signal configuration with the coalescing limits.
+        """
+        self._redis = redis
+        self._window = cfg.coalesce_window_ms / 1000
+        self._max_reports = cfg.coalesce_max_reports
+        self._max_chars = cfg.coalesce_max_chars
+        self._pending: typing.List[models.SignalMessage] = []
+        self._deadline = 0.0
+
+    async def next_batch(self) -> typing.List[models.SignalMessage]:
+        """Collect the next batch, empty if nothing arrived within the block
+        timeout.
+
+        Reports left over from a batch cut at the character cap keep the
+        window they arrived in, so they are sent without waiting again.
+        """
+        loop = asyncio.get_running_loop()
+        batch, self._pending = self._pending, []
+        deadline = self._deadline
+
+        if not batch:
+            batch = await self._redis.dequeue_many(
+                redis_client.RedisClient.SIGNAL_QUEUE, self._max_reports
+            )
+            deadline = self._deadline = loop.time() + self._window
+
+        if not batch:
+            return batch
+
+        while len(batch) < self._max_reports:
+            remaining = deadline - loop.time()
+
+            # Redis may round a shorter blocking wait down to 0, which means
+            # blocking forever.
+            if remaining < 0.001:
+                break
+
+            batch += await self._redis.dequeue_many(
+                redis_client.RedisClient.SIGNAL_QUEUE,
+                self._max_reports - len(batch),
+                remaining,
+            )
+
+        return self._cut(batch)
+
+    def _cut(
+        self, batch: typing.List[models.SignalMessage]
+    ) -> typing.List[models.SignalMessage]:
+        size = len(batch[0].content)
+        count = 1
+
+        while count < len(batch):
+            size += len(batch[count].content) + 1  # Joined with a newline
+
+            if size > self._max_chars:
+                break
+
+            count += 1
+
+        self._pending = batch[count:]
+
+        return batch[:count]
+
+
+async def run_sender(
+    cfg: config.SignalConfig,
+    redis: redis_client.RedisClient,
+    router: typing.Optional[geofence.GeofenceRouter] = None,
+):
+    """Send queued messages until cancelled, draining in-flight sends on exit.
+
+    Args:
+        cfg: Signal configuration.
+        redis: Connected queue client to pull messages from.
+        router: Optional geofence router for the dispatcher.
+    """
+    async with SignalClient(cfg) as client:
+        dispatcher = SignalDispatcher(
+            client, redis, cfg.max_in_flight, cfg.max_reconnect_attempts, router
+        )
+
+        if cfg.pool_stats_interval > 0:
+            stats_logger = asyncio.create_task(
+                client.run_pool_stats_logger(cfg.pool_stats_interval)
+            )
+
+        try:
+            if cfg.coalesce_window_ms > 0:
+                coalescer = SignalCoalescer(redis, cfg)
+
+                while True:
+                    if batch := await coalescer.next_batch():
+                        await dispatcher.dispatch(batch)
+
+            while True:
+                messages = await redis.dequeue_many(
+                    redis_client.RedisClient.SIGNAL_QUEUE
+                )
+
+                for message in messages:
+                    await dispatcher.dispatch([message])
+
+        finally:
+            if cfg.pool_stats_interval > 0:
+                stats_logger.cancel()
+
+            await dispatcher.drain()
+
+
 async def main():
     cfg = config.load_config()
 
-    redis = redis_client.RedisClient(cfg.redis)
+    redis = redis_client.create_client(cfg.redis)
 
     await redis.connect()
 
-    try:
-        while True:
-            message = await redis.dequeue_signal_message()
+    if redis.is_reliable:
+        reaper = asyncio.create_task(
+            redis.run_reaper(redis_client.RedisClient.SIGNAL_QUEUE)
+        )
+
+    scheduler = asyncio.create_task(
+        redis.run_retry_scheduler(redis_client.RedisClient.SIGNAL_QUEUE)
+    )
 
-            if not message:
-                continue
+    try:
+        router = await geofence.create_router(cfg.geofence, redis)
 
-            async with SignalClient(cfg.signal) as client:
-                await client.send_message(message)
+        await run_sender(cfg.signal, redis, router)
 
     except KeyboardInterrupt:
         pass
 
     finally:
+        scheduler.cancel()
+
+        if redis.is_reliable:
+            reaper.cancel()
+
         await redis.disconnect()
 
 
@@ -0,0 +1,292 @@
+import asyncio
+import dataclasses
+import datetime
+import json
+import logging
+import random
+import re
+import typing
+import urllib.parse
+
+import aiohttp
+
+import config
+import cot_formatter
+import exceptions
+import ingest
+import models
+import redis_client
+import throttle
+
+# Coordinates in shared-location links, as (lat, lon) pairs:
+# maps.google.com/maps?q=lat,lon (Signal's own location sharing),
+# google.com/maps/@lat,lon,zoom, geo:lat,lon URIs, Apple Maps ?ll=lat,lon and
+# OpenStreetMap ?mlat=lat&mlon=lon.
+_COORDINATE = r"(-?\d{1,3}(?:\.\d+)?)"
+LOCATION_URL_PATTERNS = [
+    re.compile(rf"https?://\S*?[?&](?:q|query|ll)={_COORDINATE},\s*{_COORDINATE}"),
+    re.compile(rf"https?://\S*?/@{_COORDINATE},{_COORDINATE}"),
+    re.compile(rf"\bgeo:{_COORDINATE},{_COORDINATE}"),
+    re.compile(rf"https?://\S*?[?&]mlat={_COORDINATE}&mlon={_COORDINATE}"),
+]
+_URL = re.compile(r"\S*(?:https?://|geo:)\S*")
+
+# Seconds between checks for held-back updates when nothing is received.
+THROTTLE_RELEASE_INTERVAL = 0.1
+
+
+@dataclasses.dataclass
+class ReceiverStats:
+    envelopes: int = 0
+    locations: int = 0
+    ignored: int = 0
+    reconnects: int = 0
+
+
+def parse_location(
+    text: str, sender: typing.Optional[str] = None
+) -> typing.Optional[models.GeoLocation]:
+    """Read a location from a message text, None if it holds none.
+
+    Shared-location links are looked for first; the text around the link
+    (usually the address line) or else the sender becomes the description.
+    Otherwise the whole text is read as a "<lon> <lat> <description>" report.
+
+    Raises:
+        MessageValidationError: If coordinates are found but out of range.
+    """
+    unquoted = urllib.parse.unquote(text)
+
+    for pattern in LOCATION_URL_PATTERNS:
+        if match := pattern.search(unquoted):
+            description = " ".join(_URL.sub(" ", unquoted).split()) or sender
+
+            try:
+                return models.GeoLocation(
+                    lat=float(match.group(1)),
+                    lon=float(match.group(2)),
+                    description=description,
+                )
+
+            except ValueError as e:
+                raise exceptions.MessageValidationError(
+                    f"Invalid shared location {match.group(0)!r}: {str(e)}"
+                ) from e
+
+    try:
+        point = ingest.parse_line(text.encode("utf-8"))
+
+    except exceptions.MessageValidationError:
+        # Most messages are chat, not reports.
+        return None
+
+    if point is not None and point.description is None:
+        point.description = sender
+
+    return point
+
+
+class SignalReceiver:
+    def __init__(
+        self,
+        cfg: config.SignalConfig,
+        redis: redis_client.RedisClient,
+        positions: typing.Optional[throttle.PositionThrottle] = None,
+    ):
+        """Receive location reports sent to the bot's Signal number.
+
+        Keeps one websocket open to signal-cli-rest-api's receive endpoint,
+        which pushes messages as they arrive when the API runs in json-rpc
+        mode, and reconnects with jittered backoff when it drops. Locations
+        pass through a bounded in-memory queue to a single enqueuer that
+        pushes whatever has accumulated to tak:events in one round-trip, so a
+        burst costs one LPUSH while a lone report is queued immediately. A
+        full queue stops reading from the websocket.
+
+        Args:
+            cfg: Signal configuration; receive_allowed_senders limits whose
+                reports are accepted, everyone's when empty.
+            redis: Connected queue client.
+            positions: Optional throttle applied before enqueueing.
+        """
+        self._cfg = cfg
+        self._redis = redis
+        self._positions = positions
+        self._formatter = cot_formatter.CotFormatter()
+        self._points: asyncio.Queue = asyncio.Queue(cfg.receive_queue_size)
+        self._allowed = set(cfg.receive_allowed_senders)
+        self._logger = logging.getLogger(__name__)
+        self.stats = ReceiverStats()
+
+    async def run(self):
+        """Receive and enqueue reports until cancelled."""
+        enqueuer = asyncio.create_task(self._enqueue())
+        attempt = 0
+
+        try:
+            async with aiohttp.ClientSession(base_url=self._cfg.api_url) as session:
+                while True:
+                    try:
+                        await self._receive(session)
+                        attempt = 0
+
+                    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                        self._logger.error(f"Signal receive connection failed: {e!r}")
+
+                    delay = random.uniform(
+                        0, min(self._cfg.receive_backoff_max, 2**attempt)
+                    )
+                    attempt += 1
+                    self.stats.reconnects += 1
+
+                    await asyncio.sleep(delay)
+
+        finally:
+            enqueuer.cancel()
+
+            await asyncio.gather(enqueuer, return_exceptions=True)
+
+    async def handle(self, envelope: dict):
+        """Queue the location carried by a received envelope, if any.
+
+        Raises:
+            ValueError: If the envelope does not have the expected shape.
+        """
+        self.stats.envelopes += 1
+        point = self._parse(envelope)
+
+        if point is None:
+            self.stats.ignored += 1
+
+            return
+
+        self.stats.locations += 1
+
+        await self._points.put(point)
+
+    async def _receive(self, session: aiohttp.ClientSession):
+        async with session.ws_connect(
+            f"/v1/receive/{self._cfg.phone_number}", heartbeat=30
+        ) as ws:
+            self._logger.info("Receiving Signal messages over websocket")
+
+            async for message in ws:
+                if message.type == aiohttp.WSMsgType.ERROR:
+                    raise ws.exception() or aiohttp.ClientError("websocket error")
+
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    continue
+
+                try:
+                    await self.handle(json.loads(message.data))
+
+                except ValueError as e:
+                    self._logger.warning(f"Skipping malformed envelope: {str(e)}")
+
+        self._logger.warning("Signal receive websocket closed")
+
+    def _parse(self, envelope: dict) -> typing.Optional[models.GeoLocation]:
+        if isinstance(envelope, dict):
+            envelope = envelope.get("envelope", envelope)
+
+        if not isinstance(envelope, dict):
+            raise ValueError(f"expected an object, got {type(envelope).__name__}")
+
+        data = envelope.get("dataMessage") or {}
+        text = data.get("message") if isinstance(data, dict) else None
+        sender = envelope.get("sourceNumber") or envelope.get("source")
+        timestamp = envelope.get("timestamp")
+
+        if not isinstance(text, (str, type(None))):
+            raise ValueError(f"expected a text message, got {type(text).__name__}")
+
+        if isinstance(timestamp, bool) or not isinstance(
+            timestamp, (int, float, type(None))
+        ):
+            raise ValueError(f"invalid timestamp {timestamp!r}")
+
+        if not text or (self._allowed and sender not in self._allowed):
+            return None
+
+        try:
+            point = parse_location(text, envelope.get("sourceName") or sender)
+
+        except exceptions.MessageValidationError as e:
+            self._logger.warning(f"Ignoring location from {sender}: {str(e)}")
+
+            return None
+
+        if point is not None and timestamp:
+            try:
+                point.timestamp = datetime.datetime.fromtimestamp(
+                    timestamp / 1000, datetime.timezone.utc
+                )
+
+            except (OverflowError, OSError) as e:
+                raise ValueError(f"invalid timestamp {timestamp!r}") from e
+
+        return point
+
+    async def _enqueue(self):
+        while True:
+            points = await self._next_points()
+
+            try:
+                if self._positions is not None:
+                    points = await self._positions.filter(points)
+                    points += await self._positions.pop_due()
+
+                if not points:
+                    continue
+
+                await self._redis.enqueue_many(
+                    redis_client.RedisClient.TAK_QUEUE,
+                    [self._formatter.create_event(point) for point in points],
+                )
+
+            except exceptions.SignalBotError as e:
+                self._logger.error(
+                    f"Failed to enqueue {len(points)} received locations: {str(e)}"
+                )
+
+    async def _next_points(self) -> typing.List[models.GeoLocation]:
+        if self._positions is None:
+            points = [await self._points.get()]
+
+        else:
+            # Wake up now and then to release held-back updates.
+            try:
+                points = [
+                    await asyncio.wait_for(
+                        self._points.get(), THROTTLE_RELEASE_INTERVAL
+                    )
+                ]
+
+            except asyncio.TimeoutError:
+                return []
+
+        while not self._points.empty() and len(points) < self._cfg.receive_queue_size:
+            points.append(self._points.get_nowait())
+
+        return points
+
+
+async def main():
+    cfg = config.load_config()
+
+    async with redis_client.create_client(cfg.redis) as redis:
+        positions = (
+            throttle.PositionThrottle(cfg.throttle, redis)
+            if cfg.throttle.enabled
+            else None
+        )
+
+        try:
+            await SignalReceiver(cfg.signal, redis, positions).run()
+
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
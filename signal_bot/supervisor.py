@@ -0,0 +1,215 @@
+import asyncio
+import ctypes
+import dataclasses
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+import typing
+
+import config
+import tak_worker
+
+Target = typing.Callable[[], typing.Awaitable[None]]
+
+
+@dataclasses.dataclass
+class SupervisorStats:
+    started: int = 0
+    restarts: int = 0
+    unhealthy: int = 0
+
+
+@dataclasses.dataclass
+class _Child:
+    process: multiprocessing.Process
+    heartbeat: ctypes.c_double
+    started: float
+    failures: int = 0
+    restart_at: typing.Optional[float] = None
+
+
+class Supervisor:
+    def __init__(self, cfg: config.SupervisorConfig, target: Target = tak_worker.main):
+        """Run a queue worker in several processes and keep them running.
+
+        Each child is forked with its own event loop, Redis and TAK
+        connections, and REDIS_CONSUMER_NAME suffixed with its index, so the
+        stream backend's consumer group spreads the queue over the children.
+        Children ping a shared heartbeat from their event loop; one that exits
+        or misses heartbeats for heartbeat_timeout seconds is killed and
+        restarted with exponential backoff. On shutdown the children get
+        SIGTERM and drain_timeout seconds to settle their batch.
+
+        Args:
+            cfg: Supervisor configuration; processes 0 starts one per core.
+            target: Coroutine function run in each child. It must return
+                once it has drained after SIGTERM.
+        """
+        self._cfg = cfg
+        self._target = target
+        self._context = multiprocessing.get_context("fork")
+        self._children: typing.List[typing.Optional[_Child]] = [None] * (
+            cfg.processes or os.cpu_count() or 1
+        )
+        self._stopping = False
+        self._logger = logging.getLogger(__name__)
+        self.stats = SupervisorStats()
+
+    @property
+    def processes(self) -> typing.List[multiprocessing.Process]:
+        """Current process of each child slot."""
+        return [child.process for child in self._children if child]
+
+    def run(self):
+        """Supervise the children until SIGTERM or SIGINT, then drain them."""
+        signal.signal(signal.SIGTERM, self._on_signal)
+        signal.signal(signal.SIGINT, self._on_signal)
+
+        self.start()
+
+        try:
+            while not self._stopping:
+                time.sleep(self._cfg.heartbeat_interval)
+                self.check()
+
+        finally:
+            self.stop()
+
+    def start(self):
+        for index in range(len(self._children)):
+            self._spawn(index)
+
+        self._logger.info(f"Started {len(self._children)} worker processes")
+
+    def check(self):
+        """Restart children that exited or stopped sending heartbeats."""
+        now = time.monotonic()
+
+        for index, child in enumerate(self._children):
+            if child.restart_at is not None:
+                if now >= child.restart_at:
+                    self._spawn(index, child.failures)
+                    self.stats.restarts += 1
+
+                continue
+
+            if child.process.is_alive():
+                if now - child.heartbeat.value <= self._cfg.heartbeat_timeout:
+                    if now - child.started > self._cfg.restart_backoff_max:
+                        child.failures = 0
+
+                    continue
+
+                self._logger.error(
+                    f"Worker {index} (pid {child.process.pid}) missed heartbeats "
+                    f"for {now - child.heartbeat.value:.1f}s, killing it"
+                )
+                self.stats.unhealthy += 1
+
+                child.process.kill()
+
+            child.process.join()
+
+            delay = min(self._cfg.restart_backoff_max, 2**child.failures - 1)
+            child.failures += 1
+            child.restart_at = now + delay
+
+            self._logger.error(
+                f"Worker {index} (pid {child.process.pid}) exited with code "
+                f"{child.process.exitcode}, restarting in {delay:.0f}s"
+            )
+
+    def stop(self):
+        """Send SIGTERM to the children and kill those still running after
+        drain_timeout."""
+        processes = [
+            child.process
+            for child in self._children
+            if child and child.restart_at is None and child.process.is_alive()
+        ]
+
+        for process in processes:
+            process.terminate()
+
+        deadline = time.monotonic() + self._cfg.drain_timeout
+
+        for process in processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+
+            if process.is_alive():
+                self._logger.warning(
+                    f"Worker pid {process.pid} did not drain in "
+                    f"{self._cfg.drain_timeout}s, killing it"
+                )
+
+                process.kill()
+                process.join()
+
+        self._logger.info(f"Stopped {len(processes)} worker processes")
+
+    def _spawn(self, index: int, failures: int = 0):
+        heartbeat = self._context.Value("d", time.monotonic(), lock=False)
+        process = self._context.Process(
+            target=_child_main,
+            args=(self._target, index, heartbeat, self._cfg.heartbeat_interval),
+            name=f"worker-{index}",
+        )
+        process.start()
+
+        self._children[index] = _Child(process, heartbeat, time.monotonic(), failures)
+        self.stats.started += 1
+
+    def _on_signal(self, signum: int, frame):
+        self._stopping = True
+
+
+def _child_main(
+    target: Target,
+    index: int,
+    heartbeat: ctypes.c_double,
+    interval: float,
+):
+    # Ctrl-C reaches the whole process group; the supervisor passes it on as
+    # SIGTERM once, so children ignore it and drop the inherited handlers.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    name = os.environ.get("REDIS_CONSUMER_NAME") or socket.gethostname()
+    os.environ["REDIS_CONSUMER_NAME"] = f"{name}-{index}"
+
+    asyncio.run(_serve(target, heartbeat, interval))
+
+
+async def _serve(
+    target: Target,
+    heartbeat: ctypes.c_double,
+    interval: float,
+):
+    pinger = asyncio.create_task(_ping(heartbeat, interval))
+
+    try:
+        await target()
+
+    finally:
+        pinger.cancel()
+
+
+async def _ping(heartbeat: ctypes.c_double, interval: float):
+    # Pinging from the event loop also catches a loop stuck on CPU-bound work.
+    while True:
+        heartbeat.value = time.monotonic()
+
+        await asyncio.sleep(interval)
+
+
+def main():
+    cfg = config.load_config()
+
+    Supervisor(cfg.supervisor).run()
+
+
+if __name__ == "__main__":
+    main()
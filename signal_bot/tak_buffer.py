@@ -0,0 +1,249 @@
+import asyncio
+import collections
+import logging
+import os
+import struct
+import typing
+
+import cot_formatter
+import exceptions
+import models
+import queue_codec
+import records
+
+
+class SpillFile:
+    """Append-only file of events that did not fit in the memory buffer.
+
+    Each entry is a little-endian uint32 length followed by a BinaryCodec
+    payload. Entries are read back in order from an in-memory offset and the
+    file is truncated once it has been read to the end. Entries left over from
+    a previous run are replayed first; a torn entry at the tail is cut off.
+    """
+
+    _LENGTH = struct.Struct("<I")
+
+    def __init__(self, path: str, max_bytes: int):
+        """Open or create the spill file.
+
+        Args:
+            path: File to spill events to.
+            max_bytes: Size the file may not grow beyond.
+        """
+        self._path = path
+        self._max_bytes = max_bytes
+        self._codec = queue_codec.BinaryCodec()
+        self._file = open(path, "a+b")
+        self._offset = 0
+        self._count = self._recover()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, event: cot_formatter.CotEventLike) -> bool:
+        """Append event to the file, False if it would exceed max_bytes."""
+        payload = self._encode(event)
+        size = self._file.seek(0, os.SEEK_END)
+
+        if size + self._LENGTH.size + len(payload) > self._max_bytes:
+            return False
+
+        self._file.write(self._LENGTH.pack(len(payload)) + payload)
+        self._file.flush()
+        self._count += 1
+
+        return True
+
+    def pop(self) -> records.CotEventRecord:
+        """Read the oldest unread event.
+
+        Raises:
+            MessageValidationError: If the entry cannot be decoded.
+        """
+        self._file.seek(self._offset)
+        (length,) = self._LENGTH.unpack(self._file.read(self._LENGTH.size))
+        payload = self._file.read(length)
+
+        self._offset += self._LENGTH.size + length
+        self._count -= 1
+
+        if not self._count:
+            self._file.truncate(0)
+            self._offset = 0
+
+        return self._codec.decode_record(models.CotEvent, payload)
+
+    def close(self, pending: typing.Iterable[cot_formatter.CotEventLike] = ()):
+        """Close the file, writing pending events ahead of the unread entries.
+
+        Args:
+            pending: Older events still held in memory, in send order.
+        """
+        self._file.seek(self._offset)
+        unread = self._file.read()
+        head = b"".join(
+            self._LENGTH.pack(len(payload)) + payload
+            for payload in map(self._encode, pending)
+        )
+
+        if head:
+            with open(f"{self._path}.tmp", "wb") as file:
+                file.write(head + unread)
+
+            os.replace(f"{self._path}.tmp", self._path)
+
+        elif self._offset:
+            self._file.truncate(0)
+            self._file.write(unread)
+
+        self._file.close()
+
+    def _encode(self, event: cot_formatter.CotEventLike) -> bytes:
+        if isinstance(event, records.CotEventRecord):
+            # The codec only reads attributes; the point may still be a model.
+            event = models.CotEvent.model_construct(
+                **{name: getattr(event, name) for name in event.__slots__}
+            )
+
+        return self._codec.encode(event)
+
+    def _recover(self) -> int:
+        self._file.seek(0)
+        data = self._file.read()
+        count = offset = 0
+
+        while offset + self._LENGTH.size <= len(data):
+            (length,) = self._LENGTH.unpack_from(data, offset)
+
+            if offset + self._LENGTH.size + length > len(data):
+                break
+
+            offset += self._LENGTH.size + length
+            count += 1
+
+        if offset < len(data):
+            self._file.truncate(offset)
+
+        return count
+
+
+class WriteBuffer:
+    def __init__(
+        self,
+        max_events: int,
+        spill_path: typing.Optional[str] = None,
+        spill_max_bytes: int = 64 * 1024 * 1024,
+    ):
+        """Bounded FIFO of events waiting for a TAK server connection.
+
+        Events are held in memory up to max_events. With a spill path, events
+        past that go to disk and are loaded back in order as memory frees up,
+        and whatever is left on close is kept there for the next run. Events
+        are taken out for writing and requeued at the head if the write is
+        lost with the connection.
+
+        Args:
+            max_events: Maximum number of events held in memory.
+            spill_path: Optional file to spill overflowing events to.
+            spill_max_bytes: Size limit of the spill file.
+        """
+        self._events: typing.Deque[cot_formatter.CotEventLike] = collections.deque()
+        self._max_events = max_events
+        self._spill = SpillFile(spill_path, spill_max_bytes) if spill_path else None
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._logger = logging.getLogger(__name__)
+
+        self._refill()
+        self._update()
+        self._writable.set()
+
+        if self._spill is not None and self._events:
+            self._logger.info(f"Recovered {len(self)} spilled TAK events")
+
+    def __len__(self) -> int:
+        return len(self._events) + (len(self._spill) if self._spill else 0)
+
+    def put_nowait(self, event: cot_formatter.CotEventLike) -> bool:
+        """Add event to the tail, False if both memory and disk are full."""
+        # Once events spill, later ones follow them to disk to keep the order.
+        if not self._spill and len(self._events) < self._max_events:
+            self._events.append(event)
+
+        elif self._spill is None or not self._spill.append(event):
+            self._writable.clear()
+
+            return False
+
+        self._update()
+
+        return True
+
+    async def put(self, event: cot_formatter.CotEventLike, timeout: float):
+        """Add event to the tail, waiting up to timeout for room.
+
+        Raises:
+            TakBackpressureError: If the buffer stays full for timeout seconds.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        while not self.put_nowait(event):
+            try:
+                await asyncio.wait_for(
+                    self._writable.wait(), max(deadline - loop.time(), 0)
+                )
+
+            except asyncio.TimeoutError:
+                raise exceptions.TakBackpressureError(
+                    f"TAK write buffer full with {len(self)} events"
+                )
+
+    def get_nowait(self) -> typing.Optional[cot_formatter.CotEventLike]:
+        """Take the oldest event, None when empty."""
+        if not self._events:
+            return None
+
+        event = self._events.popleft()
+
+        self._refill()
+        self._update()
+        self._writable.set()
+
+        return event
+
+    def requeue(self, events: typing.Sequence[cot_formatter.CotEventLike]):
+        """Put taken but unsent events back at the head, in their order.
+
+        Requeued events may take memory past max_events until they are sent.
+        """
+        self._events.extendleft(reversed(events))
+        self._update()
+
+    async def wait(self):
+        """Wait until there is an event to send."""
+        await self._readable.wait()
+
+    def close(self):
+        """Persist unsent in-memory events to the spill file, if any."""
+        if self._spill is not None:
+            self._spill.close(self._events)
+            self._events.clear()
+
+        elif self._events:
+            self._logger.warning(f"Discarding {len(self._events)} unsent TAK events")
+
+    def _refill(self):
+        while self._spill and len(self._events) < self._max_events:
+            try:
+                self._events.append(self._spill.pop())
+
+            except exceptions.MessageValidationError as e:
+                self._logger.error(f"Skipping unreadable spilled event: {str(e)}")
+
+    def _update(self):
+        if self._events:
+            self._readable.set()
+
+        else:
+            self._readable.clear()
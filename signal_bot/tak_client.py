@@ -1,67 +1,522 @@
+import xml.etree.ElementTree as ET
 import asyncio
+import collections
+import dataclasses
 import logging
+import random
 import typing
 
 import config
 import cot_formatter
 import exceptions
 import models
+import records
+import tak_buffer
+import tak_protobuf
+import tak_tls
+import tak_udp
+
+Encoder = typing.Callable[[cot_formatter.CotEventLike, bool], bytes]
+
+
+@dataclasses.dataclass
+class TakClientStats:
+    sent: int = 0
+    connection_drops: int = 0
 
 
 class TakClient:
-    def __init__(self, cfg: config.TakConfig):
+    PROTOCOL_XML = "xml"
+    PROTOCOL_PROTOBUF = "protobuf"
+    PROTOCOL_NEGOTIATE = "negotiate"
+    # How often an idle flusher checks whether the transport has sent its data.
+    CONFIRM_INTERVAL = 0.05
+
+    def __init__(self, cfg: config.TakConfig, encoder: typing.Optional[Encoder] = None):
         """Initialize client for connecting to TAK server and sending CoT messages over TCP.
 
         Args:
             cfg: TAK server configuration parameters.
+            encoder: Optional callable encoding an event for XML (False) or
+                protobuf (True), to share encoded events between clients.
+
+        Raises:
+            ConfigurationError: If cfg.protocol is not a supported protocol,
+                the server URL scheme is unknown or the TLS files are invalid.
         """
+        if cfg.protocol not in (
+            self.PROTOCOL_XML,
+            self.PROTOCOL_PROTOBUF,
+            self.PROTOCOL_NEGOTIATE,
+        ):
+            raise exceptions.ConfigurationError(
+                f"Unknown TAK protocol {cfg.protocol!r}, "
+                "expected 'xml', 'protobuf' or 'negotiate'"
+            )
+
         self._cfg = cfg
-        self._formatter = cot_formatter.CotFormatter()
+        scheme, self._host = tak_tls.split_url(cfg.server_url)
+
+        if scheme == tak_tls.SCHEME_UDP:
+            raise exceptions.ConfigurationError(
+                "udp:// TAK servers are served by TakUdpClient"
+            )
+
+        self._ssl_context = (
+            tak_tls.create_context(cfg) if scheme == tak_tls.SCHEME_SSL else None
+        )
+        self._formatter = cot_formatter.CotFormatter(cfg.cot_serializer)
+        self._protobuf_formatter = tak_protobuf.TakProtobufFormatter()
+        self._encoder = encoder
+        self._use_protobuf = False
+        self.stats = TakClientStats()
         self._logger = logging.getLogger(__name__)
         self._reader: typing.Optional[asyncio.StreamReader] = None
         self._writer: typing.Optional[asyncio.StreamWriter] = None
+        self._buffer: typing.Optional[tak_buffer.WriteBuffer] = None
+        self._supervisor: typing.Optional[asyncio.Task] = None
+        self._flushed: typing.Optional[asyncio.Event] = None
+        self._behind_since: typing.Optional[float] = None
+        self._reconnect_attempt = 0
+        # Taken from the buffer but not yet written, and written but still in
+        # the transport buffer, keyed by the end offset of their write.
+        self._collected: typing.List[cot_formatter.CotEventLike] = []
+        self._unconfirmed: typing.Deque[
+            typing.Tuple[int, typing.List[cot_formatter.CotEventLike]]
+        ] = collections.deque()
+        self._written = 0
 
     async def connect(self):
         retry_count = 0
 
-        while retry_count < self._cfg.max_reconnect_attempts:
-            self._logger.info(
-                f"Connecting to TAK server at {self._cfg.server_url}:{self._cfg.port}"
-            )
-
+        while True:
             try:
-                self._reader, self._writer = await asyncio.wait_for(
-                    asyncio.open_connection(
-                        host=self._cfg.server_url, port=self._cfg.port
-                    ),
-                    timeout=self._cfg.connection_timeout,
-                )
-                self._logger.info("Successfully connected to TAK server")
+                await self._open()
                 return
 
-            except (ConnectionError, asyncio.TimeoutError) as e:
+            except (OSError, asyncio.TimeoutError) as e:
                 self._logger.error(f"Connection attempt {retry_count} failed: {str(e)}")
 
             retry_count += 1
 
-            await asyncio.sleep(2**retry_count)
+            if retry_count >= self._cfg.max_reconnect_attempts:
+                break
+
+            await asyncio.sleep(self._backoff_delay(retry_count))
 
         raise exceptions.TakClientError(
             "Failed to connect to TAK server after maximum attempts"
         )
 
+    async def start(self):
+        """Start a supervised connection that outlives server restarts.
+
+        Events passed to submit() are buffered and written by a background
+        task, which reconnects with jittered exponential backoff whenever the
+        connection drops. Events are coalesced into writes of up to
+        flush_max_bytes, and only drained past the transport high-water mark.
+        Events whose bytes are still in the transport buffer when the
+        connection drops go back to the buffer and are sent again on reconnect.
+        """
+        self._buffer = tak_buffer.WriteBuffer(
+            self._cfg.buffer_max_events,
+            self._cfg.buffer_spill_path,
+            self._cfg.buffer_spill_max_bytes,
+        )
+        self._flushed = asyncio.Event()
+
+        if len(self._buffer):
+            self._behind_since = asyncio.get_running_loop().time()
+
+        else:
+            self._flushed.set()
+
+        self._supervisor = asyncio.create_task(self._supervise())
+
+    async def stop(self, timeout: typing.Optional[float] = None):
+        """Stop the supervised connection, giving the buffer time to flush.
+
+        Args:
+            timeout: Seconds to wait for buffered events to be written,
+                defaults to the connection timeout. Events still unsent are
+                kept in the spill file if one is configured.
+        """
+        if not self._supervisor:
+            return
+
+        try:
+            await asyncio.wait_for(
+                self._flushed.wait(),
+                timeout=self._cfg.connection_timeout if timeout is None else timeout,
+            )
+
+        except asyncio.TimeoutError:
+            self._logger.warning(
+                f"Stopping with {len(self._buffer)} TAK events still buffered"
+            )
+
+        # Before Python 3.12, wait_for drops a cancel that arrives just as
+        # the connection attempt fails, so keep cancelling until it lands.
+        while not self._supervisor.done():
+            self._supervisor.cancel()
+            await asyncio.wait({self._supervisor}, timeout=0.1)
+
+        await asyncio.gather(self._supervisor, return_exceptions=True)
+        self._supervisor = None
+
+        self._buffer.close()
+        await self.disconnect()
+
+    async def submit(self, event: cot_formatter.CotEventLike):
+        """Queue a CoT event for the supervised connection.
+
+        Args:
+            event: Event, or its record, to send.
+
+        Raises:
+            TakClientError: If the supervised connection was not started.
+            TakBackpressureError: If the buffer stayed full for the configured
+                backpressure timeout, the caller should leave the event queued.
+        """
+        if not self._supervisor:
+            raise exceptions.TakClientError("Supervised connection is not started")
+
+        await self._buffer.put(event, self._cfg.backpressure_timeout)
+        self._on_submitted()
+
+    async def submit_many(
+        self, events: typing.Sequence[cot_formatter.CotEventLike]
+    ) -> int:
+        """Queue CoT events in order, stopping at the first one refused.
+
+        Returns:
+            Number of events accepted, the rest should stay queued upstream.
+
+        Raises:
+            TakClientError: If the supervised connection was not started.
+        """
+        for accepted, event in enumerate(events):
+            try:
+                await self.submit(event)
+
+            except exceptions.TakBackpressureError as e:
+                self._logger.warning(f"{str(e)}, deferring {len(events) - accepted}")
+
+                return accepted
+
+        return len(events)
+
+    def submit_nowait(self, event: cot_formatter.CotEventLike) -> bool:
+        """Queue a CoT event without waiting for room.
+
+        Returns:
+            False if the write buffer is full.
+
+        Raises:
+            TakClientError: If the supervised connection was not started.
+        """
+        if not self._supervisor:
+            raise exceptions.TakClientError("Supervised connection is not started")
+
+        if not self._buffer.put_nowait(event):
+            return False
+
+        self._on_submitted()
+
+        return True
+
+    @property
+    def servers(self) -> typing.List[str]:
+        """Name of the server, as "host:port" without the URL scheme, the way
+        geofence areas and TakFanOut refer to it."""
+        return [f"{self._host}:{self._cfg.port}"]
+
+    @property
+    def buffered(self) -> int:
+        """Number of events waiting in the write buffer."""
+        return len(self._buffer) if self._buffer else 0
+
+    @property
+    def lag(self) -> float:
+        """Seconds since the supervised connection last had nothing to send."""
+        if self._behind_since is None:
+            return 0.0
+
+        return asyncio.get_running_loop().time() - self._behind_since
+
+    def _on_submitted(self):
+        if self._flushed.is_set():
+            self._flushed.clear()
+            self._behind_since = asyncio.get_running_loop().time()
+
+    async def _open(self):
+        self._logger.info(
+            f"Connecting to TAK server at {self._cfg.server_url}:{self._cfg.port}"
+        )
+
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(
+                host=self._host,
+                port=self._cfg.port,
+                ssl=self._ssl_context,
+                server_hostname=self._host if self._ssl_context else None,
+            ),
+            timeout=self._cfg.connection_timeout,
+        )
+        self._logger.info("Successfully connected to TAK server")
+
+        if self._ssl_context:
+            ssl_object = self._writer.get_extra_info("ssl_object")
+            self._ssl_context.remember(ssl_object)
+
+            handshake = "resumed" if ssl_object.session_reused else "established"
+
+            self._logger.info(f"TLS session {handshake} with {ssl_object.version()}")
+
+        await self._select_protocol()
+
+    def _backoff_delay(self, attempt: int) -> float:
+        # Full jitter keeps restarted workers from reconnecting in lockstep.
+        return random.uniform(
+            0,
+            min(
+                self._cfg.reconnect_backoff_max,
+                self._cfg.reconnect_backoff_base * 2**attempt,
+            ),
+        )
+
+    async def _supervise(self):
+        while True:
+            try:
+                await self._open()
+
+            except (OSError, asyncio.TimeoutError) as e:
+                self._reconnect_attempt += 1
+                delay = self._backoff_delay(self._reconnect_attempt)
+
+                self._logger.error(
+                    f"Connection attempt {self._reconnect_attempt} failed: "
+                    f"{str(e)}, retrying in {delay:.1f}s"
+                )
+
+                await asyncio.sleep(delay)
+                continue
+
+            try:
+                await self._pump()
+
+            except OSError as e:
+                # A server that accepts and then closes, e.g. after rejecting
+                # the client certificate, is backed off like a refused one;
+                # the attempt count only resets once a write got through.
+                self._reconnect_attempt += 1
+                delay = self._backoff_delay(self._reconnect_attempt)
+                self.stats.connection_drops += 1
+
+                self._logger.warning(
+                    f"Lost connection to TAK server: {str(e)}, "
+                    f"reconnecting in {delay:.1f}s"
+                )
+
+            finally:
+                await self.disconnect()
+
+            await asyncio.sleep(delay)
+
+    async def _pump(self):
+        closed = asyncio.create_task(self._discard_incoming())
+        transport = self._writer.transport
+        self._written = 0
+
+        transport.set_write_buffer_limits(high=self._cfg.write_high_water)
+
+        try:
+            while True:
+                data = await self._collect(closed)
+
+                if data:
+                    self._writer.write(data)
+                    self._written += len(data)
+                    self._unconfirmed.append((self._written, self._collected))
+                    self._collected = []
+
+                    if transport.get_write_buffer_size() > self._cfg.write_high_water:
+                        await self._writer.drain()
+
+                self._confirm()
+
+                if closed.done():
+                    closed.result()
+
+        finally:
+            closed.cancel()
+
+            self._buffer.requeue(
+                [event for _, events in self._unconfirmed for event in events]
+                + self._collected
+            )
+            self._unconfirmed.clear()
+            self._collected = []
+
+    async def _collect(self, closed: asyncio.Task) -> bytes:
+        # Nagle-like: hold the first event up to flush_interval_ms for company,
+        # but never past flush_max_bytes.
+        loop = asyncio.get_running_loop()
+        chunks = []
+        size = 0
+        deadline = None
+
+        while size < self._cfg.flush_max_bytes:
+            event = self._buffer.get_nowait()
+
+            if event is not None:
+                chunk = self._encode(event)
+                self._collected.append(event)
+                chunks.append(chunk)
+                size += len(chunk)
+
+                if deadline is None:
+                    deadline = loop.time() + self._cfg.flush_interval_ms / 1000
+
+                continue
+
+            if deadline is None:
+                timeout = self.CONFIRM_INTERVAL if self._unconfirmed else None
+
+            else:
+                timeout = deadline - loop.time()
+
+                if timeout <= 0:
+                    break
+
+            if not await self._wait_for_event(closed, timeout):
+                break
+
+        return b"".join(chunks)
+
+    async def _wait_for_event(
+        self, closed: asyncio.Task, timeout: typing.Optional[float]
+    ) -> bool:
+        ready = asyncio.create_task(self._buffer.wait())
+
+        try:
+            await asyncio.wait(
+                {ready, closed}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+
+        finally:
+            ready.cancel()
+
+        if closed.done():
+            closed.result()
+
+        return ready.done() and not ready.cancelled()
+
+    def _confirm(self):
+        # Bytes still in the transport buffer would be lost with the connection.
+        sent = self._written - self._writer.transport.get_write_buffer_size()
+
+        while self._unconfirmed and self._unconfirmed[0][0] <= sent:
+            self.stats.sent += len(self._unconfirmed.popleft()[1])
+            self._reconnect_attempt = 0
+
+        if not (self._unconfirmed or self._collected or len(self._buffer)):
+            self._flushed.set()
+            self._behind_since = None
+
+    async def _discard_incoming(self):
+        # Servers relay other clients' traffic; reading it also spots a close.
+        while await self._reader.read(65536):
+            pass
+
+        raise ConnectionResetError("TAK server closed the connection")
+
+    @property
+    def protocol(self) -> str:
+        """Wire protocol in use on the current connection."""
+        return self.PROTOCOL_PROTOBUF if self._use_protobuf else self.PROTOCOL_XML
+
+    async def _select_protocol(self):
+        self._use_protobuf = self._cfg.protocol == self.PROTOCOL_PROTOBUF
+
+        if self._cfg.protocol != self.PROTOCOL_NEGOTIATE:
+            return
+
+        # The server opens with a TakProtocolSupport event; nothing may be sent
+        # before it, and anything short of an accepted request keeps XML.
+        try:
+            support = await self._read_control_event()
+            versions = tak_protobuf.parse_protocol_support(support)
+
+            if tak_protobuf.TakProtobufFormatter.PROTOCOL_VERSION not in versions:
+                self._logger.info(
+                    f"TAK server offers protocol versions {versions}, using XML"
+                )
+                return
+
+            self._writer.write(self._protobuf_formatter.format_protocol_request())
+            await self._writer.drain()
+
+            response = await self._read_control_event()
+            self._use_protobuf = tak_protobuf.parse_protocol_response(response)
+
+        except (
+            asyncio.TimeoutError,
+            asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError,
+            ConnectionError,
+            ET.ParseError,
+        ) as e:
+            self._logger.warning(f"TAK protocol negotiation failed: {str(e)}")
+
+        self._logger.info(f"Using {self.protocol} protocol for TAK server")
+
+    async def _read_control_event(self) -> bytes:
+        return await asyncio.wait_for(
+            self._reader.readuntil(b"</event>"),
+            timeout=self._cfg.connection_timeout,
+        )
+
     async def disconnect(self):
         if self._writer:
+            if self._ssl_context:
+                self._ssl_context.remember(self._writer.get_extra_info("ssl_object"))
+
             self._writer.close()
-            await self._writer.wait_closed()
+
+            try:
+                await self._writer.wait_closed()
+
+            except OSError:
+                pass
+
+            self._reader = self._writer = None
 
             self._logger.info("Disconnected from TAK server")
 
-    async def send_point(self, point: models.GeoLocation):
+    async def send_point(
+        self, point: typing.Union[models.GeoLocation, records.GeoLocationRecord]
+    ):
         """Send GeoLocation to TAK server as a CoT event.
 
         Args:
-            point: GeoLocation to send.
+            point: Validated GeoLocation, or its record, to send.
+
+        Raises:
+            TakClientError: If connection fails during send operation.
+        """
+        await self.send_points([point])
+
+    async def send_points(
+        self,
+        points: typing.Sequence[
+            typing.Union[models.GeoLocation, records.GeoLocationRecord]
+        ],
+    ):
+        """Send several GeoLocations as CoT events with one write and one drain.
+
+        Args:
+            points: Validated GeoLocations, or their records, to send.
 
         Raises:
             TakClientError: If connection fails during send operation.
@@ -69,19 +524,30 @@ class TakClient:
         if not self._writer:
             raise exceptions.TakClientError("No active connection to TAK server")
 
-        event = self._formatter.create_event(point)
-        formatted_event = self._formatter.format_event(event)
+        events = [self._formatter.create_record(point) for point in points]
 
         try:
-            self._writer.write(formatted_event)
+            self._writer.write(b"".join(map(self._encode, events)))
             await self._writer.drain()
 
         except Exception as e:
-            self._logger.error(f"Error writing event: {str(e)}")
+            self._logger.error(f"Error writing events: {str(e)}")
+
+            raise exceptions.TakClientError(f"Failed to write events: {str(e)}")
+
+        self._logger.debug(
+            f"Sent CoT events: {', '.join(event.event_id for event in events)}"
+        )
 
-            raise exceptions.TakClientError(f"Failed to write event: {str(e)}")
+    def _encode(self, event: cot_formatter.CotEventLike) -> bytes:
+        # Encoded at write time, a reconnect may negotiate another protocol.
+        if self._encoder:
+            return self._encoder(event, self._use_protobuf)
 
-        self._logger.debug(f"Sent CoT event: {event.event_id}")
+        if self._use_protobuf:
+            return self._protobuf_formatter.format_event(event)
+
+        return self._formatter.format_event(event)
 
     async def __aenter__(self):
         await self.connect()
@@ -92,6 +558,16 @@ class TakClient:
         await self.disconnect()
 
 
+def create_client(
+    cfg: config.TakConfig,
+) -> typing.Union[TakClient, tak_udp.TakUdpClient]:
+    """Build the TAK client for the transport in the server URL scheme."""
+    if tak_tls.split_url(cfg.server_url)[0] == tak_tls.SCHEME_UDP:
+        return tak_udp.TakUdpClient(cfg)
+
+    return TakClient(cfg)
+
+
 async def main():
     cfg = config.TakConfig(server_url="137.184.101.250", port=8087)
 
@@ -0,0 +1,218 @@
+import asyncio
+import collections
+import dataclasses
+import logging
+import typing
+
+import config
+import cot_formatter
+import exceptions
+import tak_client
+import tak_protobuf
+import tak_tls
+
+
+@dataclasses.dataclass
+class ServerLag:
+    buffered: int
+    lag_seconds: float
+    sent: int
+    dropped: int
+    connection_drops: int
+
+
+class SharedEncoder:
+    def __init__(self, serializer: str, max_events: int):
+        """Encode each event once per wire protocol for every fan-out connection.
+
+        Encodings are remembered by event identity for the last max_events
+        events; a server lagging further behind encodes its events again.
+
+        Args:
+            serializer: CoT XML serializer name.
+            max_events: Number of recent events to keep encodings for.
+        """
+        self._formatter = cot_formatter.CotFormatter(serializer)
+        self._protobuf_formatter = tak_protobuf.TakProtobufFormatter()
+        self._max_events = max_events
+        self._cache: typing.OrderedDict[
+            int, typing.Tuple[cot_formatter.CotEventLike, typing.Dict[bool, bytes]]
+        ] = collections.OrderedDict()
+
+    def __call__(self, event: cot_formatter.CotEventLike, use_protobuf: bool) -> bytes:
+        entry = self._cache.get(id(event))
+
+        # The entry holds the event, so its id cannot be reused while cached.
+        if entry is None or entry[0] is not event:
+            entry = (event, {})
+            self._cache[id(event)] = entry
+
+            if len(self._cache) > self._max_events:
+                self._cache.popitem(last=False)
+
+        encodings = entry[1]
+
+        if use_protobuf not in encodings:
+            formatter = self._protobuf_formatter if use_protobuf else self._formatter
+            encodings[use_protobuf] = formatter.format_event(event)
+
+        return encodings[use_protobuf]
+
+
+class TakFanOut:
+    def __init__(self, cfg: config.TakConfig):
+        """Forward one event stream to the TAK server and cfg.extra_servers.
+
+        Every server gets its own supervised connection and write buffer, so a
+        slow or unreachable server falls behind on its own. When its buffer is
+        full it misses events rather than holding up the others; backpressure
+        is only reported once every server is full.
+
+        Args:
+            cfg: TAK configuration, extra servers given as "host:port",
+                optionally with a tcp:// or ssl:// scheme. Servers are named
+                "host:port" without the scheme.
+
+        Raises:
+            ConfigurationError: If an extra server is not "host:port" or has
+                an unknown scheme.
+        """
+        self._cfg = cfg
+        self._encoder = SharedEncoder(cfg.cot_serializer, cfg.buffer_max_events)
+        self._clients: typing.Dict[str, tak_client.TakClient] = {}
+        self._dropped: typing.Counter[str] = collections.Counter()
+        self._logger = logging.getLogger(__name__)
+
+        for server_cfg in [cfg] + [_server_config(cfg, s) for s in cfg.extra_servers]:
+            client = tak_client.TakClient(server_cfg, self._encoder)
+            self._clients[client.servers[0]] = client
+
+    @property
+    def servers(self) -> typing.List[str]:
+        return list(self._clients)
+
+    async def start(self):
+        for client in self._clients.values():
+            await client.start()
+
+    async def stop(self, timeout: typing.Optional[float] = None):
+        await asyncio.gather(
+            *(client.stop(timeout) for client in self._clients.values())
+        )
+
+    async def submit(
+        self,
+        event: cot_formatter.CotEventLike,
+        servers: typing.Optional[typing.Collection[str]] = None,
+    ):
+        """Queue a CoT event for every server.
+
+        Args:
+            event: Event, or its record, to send.
+            servers: Only queue it for these servers, by name.
+
+        Raises:
+            TakBackpressureError: If no server had room within the
+                backpressure timeout, the caller should leave the event queued.
+        """
+        clients = {
+            name: client
+            for name, client in self._clients.items()
+            if servers is None or name in servers
+        }
+        refused = [
+            name for name, client in clients.items() if not client.submit_nowait(event)
+        ]
+
+        if refused and len(refused) == len(clients):
+            # Every server is behind, so waiting holds up no healthy one.
+            results = await asyncio.gather(
+                *(self._clients[name].submit(event) for name in refused),
+                return_exceptions=True,
+            )
+
+            for result in results:
+                if isinstance(result, Exception) and not isinstance(
+                    result, exceptions.TakBackpressureError
+                ):
+                    raise result
+
+            refused = [
+                name
+                for name, result in zip(refused, results)
+                if isinstance(result, exceptions.TakBackpressureError)
+            ]
+
+            if len(refused) == len(clients):
+                raise exceptions.TakBackpressureError(
+                    "Write buffers of all TAK servers are full"
+                )
+
+        for name in refused:
+            self._dropped[name] += 1
+            self._logger.warning(f"TAK server {name} is backed up, skipping event")
+
+    async def submit_many(
+        self,
+        events: typing.Sequence[cot_formatter.CotEventLike],
+        servers: typing.Optional[
+            typing.Sequence[typing.Optional[typing.Collection[str]]]
+        ] = None,
+    ) -> int:
+        """Queue CoT events for every server, stopping at the first refused.
+
+        Args:
+            events: Events, or their records, to send.
+            servers: Optional server names to restrict each event to, None
+                entries go to every server.
+
+        Returns:
+            Number of events accepted, the rest should stay queued upstream.
+        """
+        for accepted, event in enumerate(events):
+            try:
+                await self.submit(event, servers[accepted] if servers else None)
+
+            except exceptions.TakBackpressureError as e:
+                self._logger.warning(f"{str(e)}, deferring {len(events) - accepted}")
+
+                return accepted
+
+        return len(events)
+
+    def lag(self) -> typing.Dict[str, ServerLag]:
+        """Backlog and delivery counters for each server."""
+        return {
+            name: ServerLag(
+                buffered=client.buffered,
+                lag_seconds=client.lag,
+                sent=client.stats.sent,
+                dropped=self._dropped[name],
+                connection_drops=client.stats.connection_drops,
+            )
+            for name, client in self._clients.items()
+        }
+
+
+def _server_config(cfg: config.TakConfig, server: str) -> config.TakConfig:
+    host, _, port = server.strip().rpartition(":")
+
+    try:
+        _, bare_host = tak_tls.split_url(host)
+
+        if not bare_host:
+            raise ValueError(server)
+
+        return dataclasses.replace(
+            cfg,
+            server_url=host,
+            port=int(port),
+            extra_servers=[],
+            buffer_spill_path=cfg.buffer_spill_path
+            and f"{cfg.buffer_spill_path}.{bare_host}-{int(port)}",
+        )
+
+    except ValueError:
+        raise exceptions.ConfigurationError(
+            f"Invalid TAK server {server!r}, expected 'host:port'"
+        )
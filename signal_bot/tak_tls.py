@@ -0,0 +1,90 @@
+import ssl
+import typing
+
+import config
+import exceptions
+
+SCHEME_TCP = "tcp"
+SCHEME_SSL = "ssl"
+SCHEME_UDP = "udp"
+
+
+class ResumingSSLContext(ssl.SSLContext):
+    """Client context that offers the last TLS session on every new connection.
+
+    asyncio cannot pass a session to open_connection(), so the context injects
+    it when the transport wraps its BIOs. One context serves one server, a
+    session is only valid for the server that issued it.
+    """
+
+    resume_session: typing.Optional[ssl.SSLSession] = None
+
+    def wrap_bio(
+        self,
+        incoming,
+        outgoing,
+        server_side=False,
+        server_hostname=None,
+        session=None,
+    ):
+        return super().wrap_bio(
+            incoming,
+            outgoing,
+            server_side,
+            server_hostname,
+            session or self.resume_session,
+        )
+
+    def remember(self, ssl_object: typing.Optional[ssl.SSLObject]):
+        """Keep the connection's session for the next handshake."""
+        # TLS 1.3 tickets arrive after the handshake, so this is also called
+        # right before the connection is closed.
+        if ssl_object is not None and ssl_object.session is not None:
+            self.resume_session = ssl_object.session
+
+
+def split_url(url: str) -> typing.Tuple[str, str]:
+    """Split "ssl://host", "tcp://host" or "udp://host" into scheme and host,
+    plain TCP if no scheme is given.
+
+    Raises:
+        ConfigurationError: If the scheme is not tcp, ssl or udp.
+    """
+    scheme, separator, host = url.partition("://")
+
+    if not separator:
+        return SCHEME_TCP, url
+
+    if scheme not in (SCHEME_TCP, SCHEME_SSL, SCHEME_UDP):
+        raise exceptions.ConfigurationError(
+            f"Unknown TAK server scheme {scheme!r}, expected 'tcp', 'ssl' or 'udp'"
+        )
+
+    return scheme, host
+
+
+def create_context(cfg: config.TakConfig) -> ResumingSSLContext:
+    """Build the client TLS context from the TAK configuration.
+
+    Raises:
+        ConfigurationError: If a certificate, key or CA file cannot be loaded.
+    """
+    context = ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.check_hostname = cfg.tls_verify_hostname
+
+    try:
+        if cfg.tls_ca_file:
+            context.load_verify_locations(cfg.tls_ca_file)
+
+        else:
+            context.load_default_certs()
+
+        if cfg.tls_cert_file:
+            context.load_cert_chain(
+                cfg.tls_cert_file, cfg.tls_key_file, cfg.tls_key_password
+            )
+
+    except (OSError, ssl.SSLError) as e:
+        raise exceptions.ConfigurationError(f"Invalid TAK TLS configuration: {e}")
+
+    return context
@@ -0,0 +1,282 @@
+import asyncio
+import dataclasses
+import ipaddress
+import logging
+import socket
+import typing
+
+import config
+import cot_formatter
+import exceptions
+import models
+import records
+import tak_protobuf
+import tak_tls
+
+# IPv4 and UDP headers, subtracted from the MTU to get the datagram payload.
+UDP_IPV4_OVERHEAD = 28
+
+
+@dataclasses.dataclass
+class TakUdpStats:
+    datagrams: int = 0
+    events: int = 0
+    bytes: int = 0
+    oversized: int = 0
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        """Pace sends to rate bytes per second, allowing bursts of burst bytes.
+
+        A send larger than the available tokens goes ahead and leaves the
+        bucket in debt, the caller sleeps until the debt is paid off.
+
+        Args:
+            rate: Sustained bytes per second.
+            burst: Bucket capacity in bytes.
+        """
+        self._rate = rate
+        self._burst = burst
+        self._tokens = burst
+        self._updated: typing.Optional[float] = None
+
+    async def acquire(self, amount: int):
+        now = asyncio.get_running_loop().time()
+
+        if self._updated is not None:
+            self._tokens = min(
+                self._burst, self._tokens + (now - self._updated) * self._rate
+            )
+
+        self._updated = now
+        self._tokens -= amount
+
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self._rate)
+
+
+class TakUdpClient:
+    def __init__(self, cfg: config.TakConfig):
+        """Initialize client sending CoT events as UDP datagrams.
+
+        Serves "udp://host" servers, unicast or multicast (e.g.
+        udp://239.2.3.1 on port 6969 for mesh SA). There is no connection
+        state: every event goes out as soon as the rate limit allows, as XML
+        or, with protocol "protobuf", as TAK mesh protobuf messages.
+
+        Args:
+            cfg: TAK configuration parameters.
+
+        Raises:
+            ConfigurationError: If the URL is not udp:// or the protocol is
+                "negotiate", which needs a stream to negotiate over.
+        """
+        scheme, self._host = tak_tls.split_url(cfg.server_url)
+
+        if scheme != tak_tls.SCHEME_UDP:
+            raise exceptions.ConfigurationError(
+                f"TakUdpClient needs a udp:// server URL, got {cfg.server_url!r}"
+            )
+
+        if cfg.protocol not in ("xml", "protobuf"):
+            raise exceptions.ConfigurationError(
+                f"Unsupported UDP TAK protocol {cfg.protocol!r}, "
+                "expected 'xml' or 'protobuf'"
+            )
+
+        self._cfg = cfg
+        self._formatter = cot_formatter.CotFormatter(cfg.cot_serializer)
+        self._protobuf_formatter = tak_protobuf.TakProtobufFormatter()
+        self._use_protobuf = cfg.protocol == "protobuf"
+        self._max_payload = cfg.udp_mtu - UDP_IPV4_OVERHEAD
+        self._limiter = (
+            TokenBucket(
+                cfg.udp_max_bytes_per_second,
+                max(cfg.udp_max_bytes_per_second, self._max_payload),
+            )
+            if cfg.udp_max_bytes_per_second > 0
+            else None
+        )
+        self._transport: typing.Optional[asyncio.DatagramTransport] = None
+        self._logger = logging.getLogger(__name__)
+        self.stats = TakUdpStats()
+
+    @property
+    def servers(self) -> typing.List[str]:
+        """Name of the target, as "host:port" without the URL scheme, the way
+        geofence areas and TakFanOut refer to it."""
+        return [f"{self._host}:{self._cfg.port}"]
+
+    async def connect(self):
+        """Open the UDP socket, with multicast options for a group address.
+
+        Raises:
+            TakClientError: If the socket cannot be set up.
+        """
+        loop = asyncio.get_running_loop()
+
+        try:
+            addresses = await loop.getaddrinfo(
+                self._host,
+                self._cfg.port,
+                family=socket.AF_INET,
+                type=socket.SOCK_DGRAM,
+            )
+
+            self._transport, _ = await loop.create_datagram_endpoint(
+                lambda: _LoggingProtocol(self._logger),
+                sock=self._create_socket(addresses[0][4]),
+            )
+
+        except OSError as e:
+            raise exceptions.TakClientError(f"Failed to open UDP socket: {str(e)}")
+
+        self._logger.info(f"Sending CoT datagrams to {self._host}:{self._cfg.port}")
+
+    async def disconnect(self):
+        if self._transport:
+            self._transport.close()
+            self._transport = None
+
+            self._logger.info(
+                f"Closed UDP socket, sent {self.stats.events} events in "
+                f"{self.stats.datagrams} datagrams"
+            )
+
+    async def start(self):
+        """Same as connect(), for interchangeability with TakClient."""
+        await self.connect()
+
+    async def stop(self, timeout: typing.Optional[float] = None):
+        """Same as disconnect(), there is no buffer to flush."""
+        await self.disconnect()
+
+    async def submit(self, event: cot_formatter.CotEventLike):
+        await self.send_events([event])
+
+    async def submit_many(
+        self, events: typing.Sequence[cot_formatter.CotEventLike]
+    ) -> int:
+        """Send CoT events together so they can share datagrams.
+
+        Returns:
+            Number of events handed over, always all of them.
+        """
+        await self.send_events(events)
+
+        return len(events)
+
+    async def send_point(
+        self, point: typing.Union[models.GeoLocation, records.GeoLocationRecord]
+    ):
+        await self.send_points([point])
+
+    async def send_points(
+        self,
+        points: typing.Sequence[
+            typing.Union[models.GeoLocation, records.GeoLocationRecord]
+        ],
+    ):
+        await self.send_events([self._formatter.create_record(p) for p in points])
+
+    async def send_events(self, events: typing.Sequence[cot_formatter.CotEventLike]):
+        """Send CoT events, packed into as few datagrams as the MTU allows.
+
+        Events only share a datagram with udp_pack_events, XML only; TAK mesh
+        receivers read one protobuf message per datagram. Events that cannot
+        fit in one datagram are skipped rather than sent fragmented.
+
+        Raises:
+            TakClientError: If the socket is not open.
+        """
+        if not self._transport:
+            raise exceptions.TakClientError("UDP socket is not open")
+
+        for datagram, count in self._pack(events):
+            if self._limiter:
+                await self._limiter.acquire(len(datagram))
+
+            self._transport.sendto(datagram)
+
+            self.stats.datagrams += 1
+            self.stats.events += count
+            self.stats.bytes += len(datagram)
+
+    def _pack(
+        self, events: typing.Sequence[cot_formatter.CotEventLike]
+    ) -> typing.Iterator[typing.Tuple[bytes, int]]:
+        pack = self._cfg.udp_pack_events and not self._use_protobuf
+        payloads: typing.List[bytes] = []
+        size = 0
+
+        for event in events:
+            payload = self._encode(event)
+
+            if len(payload) > self._max_payload:
+                self.stats.oversized += 1
+                self._logger.error(
+                    f"Skipping CoT event {event.event_id}: {len(payload)} bytes "
+                    f"exceed the {self._max_payload} byte datagram limit"
+                )
+                continue
+
+            if payloads and (not pack or size + len(payload) > self._max_payload):
+                yield b"".join(payloads), len(payloads)
+                payloads, size = [], 0
+
+            payloads.append(payload)
+            size += len(payload)
+
+        if payloads:
+            yield b"".join(payloads), len(payloads)
+
+    def _encode(self, event: cot_formatter.CotEventLike) -> bytes:
+        if self._use_protobuf:
+            return self._protobuf_formatter.frame_mesh(
+                self._protobuf_formatter.encode_message(event)
+            )
+
+        return self._formatter.format_event(event)
+
+    def _create_socket(self, address: typing.Tuple[str, int]) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+        try:
+            if ipaddress.ip_address(address[0]).is_multicast:
+                sock.setsockopt(
+                    socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, self._cfg.udp_ttl
+                )
+
+                if self._cfg.udp_interface:
+                    sock.setsockopt(
+                        socket.IPPROTO_IP,
+                        socket.IP_MULTICAST_IF,
+                        socket.inet_aton(self._cfg.udp_interface),
+                    )
+
+            sock.setblocking(False)
+            sock.connect(address)
+
+        except OSError:
+            sock.close()
+            raise
+
+        return sock
+
+    async def __aenter__(self):
+        await self.connect()
+
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.disconnect()
+
+
+class _LoggingProtocol(asyncio.DatagramProtocol):
+    def __init__(self, logger: logging.Logger):
+        self._logger = logger
+
+    def error_received(self, exc: Exception):
+        # e.g. ICMP port unreachable from a unicast target, nothing to retry.
+        self._logger.warning(f"UDP send error: {str(exc)}")
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import signal
+import typing
+
+import config
+import cot_formatter
+import geofence
+import redis_client
+import tak_client
+import tak_fanout
+import tak_udp
+
+TakOutput = typing.Union[
+    tak_client.TakClient, tak_udp.TakUdpClient, tak_fanout.TakFanOut
+]
+
+
+class TakWorker:
+    def __init__(
+        self,
+        redis: redis_client.RedisClient,
+        client: TakOutput,
+        router: typing.Optional[geofence.GeofenceRouter] = None,
+    ):
+        """Move CoT events from the Redis TAK queue straight onto the TAK output.
+
+        Each dequeued batch is submitted as a whole and acked in one pipeline.
+        Events the output still refuses after its backpressure timeout are
+        requeued at the front, so they wait in Redis instead of being dropped
+        and are delivered next, in their original order.
+
+        Args:
+            redis: Connected queue client.
+            client: Started TAK client, UDP client or fan-out.
+            router: Optional geofence router; events then only go to the
+                servers subscribed to their location.
+        """
+        self._redis = redis
+        self._client = client
+        self._router = router
+        self._servers = frozenset(client.servers)
+        self._running = False
+        self._logger = logging.getLogger(__name__)
+
+    async def run(self):
+        """Forward batches until stop() is called."""
+        self._running = True
+
+        while self._running:
+            # Only this bot produces TAK events, so they skip revalidation.
+            events = await self._redis.dequeue_many(
+                redis_client.RedisClient.TAK_QUEUE, trusted=True
+            )
+
+            if events:
+                await self.forward(events)
+
+    def stop(self):
+        """Let run() return once the batch in hand is settled, so nothing
+        dequeued is lost."""
+        self._running = False
+
+    async def forward(self, events: typing.List[cot_formatter.CotEventLike]) -> int:
+        """Submit a dequeued batch and settle it with Redis.
+
+        Returns:
+            Number of events accepted by the TAK output.
+        """
+        if self._router is None:
+            accepted = await self._client.submit_many(events)
+
+        else:
+            accepted = await self._forward_routed(events)
+
+        await self._redis.ack_many(events[:accepted])
+
+        if accepted < len(events):
+            await self._redis.requeue_many(events[accepted:])
+
+        return accepted
+
+    async def _forward_routed(
+        self, events: typing.List[cot_formatter.CotEventLike]
+    ) -> int:
+        positions = []
+        servers = []
+
+        for position, event in enumerate(events):
+            targets = self._router.tak_servers(event.point)
+
+            if targets is not None:
+                targets = targets & self._servers
+
+            if targets is None or targets:
+                positions.append(position)
+                servers.append(targets)
+
+        routed = [events[position] for position in positions]
+
+        if isinstance(self._client, tak_fanout.TakFanOut):
+            accepted = await self._client.submit_many(routed, servers)
+
+        else:
+            accepted = await self._client.submit_many(routed)
+
+        if accepted == len(routed):
+            # Events outside every subscribed area count as done.
+            return len(events)
+
+        # Settle up to the first refused event; the rest are routed again.
+        return positions[accepted]
+
+
+def create_output(cfg: config.TakConfig) -> TakOutput:
+    """Build the TAK output: a fan-out when extra servers are configured."""
+    if cfg.extra_servers:
+        return tak_fanout.TakFanOut(cfg)
+
+    return tak_client.create_client(cfg)
+
+
+async def main():
+    cfg = config.load_config()
+
+    redis = redis_client.create_client(cfg.redis)
+    client = create_output(cfg.tak)
+
+    await redis.connect()
+    await client.start()
+
+    if redis.is_reliable:
+        reaper = asyncio.create_task(
+            redis.run_reaper(redis_client.RedisClient.TAK_QUEUE)
+        )
+
+    try:
+        router = await geofence.create_router(cfg.geofence, redis)
+        worker = TakWorker(redis, client, router)
+
+        # Drain on SIGTERM, which is how containers and the supervisor stop us.
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, worker.stop)
+
+        await worker.run()
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        if redis.is_reliable:
+            reaper.cancel()
+
+        await client.stop()
+        await redis.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -5,6 +5,7 @@ import config
 import cot_formatter
 import models
 import redis_client
+import throttle
 
 
 def generate_geolocation(n=10):
@@ -23,13 +24,25 @@ async def main():
 
     formatter = cot_formatter.CotFormatter()
 
-    async with redis_client.RedisClient(cfg.redis) as redis:
+    async with redis_client.create_client(cfg.redis) as redis:
+        positions = (
+            throttle.PositionThrottle(cfg.throttle, redis)
+            if cfg.throttle.enabled
+            else None
+        )
+
         for geolocation in generate_geolocation():
-            await redis.enqueue_tak_events(formatter.create_event(geolocation))
+            points = [geolocation]
+
+            if positions is not None:
+                points = await positions.filter(points) + await positions.pop_due()
+
+            for point in points:
+                await redis.enqueue_tak_events(formatter.create_event(point))
 
-            await redis.enqueue_signal_messages(
-                models.SignalMessage(geolocation=geolocation)
-            )
+                await redis.enqueue_signal_messages(
+                    models.SignalMessage(geolocation=point)
+                )
 
             await asyncio.sleep(random.uniform(0.1, 5.0))
 
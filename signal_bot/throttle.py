@@ -0,0 +1,270 @@
+import collections
+import dataclasses
+import logging
+import math
+import time
+import typing
+
+import config
+import exceptions
+import models
+import records
+
+if typing.TYPE_CHECKING:
+    import redis_client
+
+Point = typing.Union[models.GeoLocation, records.GeoLocationRecord]
+
+EARTH_RADIUS_M = 6_371_008.8
+
+# Results of a throttle decision, shared with RedisClient.TRACK_SCRIPT.
+SEND = 1
+DROP = 0
+DEFER = -1
+
+
+@dataclasses.dataclass
+class ThrottleStats:
+    passed: int = 0
+    dropped: int = 0
+    merged: int = 0
+    evicted: int = 0
+
+
+@dataclasses.dataclass
+class _Track:
+    __slots__ = ("lat", "lon", "sent_at", "seen_at", "pending")
+
+    lat: float
+    lon: float
+    sent_at: float
+    seen_at: float
+    pending: typing.Optional[Point]
+
+
+def distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in meters between two WGS84 points."""
+    lat1, lat2 = math.radians(lat1), math.radians(lat2)
+    h = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(min(h, 1.0)))
+
+
+class PositionThrottle:
+    def __init__(
+        self,
+        cfg: config.ThrottleConfig,
+        redis: typing.Optional["redis_client.RedisClient"] = None,
+        clock: typing.Callable[[], float] = time.monotonic,
+    ):
+        """Initialize throttle deduplicating track updates per entity.
+
+        An update of a track (keyed by the point description) is sent when it
+        moved at least min_distance meters from the last sent position and
+        min_interval seconds have passed, or max_interval seconds have passed
+        regardless of movement. A moved update that comes too soon is held
+        back and merged with later ones: only the latest is released by
+        pop_due() once the interval is over. Points without a description
+        cannot be told apart and always pass.
+
+        Tracks live in an LRU of cache_size entries and expire ttl seconds
+        after their last update. With shared and a Redis client, updates that
+        pass locally are checked against the last sent position of any worker.
+
+        Args:
+            cfg: Throttle configuration parameters.
+            redis: Connected client for shared state, used with cfg.shared.
+            clock: Monotonic time source in seconds.
+        """
+        self._cfg = cfg
+        self._redis = redis if cfg.shared else None
+        self._clock = clock
+        self._tracks: typing.OrderedDict[str, _Track] = collections.OrderedDict()
+        self._logger = logging.getLogger(__name__)
+        self.stats = ThrottleStats()
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    async def filter(self, points: typing.Iterable[Point]) -> typing.List[Point]:
+        """Return the points that should be sent, in order."""
+        now = self._clock()
+        self._expire(now)
+
+        # Points are checked against the last sent position of their track,
+        # or of an earlier point of this batch, but tracks only record a send
+        # once the shared check has let it through.
+        staged: typing.Dict[str, Point] = {}
+        candidates, deferred = [], []
+
+        for point in points:
+            result = self._check(point, now, staged)
+
+            if result == SEND:
+                candidates.append(point)
+
+            elif result == DEFER:
+                deferred.append(point)
+
+            else:
+                self.stats.dropped += 1
+
+        if self._redis is not None and candidates:
+            candidates = await self._check_shared(candidates, now)
+
+        for point in candidates:
+            if point.description:
+                self._sent(self._track(point, now), point, now)
+
+        for point in deferred:
+            self._defer(self._track(point, now), point)
+
+        self.stats.passed += len(candidates)
+
+        return candidates
+
+    async def pop_due(self) -> typing.List[Point]:
+        """Release held-back updates whose min_interval has passed."""
+        now = self._clock()
+        due = []
+
+        for track in self._tracks.values():
+            if track.pending and now - track.sent_at >= self._cfg.min_interval:
+                due.append(track.pending)
+                self._sent(track, track.pending, now)
+
+        if due:
+            self.stats.passed += len(due)
+
+            if self._redis is not None:
+                try:
+                    await self._redis.update_tracks(
+                        self._cfg,
+                        [(point.description, point.lat, point.lon) for point in due],
+                        force=True,
+                    )
+
+                except exceptions.RedisError as e:
+                    self._logger.warning(f"Shared throttle unavailable: {str(e)}")
+
+        return due
+
+    def _check(self, point: Point, now: float, staged: typing.Dict[str, Point]) -> int:
+        if not point.description:
+            return SEND
+
+        if (last := staged.get(point.description)) is not None:
+            track = _Track(last.lat, last.lon, now, now, None)
+
+        elif (track := self._tracks.get(point.description)) is not None:
+            self._tracks.move_to_end(point.description)
+            track.seen_at = now
+
+        else:
+            staged[point.description] = point
+
+            return SEND
+
+        result = self._decide(track, point, now)
+
+        if result == SEND:
+            staged[point.description] = point
+
+        return result
+
+    async def _check_shared(
+        self, candidates: typing.List[Point], now: float
+    ) -> typing.List[Point]:
+        tracked = [point for point in candidates if point.description]
+
+        try:
+            results = await self._redis.update_tracks(
+                self._cfg,
+                [(point.description, point.lat, point.lon) for point in tracked],
+            )
+
+        except exceptions.RedisError as e:
+            # Sending an occasional duplicate beats losing positions.
+            self._logger.warning(f"Shared throttle unavailable: {str(e)}")
+
+            return candidates
+
+        rejected = set()
+
+        for point, result in zip(tracked, results):
+            if result == SEND:
+                continue
+
+            rejected.add(id(point))
+
+            if result == DEFER:
+                # Another worker sent this track just now.
+                self._defer(self._track(point, now), point)
+
+            else:
+                self.stats.dropped += 1
+
+        return [point for point in candidates if id(point) not in rejected]
+
+    def _decide(self, track: _Track, point: Point, now: float) -> int:
+        elapsed = now - track.sent_at
+
+        if 0 < self._cfg.max_interval <= elapsed:
+            return SEND
+
+        if (
+            distance(track.lat, track.lon, point.lat, point.lon)
+            < self._cfg.min_distance
+        ):
+            return DROP
+
+        if elapsed < self._cfg.min_interval:
+            return DEFER
+
+        return SEND
+
+    def _defer(self, track: _Track, point: Point):
+        if track.pending is not None:
+            self.stats.merged += 1
+
+        track.pending = point
+
+    def _track(self, point: Point, now: float) -> _Track:
+        track = self._tracks.get(point.description)
+
+        if track is None:
+            track = _Track(point.lat, point.lon, now, now, None)
+            self._tracks[point.description] = track
+            self._evict()
+
+        return track
+
+    def _sent(self, track: _Track, point: Point, now: float):
+        track.lat, track.lon = point.lat, point.lon
+        track.sent_at = now
+        track.pending = None
+
+    def _evict(self):
+        while len(self._tracks) > self._cfg.cache_size:
+            self._forget(next(iter(self._tracks)))
+
+    def _expire(self, now: float):
+        # Tracks are kept in order of their last update, oldest first.
+        while self._tracks:
+            uid, track = next(iter(self._tracks.items()))
+
+            if now - track.seen_at < self._cfg.ttl:
+                break
+
+            self._forget(uid)
+
+    def _forget(self, uid: str):
+        track = self._tracks.pop(uid)
+        self.stats.evicted += 1
+
+        # A held-back update of a forgotten track is never sent.
+        if track.pending is not None:
+            self.stats.dropped += 1
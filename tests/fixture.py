@@ -77,18 +77,25 @@ def mock_session():
     return session
 
 
-@pytest.fixture
-def mock_stream():
-    """Mock asyncio StreamReader/StreamWriter fixture"""
+def make_mock_stream():
+    """Build a mock asyncio StreamReader/StreamWriter pair"""
     reader = AsyncMock(spec=asyncio.StreamReader)
     writer = AsyncMock(spec=asyncio.StreamWriter)
     writer.drain = AsyncMock()
     writer.write = MagicMock()
     writer.close = MagicMock()
     writer.wait_closed = AsyncMock()
+    writer.transport = MagicMock()
+    writer.transport.get_write_buffer_size.return_value = 0
     return reader, writer
 
 
+@pytest.fixture
+def mock_stream():
+    """Mock asyncio StreamReader/StreamWriter fixture"""
+    return make_mock_stream()
+
+
 @pytest.fixture
 def mock_redis():
     """Mock Redis client fixture"""
@@ -0,0 +1,101 @@
+"""Local stand-in for signal-cli-rest-api in json-rpc mode.
+
+Serves the websocket receive endpoint, pushing whatever envelopes the test
+hands to push(), and records messages posted to /v2/send.
+"""
+
+import asyncio
+import typing
+
+import aiohttp.web
+
+
+class SignalApiStub:
+    def __init__(self, number: str):
+        self.number = number
+        self.sent: typing.List[dict] = []
+        self.connections = 0
+        self._envelopes: asyncio.Queue = asyncio.Queue()
+        self._sockets: typing.List[aiohttp.web.WebSocketResponse] = []
+        self._runner: typing.Optional[aiohttp.web.AppRunner] = None
+        self.url = ""
+
+    async def start(self):
+        app = aiohttp.web.Application()
+        app.router.add_get("/v1/receive/{number}", self._receive)
+        app.router.add_post("/v2/send", self._send)
+
+        self._runner = aiohttp.web.AppRunner(app)
+        await self._runner.setup()
+
+        site = aiohttp.web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        await self.drop_connections()
+        await self._runner.cleanup()
+
+    def push(self, text: str, source: str = "+1987654321", timestamp: int = 0):
+        self.push_frame(
+            {
+                "envelope": {
+                    "source": source,
+                    "sourceNumber": source,
+                    "sourceName": "Tester",
+                    "timestamp": timestamp,
+                    "dataMessage": {"timestamp": timestamp, "message": text},
+                },
+                "account": self.number,
+            }
+        )
+
+    def push_frame(self, frame: typing.Any):
+        """Send any JSON value as a websocket frame."""
+        self._envelopes.put_nowait(frame)
+
+    async def drop_connections(self):
+        sockets, self._sockets = self._sockets, []
+
+        for ws in sockets:
+            await ws.close()
+
+    async def _receive(self, request: aiohttp.web.Request):
+        if request.match_info["number"] != self.number:
+            raise aiohttp.web.HTTPNotFound()
+
+        ws = aiohttp.web.WebSocketResponse()
+        await ws.prepare(request)
+
+        self.connections += 1
+        self._sockets.append(ws)
+        forwarder = asyncio.create_task(self._forward(ws))
+
+        try:
+            # Returns once either side closes the socket.
+            async for _ in ws:
+                pass
+
+        finally:
+            forwarder.cancel()
+
+        return ws
+
+    async def _forward(self, ws: aiohttp.web.WebSocketResponse):
+        while True:
+            envelope = await self._envelopes.get()
+
+            if ws.closed:
+                # Hand it to the next connection.
+                self._envelopes.put_nowait(envelope)
+
+                return
+
+            await ws.send_json(envelope)
+
+    async def _send(self, request: aiohttp.web.Request):
+        self.sent.append(await request.json())
+
+        return aiohttp.web.json_response({"timestamp": "0"}, status=201)
@@ -0,0 +1,18 @@
+import pytest
+
+from combined import create_ingestor
+from config import CombinedConfig, IngestConfig
+from local_queue import LocalQueues
+from redis_client import RedisClient
+from fixture import sample_geolocation
+
+
+@pytest.mark.asyncio
+async def test_ingestor_hands_points_over_without_batching(sample_geolocation):
+    queues = LocalQueues(CombinedConfig())
+    ingestor = create_ingestor(queues, IngestConfig())
+
+    await ingestor.submit([sample_geolocation])
+
+    assert queues.qsize(RedisClient.TAK_QUEUE) == 1
+    assert queues.qsize(RedisClient.SIGNAL_QUEUE) == 1
@@ -1,9 +1,13 @@
+import array
 import datetime
+import re
+import uuid
 from xml.etree import ElementTree as ET
 
 import pytest
 
 from cot_formatter import CotFormatter
+from exceptions import MessageValidationError
 from models import GeoLocation
 from fixture import sample_geolocation_fixed, sample_cot_event_fixed, fixed_datetime
 
@@ -133,3 +137,110 @@ def test_coordinate_ranges(formatter, lat, lon):
 
     assert float(point_elem.get("lat")) == lat
     assert float(point_elem.get("lon")) == lon
+
+
+@pytest.mark.parametrize(
+    "event_id",
+    [
+        "test-event-id",
+        'quote"amp&lt<gt>',  # Escaped attribute characters
+        "tab\tcr\rlf\n",  # Whitespace character references
+        "unicode-é-🚀",  # Non-ASCII character references
+    ],
+)
+def test_template_serializer_matches_etree(sample_cot_event_fixed, event_id):
+    event = sample_cot_event_fixed.model_copy(update={"event_id": event_id})
+
+    etree_bytes = CotFormatter(CotFormatter.SERIALIZER_ETREE).format_event(event)
+    template_bytes = CotFormatter(CotFormatter.SERIALIZER_TEMPLATE).format_event(event)
+
+    assert template_bytes == etree_bytes
+
+
+def test_template_serializer_matches_etree_defaults(fixed_datetime):
+    point = GeoLocation(lat=0.0, lon=0.0, timestamp=fixed_datetime)
+    event = CotFormatter().create_event(point)
+
+    assert CotFormatter(CotFormatter.SERIALIZER_TEMPLATE).format_event(
+        event
+    ) == CotFormatter().format_event(event)
+
+
+def test_unknown_serializer():
+    with pytest.raises(ValueError):
+        CotFormatter("unknown")
+
+
+def test_format_batch_matches_format_event(formatter):
+    points = [
+        GeoLocation(lat=40.7128, lon=-74.0060, hae=100.0, ce=45.0, le=45.0),
+        GeoLocation(lat=0.0, lon=0.0),
+        GeoLocation(
+            lat=-33.8688,
+            lon=151.2093,
+            timestamp=datetime.datetime(
+                2024, 1, 1, 12, 0, 0, 123456, tzinfo=datetime.timezone.utc
+            ),
+        ),
+    ]
+
+    batch = formatter.format_batch(
+        lat=array.array("d", [p.lat for p in points]),
+        lon=array.array("d", [p.lon for p in points]),
+        timestamps=[p.timestamp.timestamp() for p in points],
+        hae=[p.hae or 0.0 for p in points],
+        ce=[p.ce or 0.0 for p in points],
+        le=[p.le or 0.0 for p in points],
+        event_type="hostile",
+        stale_minutes=5,
+    )
+    expected = b"".join(
+        formatter.format_event(
+            formatter.create_event(p, event_type="hostile", stale_minutes=5)
+        )
+        for p in points
+    )
+
+    uid = re.compile(rb'uid="[^"]+"')
+    assert uid.sub(b'uid=""', batch) == uid.sub(b'uid=""', expected)
+
+    for uid_value in re.findall(rb'uid="([^"]+)"', batch):
+        parsed = uuid.UUID(uid_value.decode()[len(CotFormatter.UUID_PREFIX) :])
+        assert parsed.version == 4
+
+
+@pytest.mark.parametrize(
+    "lat,lon",
+    [
+        ([91.0], [0.0]),
+        ([0.0], [-180.5]),
+        ([float("nan"), 0.0], [0.0, 0.0]),
+        ([0.0, 1.0], [0.0]),  # Mismatched column lengths
+    ],
+)
+def test_format_batch_rejects_invalid_columns(formatter, lat, lon):
+    with pytest.raises(MessageValidationError):
+        formatter.format_batch(lat=lat, lon=lon, timestamps=[0.0] * len(lat))
+
+
+def test_datetime_formatting_cache(formatter):
+    base = datetime.datetime(2024, 1, 1, 12, 0, 0, tzinfo=datetime.timezone.utc)
+
+    for dt in [
+        base,
+        base.replace(microsecond=1),  # Same second, served from the cache
+        base.replace(microsecond=999999),
+        base + datetime.timedelta(seconds=1),
+        base.replace(tzinfo=None),  # Naive datetime with the same fields
+    ]:
+        assert formatter._format_datetime(dt) == dt.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def test_format_event_distinct_start(formatter, sample_cot_event_fixed):
+    start = sample_cot_event_fixed.time + datetime.timedelta(seconds=1, microseconds=5)
+    event = sample_cot_event_fixed.model_copy(update={"start": start})
+
+    root = ET.fromstring(formatter.format_event(event).decode("utf-8"))
+
+    assert root.get("start") == "2024-01-01T00:00:01.000005Z"
+    assert root.get("time") == "2024-01-01T00:00:00.000000Z"
@@ -0,0 +1,152 @@
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+
+from config import GeofenceConfig
+from exceptions import ConfigurationError
+from geofence import (
+    Area,
+    GeofenceRouter,
+    GridIndex,
+    area_from_feature,
+    create_router,
+    load_areas,
+)
+from models import GeoLocation
+from redis_client import RedisClient
+
+
+def square(lat: float, lon: float, size: float) -> list:
+    return [
+        [lon, lat],
+        [lon + size, lat],
+        [lon + size, lat + size],
+        [lon, lat + size],
+        [lon, lat],
+    ]
+
+
+@pytest.fixture
+def features():
+    return [
+        {
+            "type": "Feature",
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [square(40.0, -74.0, 1.0), square(40.4, -73.6, 0.2)],
+            },
+            "properties": {"name": "city", "recipients": ["+100"], "tak": ["a:1"]},
+        },
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [-73.5, 40.5]},
+            "properties": {"name": "base", "radius": 1000, "recipients": ["+200"]},
+        },
+    ]
+
+
+@pytest.fixture
+def geofence_config():
+    return GeofenceConfig(cell_size=0.1)
+
+
+def test_polygon_with_hole(features):
+    area = area_from_feature(features[0])
+
+    assert area.contains(40.1, -73.9)
+    assert not area.contains(40.5, -73.5)
+    assert not area.contains(41.5, -73.5)
+
+
+def test_circle(features):
+    area = area_from_feature(features[1])
+
+    assert area.contains(40.505, -73.5)
+    assert not area.contains(40.52, -73.5)
+
+
+def test_feature_round_trip(features):
+    for feature in features:
+        area = area_from_feature(feature)
+
+        assert area_from_feature(area.to_feature()) == area
+
+
+def test_invalid_feature():
+    with pytest.raises(ConfigurationError):
+        area_from_feature({"geometry": {"type": "LineString", "coordinates": []}})
+
+
+def test_load_areas(tmp_path, features):
+    path = tmp_path / "areas.geojson"
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+
+    assert [area.name for area in load_areas(str(path))] == ["city", "base"]
+
+    with pytest.raises(ConfigurationError):
+        load_areas(str(tmp_path / "missing.geojson"))
+
+
+def test_grid_index_spans_cells():
+    index = GridIndex(0.1)
+    area = Area("big", polygons=[[[(0.0, 0.0), (0.0, 1.0), (1.0, 1.0), (1.0, 0.0)]]])
+    index.insert(area)
+
+    assert index.query(0.05, 0.05) == [area]
+    assert index.query(0.95, 0.55) == [area]
+    assert index.query(1.5, 0.5) == []
+
+
+def test_router_recipients(features, geofence_config):
+    router = GeofenceRouter(map(area_from_feature, features), geofence_config)
+
+    assert router.recipients(GeoLocation(lat=40.5, lon=-73.5)) == ["+200"]
+    assert router.recipients(GeoLocation(lat=40.1, lon=-73.9)) == ["+100"]
+    assert router.recipients(GeoLocation(lat=10.0, lon=10.0)) == []
+
+
+def test_router_tak_servers(features, geofence_config):
+    router = GeofenceRouter(map(area_from_feature, features), geofence_config)
+
+    assert router.tak_servers(GeoLocation(lat=40.1, lon=-73.9)) == {"a:1"}
+    assert router.tak_servers(GeoLocation(lat=40.5, lon=-73.5)) is None
+    assert router.tak_servers(GeoLocation(lat=10.0, lon=10.0)) == frozenset()
+
+
+def test_router_unmatched_all(features, geofence_config):
+    geofence_config.unmatched = "all"
+    router = GeofenceRouter(map(area_from_feature, features), geofence_config)
+
+    assert router.recipients(GeoLocation(lat=10.0, lon=10.0)) is None
+    assert router.tak_servers(GeoLocation(lat=10.0, lon=10.0)) is None
+
+
+def test_router_rejects_unknown_policy(geofence_config):
+    geofence_config.unmatched = "some"
+
+    with pytest.raises(ConfigurationError):
+        GeofenceRouter([], geofence_config)
+
+
+@pytest.mark.asyncio
+async def test_create_router_mirrors_to_redis(tmp_path, features, geofence_config):
+    path = tmp_path / "areas.geojson"
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+    redis = AsyncMock(spec=RedisClient)
+
+    assert await create_router(geofence_config, redis) is None
+
+    geofence_config.file = str(path)
+    geofence_config.redis = True
+
+    assert len(await create_router(geofence_config, redis)) == 2
+
+    saved, centers = redis.save_areas.await_args.args
+    assert list(saved) == ["city", "base"]
+    assert centers["base"] == (40.5, -73.5)
+
+    geofence_config.file = None
+    redis.load_areas.return_value = list(saved.values())
+
+    assert len(await create_router(geofence_config, redis)) == 2
@@ -0,0 +1,163 @@
+import asyncio
+import socket
+from unittest.mock import AsyncMock
+
+import aiohttp
+import pytest
+
+from config import IngestConfig, ThrottleConfig
+from exceptions import MessageValidationError
+from ingest import Ingestor, IngestServer, LineSplitter, parse_line
+from models import CotEvent, SignalMessage
+from redis_client import RedisClient
+from throttle import PositionThrottle
+
+
+@pytest.fixture
+def ingest_config():
+    return IngestConfig(host="127.0.0.1", tcp_port=0, http_port=0, batch_size=2)
+
+
+@pytest.fixture
+def redis():
+    return AsyncMock(spec=RedisClient)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+
+        return sock.getsockname()[1]
+
+
+def test_splitter_joins_chunks():
+    splitter = LineSplitter(64)
+
+    assert splitter.feed(b"1 2 a\n3 ") == [b"1 2 a"]
+    assert splitter.feed(b"4 b\n5 6") == [b"3 4 b"]
+    assert splitter.close() == [b"5 6"]
+
+
+def test_splitter_skips_oversized():
+    splitter = LineSplitter(8)
+
+    assert splitter.feed(b"1 2\n" + b"x" * 10) == [b"1 2"]
+    assert splitter.feed(b"y" * 10) == []
+    assert splitter.feed(b"z\n3 4\n" + b"w" * 9 + b"\n") == [b"3 4"]
+    assert splitter.close() == []
+    assert splitter.oversized == 2
+
+
+def test_parse_text():
+    point = parse_line(b"2.3522 48.8566 Eiffel Tower\r")
+
+    assert (point.lon, point.lat, point.description) == (
+        2.3522,
+        48.8566,
+        "Eiffel Tower",
+    )
+    assert parse_line(b"1 2 Unknown").description is None
+    assert parse_line(b"1 2").description is None
+    assert parse_line(b"  ") is None
+
+
+def test_parse_ndjson():
+    point = parse_line(b'{"lat": 48.8566, "lon": 2.3522, "hae": 35.0}')
+
+    assert (point.lat, point.hae) == (48.8566, 35.0)
+
+
+@pytest.mark.parametrize(
+    "line", [b"2.35", b"east north", b"1 95 north pole", b'{"lat": 1}', b"1 2 \xff"]
+)
+def test_parse_rejects(line):
+    with pytest.raises(MessageValidationError):
+        parse_line(line)
+
+
+@pytest.mark.asyncio
+async def test_ingestor_enqueues_full_batches(redis, ingest_config):
+    ingestor = Ingestor(redis, ingest_config)
+
+    assert await ingestor.ingest_lines([b"1 2 a", b"bad", b"3 4 b"], "test") == (2, 1)
+
+    (batches,), _ = redis.enqueue_batches.await_args
+    events = batches[RedisClient.TAK_QUEUE]
+    messages = batches[RedisClient.SIGNAL_QUEUE]
+
+    assert [type(e) for e in events] == [CotEvent, CotEvent]
+    assert [m.geolocation.description for m in messages] == ["a", "b"]
+    assert isinstance(messages[0], SignalMessage)
+    assert ingestor.stats.rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_ingestor_flushes_partial_batch(redis, ingest_config):
+    ingestor = Ingestor(redis, ingest_config)
+
+    await ingestor.submit([parse_line(b"1 2 a")])
+    redis.enqueue_batches.assert_not_awaited()
+
+    await ingestor.flush()
+    await ingestor.flush()
+
+    redis.enqueue_batches.assert_awaited_once()
+    assert ingestor.stats.enqueued == 1
+
+
+@pytest.mark.asyncio
+async def test_ingestor_applies_throttle(redis, ingest_config):
+    positions = PositionThrottle(ThrottleConfig(enabled=True))
+    ingestor = Ingestor(redis, ingest_config, positions)
+
+    await ingestor.ingest_lines([b"1 2 a", b"1 2 a"], "test")
+
+    (batches,), _ = redis.enqueue_batches.await_args
+
+    assert len(batches[RedisClient.TAK_QUEUE]) == 1
+    assert positions.stats.dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_tcp_ingestion(redis, ingest_config):
+    ingest_config.tcp_port = free_port()
+    ingestor = Ingestor(redis, ingest_config)
+    server = IngestServer(ingestor, ingest_config)
+    await server.start()
+
+    _, writer = await asyncio.open_connection("127.0.0.1", ingest_config.tcp_port)
+    writer.write(b"1 2 a\n3 4 b\n5 6")
+    await writer.drain()
+    writer.close()
+
+    for _ in range(100):
+        if ingestor.stats.received == 3:
+            break
+
+        await asyncio.sleep(0.01)
+
+    await server.stop()
+
+    assert ingestor.stats.received == 3
+
+
+@pytest.mark.asyncio
+async def test_http_ingestion(redis, ingest_config):
+    ingest_config.http_port = free_port()
+    ingestor = Ingestor(redis, ingest_config)
+    server = IngestServer(ingestor, ingest_config)
+    await server.start()
+
+    url = f"http://127.0.0.1:{ingest_config.http_port}/locations"
+
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.post(url, data=b'1 2 a\n{"lat": 3, "lon": 4}\nx') as r:
+                assert r.status == 202
+                assert await r.json() == {"accepted": 2, "rejected": 1}
+
+            async with session.post(url, data=b"x\n") as r:
+                assert r.status == 400
+
+    finally:
+        await server.stop()
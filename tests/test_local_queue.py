@@ -0,0 +1,165 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from config import CombinedConfig, IngestConfig
+from cot_formatter import CotFormatter
+from ingest import Ingestor
+from local_queue import LocalQueues
+from models import SignalMessage
+from redis_client import RedisClient
+from tak_client import TakClient
+from tak_worker import TakWorker
+from fixture import sample_geolocation
+
+TAK = RedisClient.TAK_QUEUE
+SIGNAL = RedisClient.SIGNAL_QUEUE
+
+
+@pytest.fixture
+def combined_config():
+    return CombinedConfig(queue_size=2, batch_size=10, block_timeout=0.01)
+
+
+@pytest.fixture
+def events(sample_geolocation):
+    formatter = CotFormatter()
+
+    return [formatter.create_event(sample_geolocation) for _ in range(3)]
+
+
+@pytest.fixture
+def spill():
+    return AsyncMock(spec=RedisClient)
+
+
+@pytest.mark.asyncio
+async def test_hands_over_in_order(combined_config, events):
+    queues = LocalQueues(combined_config)
+
+    await queues.enqueue_many(TAK, events[:2])
+
+    assert await queues.dequeue_many(TAK) == events[:2]
+    assert await queues.dequeue_many(TAK) == []
+
+
+@pytest.mark.asyncio
+async def test_dequeue_wakes_on_enqueue(combined_config, events):
+    queues = LocalQueues(combined_config)
+    consumer = asyncio.create_task(queues.dequeue_many(TAK, max_wait=1))
+
+    await asyncio.sleep(0)
+    await queues.enqueue_many(TAK, events[:1])
+
+    assert await consumer == events[:1]
+
+
+@pytest.mark.asyncio
+async def test_full_queue_blocks_producer(combined_config, events):
+    queues = LocalQueues(combined_config)
+    producer = asyncio.create_task(queues.enqueue_many(TAK, events))
+
+    await asyncio.sleep(0.01)
+    assert not producer.done()
+
+    assert await queues.dequeue_many(TAK) == events[:2]
+    await producer
+    assert await queues.dequeue_many(TAK) == events[2:]
+
+
+@pytest.mark.asyncio
+async def test_requeued_items_come_first(combined_config, events):
+    queues = LocalQueues(combined_config)
+
+    await queues.enqueue_many(TAK, events[:2])
+    (first,) = await queues.dequeue_many(TAK, 1)
+    await queues.nack(first)
+
+    assert await queues.dequeue_many(TAK) == events[:2]
+
+
+@pytest.mark.asyncio
+async def test_requeue_many_keeps_order(combined_config, events):
+    queues = LocalQueues(combined_config)
+
+    await queues.enqueue_many(TAK, events[:2])
+    taken = await queues.dequeue_many(TAK)
+    await queues.enqueue_many(TAK, events[2:])
+    await queues.requeue_many(taken)
+
+    assert await queues.dequeue_many(TAK, 3) == events
+
+
+@pytest.mark.asyncio
+async def test_schedule_retry(combined_config, sample_geolocation):
+    queues = LocalQueues(combined_config)
+    message = SignalMessage(geolocation=sample_geolocation)
+
+    await queues.schedule_retry(message, 0.01)
+
+    assert queues.qsize(SIGNAL) == 0
+    assert await queues.dequeue_many(SIGNAL, max_wait=1) == [message]
+
+
+@pytest.mark.asyncio
+async def test_spills_overflow_to_redis(combined_config, events, spill):
+    spill.dequeue_many.return_value = []
+    queues = LocalQueues(combined_config, spill)
+
+    await queues.dequeue_many(TAK, max_wait=0)
+    await queues.enqueue_many(TAK, events)
+
+    spill.enqueue_many.assert_awaited_once_with(TAK, events[2:])
+
+    spill.dequeue_many.return_value = events[2:]
+
+    assert await queues.dequeue_many(TAK) == events
+    spill.dequeue_many.assert_awaited_with(TAK, 8, 0, False)
+
+
+@pytest.mark.asyncio
+async def test_spill_keeps_order_until_drained(combined_config, events, spill):
+    spill.dequeue_many.return_value = events[2:]
+    queues = LocalQueues(combined_config, spill)
+
+    # Redis may still hold a backlog, so new items queue up behind it.
+    await queues.enqueue_many(TAK, events[:1])
+    assert await queues.dequeue_many(TAK, 1) == events[2:]
+    await queues.enqueue_many(TAK, events[:1])
+
+    assert spill.enqueue_many.await_count == 2
+
+    spill.dequeue_many.return_value = []
+    await queues.dequeue_many(TAK, 1, max_wait=0)
+    await queues.enqueue_many(TAK, events[:1])
+
+    assert spill.enqueue_many.await_count == 2
+    assert queues.qsize(TAK) == 1
+
+
+@pytest.mark.asyncio
+async def test_nack_with_spill(combined_config, events, spill):
+    queues = LocalQueues(combined_config, spill)
+
+    await queues.nack(events[0], requeue=False)
+
+    spill.nack.assert_awaited_once_with(events[0], False)
+
+
+@pytest.mark.asyncio
+async def test_ingest_to_tak_in_process(sample_geolocation):
+    queues = LocalQueues(CombinedConfig(block_timeout=0.01))
+    client = AsyncMock(spec=TakClient)
+    client.servers = ["a:1"]
+    client.submit_many.side_effect = lambda events: len(events)
+
+    ingestor = Ingestor(queues, IngestConfig(batch_size=1))
+    await ingestor.submit([sample_geolocation])
+
+    worker = TakWorker(queues, client)
+    (event,) = await queues.dequeue_many(TAK, trusted=True)
+
+    assert await worker.forward([event]) == 1
+    assert event.point is sample_geolocation
+    assert queues.qsize(SIGNAL) == 1
@@ -0,0 +1,105 @@
+import datetime
+import struct
+
+import pytest
+
+from cot_formatter import CotFormatter
+from exceptions import ConfigurationError, MessageValidationError
+from models import CotEvent, GeoLocation, SignalMessage
+from queue_codec import BinaryCodec, JsonCodec, create_codec
+from fixture import (
+    fixed_datetime,
+    sample_geolocation_fixed,
+    sample_signal_message_fixed,
+    sample_cot_event_fixed,
+)
+
+
+@pytest.fixture
+def binary_codec():
+    return BinaryCodec()
+
+
+def test_signal_message_round_trip(binary_codec, sample_signal_message_fixed):
+    message = sample_signal_message_fixed.model_copy(update={"retry_count": 2})
+
+    decoded = binary_codec.decode(SignalMessage, binary_codec.encode(message))
+
+    assert decoded == message
+
+
+def test_cot_event_round_trip(binary_codec, sample_cot_event_fixed):
+    decoded = binary_codec.decode(CotEvent, binary_codec.encode(sample_cot_event_fixed))
+
+    assert decoded == sample_cot_event_fixed
+
+
+def test_optional_fields_round_trip(binary_codec):
+    point = GeoLocation(
+        lat=-90.0,
+        lon=180.0,
+        hae=0.0,  # Zero must not be confused with a missing value
+        description="Tänk 🚀",
+        timestamp=datetime.datetime(2024, 1, 1, 12, 30, 0, 123456),  # Naive
+    )
+    event = CotFormatter().create_event(point)
+
+    decoded = binary_codec.decode(CotEvent, binary_codec.encode(event))
+
+    assert decoded == event
+    assert decoded.point.hae == 0.0
+    assert decoded.point.ce is None
+    assert decoded.point.timestamp.tzinfo is None
+
+
+def test_binary_is_smaller_than_json(sample_cot_event_fixed):
+    assert len(BinaryCodec().encode(sample_cot_event_fixed)) < len(
+        JsonCodec().encode(sample_cot_event_fixed)
+    )
+
+
+def test_binary_reads_json_payloads(sample_signal_message_fixed):
+    payload = JsonCodec().encode(sample_signal_message_fixed)
+
+    assert BinaryCodec().decode(SignalMessage, payload) == sample_signal_message_fixed
+
+
+def test_unsupported_version(sample_signal_message_fixed):
+    payload = bytearray(BinaryCodec().encode(sample_signal_message_fixed))
+    payload[1] = BinaryCodec.VERSION + 1
+
+    with pytest.raises(MessageValidationError):
+        BinaryCodec().decode(SignalMessage, bytes(payload))
+
+
+def test_model_tag_mismatch(sample_signal_message_fixed):
+    payload = BinaryCodec().encode(sample_signal_message_fixed)
+
+    with pytest.raises(MessageValidationError):
+        BinaryCodec().decode(CotEvent, payload)
+
+
+def test_truncated_payload(sample_cot_event_fixed):
+    payload = BinaryCodec().encode(sample_cot_event_fixed)
+
+    with pytest.raises(MessageValidationError):
+        BinaryCodec().decode(CotEvent, payload[:-4])
+
+
+def test_validation_rejects_bad_values(sample_signal_message_fixed):
+    payload = bytearray(BinaryCodec().encode(sample_signal_message_fixed))
+    # Overwrite the latitude, right after the geolocation flags byte.
+    offset = len(payload) - struct.calcsize("<B5dq") + 1
+    offset -= struct.calcsize("<H") + len("Test Location".encode())
+    payload[offset : offset + 8] = struct.pack("<d", 123.0)
+
+    with pytest.raises(ValueError):
+        BinaryCodec().decode(SignalMessage, bytes(payload))
+
+
+def test_create_codec():
+    assert isinstance(create_codec("json"), JsonCodec)
+    assert isinstance(create_codec("binary"), BinaryCodec)
+
+    with pytest.raises(ConfigurationError):
+        create_codec("msgpack")
@@ -0,0 +1,38 @@
+from unittest.mock import AsyncMock, call
+
+import pytest
+
+from models import SignalMessage
+from queue_worker import QUEUES, QueueWorker
+from redis_client import RedisClient
+from fixture import sample_geolocation, sample_cot_event
+
+
+@pytest.mark.asyncio
+async def test_run_serves_both_queues(sample_cot_event, sample_geolocation):
+    messages = [SignalMessage(geolocation=sample_geolocation) for _ in range(2)]
+    redis = AsyncMock()
+    tak = AsyncMock()
+    dispatcher = AsyncMock()
+    worker = QueueWorker(redis, tak, dispatcher)
+    batches = [
+        {RedisClient.TAK_QUEUE: [sample_cot_event]},
+        {RedisClient.SIGNAL_QUEUE: messages},
+        {},
+    ]
+
+    async def dequeue_any(queues, trusted):
+        if len(batches) == 1:
+            worker.stop()
+
+        return batches.pop(0)
+
+    redis.dequeue_any.side_effect = dequeue_any
+
+    await worker.run()
+
+    assert redis.dequeue_any.await_args == call(QUEUES, trusted=[RedisClient.TAK_QUEUE])
+    tak.forward.assert_awaited_once_with([sample_cot_event])
+    assert dispatcher.dispatch.await_args_list == [
+        call([message]) for message in messages
+    ]
@@ -0,0 +1,57 @@
+import re
+
+import pytest
+
+from cot_formatter import CotFormatter
+from queue_codec import BinaryCodec, JsonCodec
+from records import CotEventRecord, GeoLocationRecord, SignalMessageRecord
+from fixture import (
+    fixed_datetime,
+    sample_geolocation_fixed,
+    sample_signal_message_fixed,
+    sample_cot_event_fixed,
+)
+
+
+def test_signal_message_record_round_trip(sample_signal_message_fixed):
+    record = SignalMessageRecord.from_model(sample_signal_message_fixed)
+
+    assert record.content == sample_signal_message_fixed.content
+    assert record.to_model() == sample_signal_message_fixed
+
+
+def test_cot_event_record_round_trip(sample_cot_event_fixed):
+    record = CotEventRecord.from_model(sample_cot_event_fixed)
+
+    assert isinstance(record.point, GeoLocationRecord)
+    assert record.to_model() == sample_cot_event_fixed
+
+
+def test_records_have_no_instance_dict(sample_geolocation_fixed):
+    record = GeoLocationRecord.from_model(sample_geolocation_fixed)
+
+    assert not hasattr(record, "__dict__")
+
+
+@pytest.mark.parametrize("serializer", ["etree", "template"])
+def test_create_record_formats_like_create_event(serializer, sample_geolocation_fixed):
+    formatter = CotFormatter(serializer)
+    uid = re.compile(rb'uid="[^"]*"')
+
+    record = formatter.create_record(
+        GeoLocationRecord.from_model(sample_geolocation_fixed), "hostile"
+    )
+    event = formatter.create_event(sample_geolocation_fixed, "hostile")
+
+    assert record.to_model().model_copy(update={"event_id": event.event_id}) == event
+    assert uid.sub(b"", formatter.format_event(record)) == uid.sub(
+        b"", formatter.format_event(event)
+    )
+
+
+@pytest.mark.parametrize("codec", [JsonCodec(), BinaryCodec()])
+def test_decode_record(codec, sample_signal_message_fixed, sample_cot_event_fixed):
+    for model in (sample_signal_message_fixed, sample_cot_event_fixed):
+        record = codec.decode_record(type(model), codec.encode(model))
+
+        assert record.to_model() == model
@@ -0,0 +1,319 @@
+import asyncio
+import dataclasses
+
+import pytest
+import pytest_asyncio
+
+from cot_formatter import CotFormatter
+from exceptions import ConfigurationError, RedisError
+from models import SignalMessage
+from redis_client import RedisClient, RedisStreamClient, create_client
+from fixture import redis_config, sample_geolocation
+
+SIGNAL = RedisClient.SIGNAL_QUEUE
+# Kept apart from db 0, which the tests flush.
+TEST_DB = 15
+
+
+@pytest_asyncio.fixture
+async def connect(redis_config):
+    """Factory for clients on a flushed test database, skipping the test if
+    no Redis server is reachable."""
+    redis_config = dataclasses.replace(
+        redis_config, db=TEST_DB, block_timeout=0.1, visibility_timeout=0.1
+    )
+    admin = RedisClient(redis_config)
+    clients = [admin]
+
+    try:
+        await admin.connect()
+
+    except RedisError:
+        pytest.skip("Redis is not reachable")
+
+    await admin._redis.flushdb()
+
+    async def connect(**overrides) -> RedisClient:
+        cfg = dataclasses.replace(
+            redis_config, consumer_name=f"worker-{len(clients)}", **overrides
+        )
+        client = create_client(cfg)
+        await client.connect()
+        clients.append(client)
+
+        return client
+
+    yield connect
+
+    await admin._redis.flushdb()
+
+    for client in clients:
+        await client.disconnect()
+
+
+@pytest.fixture
+def messages(sample_geolocation):
+    return [SignalMessage(geolocation=sample_geolocation) for _ in range(3)]
+
+
+@pytest.mark.asyncio
+async def test_reliable_ack_empties_processing_list(connect, messages):
+    redis = await connect(reliable_queue=True)
+    processing = redis._processing_key(SIGNAL)
+
+    await redis.enqueue_many(SIGNAL, messages)
+    items = await redis.dequeue_many(SIGNAL, max_wait=0)
+
+    assert [item.message_id for item in items] == [m.message_id for m in messages]
+    assert await redis._redis.llen(SIGNAL) == 0
+    assert await redis._redis.llen(processing) == 3
+
+    await redis.ack(items[0])
+    await redis.ack_many(items[1:])
+
+    assert await redis._redis.llen(processing) == 0
+    assert not redis._in_flight
+
+
+@pytest.mark.asyncio
+async def test_reliable_dequeue_blocks_until_item_arrives(connect, messages):
+    redis = await connect(reliable_queue=True)
+    consumer = asyncio.create_task(redis.dequeue_many(SIGNAL, max_wait=1))
+
+    await asyncio.sleep(0.05)
+    await (await connect()).enqueue_many(SIGNAL, messages)
+
+    assert len(await consumer) == 3
+    assert await redis._redis.llen(redis._processing_key(SIGNAL)) == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("requeue", [True, False])
+async def test_nack(connect, messages, requeue):
+    redis = await connect(reliable_queue=True)
+
+    await redis.enqueue_many(SIGNAL, messages[:1])
+    (item,) = await redis.dequeue_many(SIGNAL, max_wait=0)
+    item.retry_count = 2
+
+    await redis.nack(item, requeue=requeue)
+
+    assert await redis._redis.llen(redis._processing_key(SIGNAL)) == 0
+    assert await redis._redis.llen(SIGNAL) == int(requeue)
+    assert await redis._redis.llen(RedisClient.DEAD_LETTER_QUEUE) == int(not requeue)
+
+    if requeue:
+        (item,) = await redis.dequeue_many(SIGNAL, max_wait=0)
+        # The current state goes back, not the payload first dequeued.
+        assert item.retry_count == 2
+
+
+@pytest.mark.asyncio
+async def test_reaper_requeues_expired_item_once(connect, messages):
+    worker = await connect(reliable_queue=True)
+    reapers = [await connect(reliable_queue=True) for _ in range(2)]
+
+    await worker.enqueue_many(SIGNAL, messages[:1])
+    await worker.dequeue_many(SIGNAL, max_wait=0)
+
+    # The first pass only notes the item, it expires a visibility timeout later.
+    assert [await reaper.reap_expired(SIGNAL) for reaper in reapers] == [0, 0]
+
+    await asyncio.sleep(0.15)
+
+    requeued = await asyncio.gather(
+        *(reaper.reap_expired(SIGNAL) for reaper in reapers)
+    )
+
+    assert sum(requeued) == 1
+    assert await worker._redis.llen(worker._processing_key(SIGNAL)) == 0
+    assert await worker._redis.llen(SIGNAL) == 1
+    assert [await reaper.reap_expired(SIGNAL) for reaper in reapers] == [0, 0]
+
+
+def test_create_client_selects_backend(redis_config):
+    assert type(create_client(redis_config)) is RedisClient
+
+    redis_config.backend = "stream"
+    assert type(create_client(redis_config)) is RedisStreamClient
+
+    redis_config.backend = "kafka"
+    with pytest.raises(ConfigurationError):
+        create_client(redis_config)
+
+
+async def pending(redis: RedisStreamClient) -> int:
+    info = await redis._redis.xpending(
+        redis._stream_key(SIGNAL), redis._config.consumer_group
+    )
+
+    return info["pending"]
+
+
+@pytest.mark.asyncio
+async def test_stream_consumers_split_entries(connect, messages):
+    first, second = [await connect(backend="stream") for _ in range(2)]
+
+    await first.enqueue_many(SIGNAL, messages)
+
+    taken = await first.dequeue_many(SIGNAL, 2, max_wait=0)
+    rest = await second.dequeue_many(SIGNAL, max_wait=0)
+
+    assert [item.message_id for item in taken + rest] == [
+        message.message_id for message in messages
+    ]
+    assert await pending(first) == 3
+
+    await first.ack_many(taken)
+    await second.ack_many(rest)
+
+    assert await pending(first) == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_reaper_recovers_pending_entries(connect, messages):
+    crashed, survivor = [await connect(backend="stream") for _ in range(2)]
+
+    await crashed.enqueue_many(SIGNAL, messages[:2])
+    await crashed.dequeue_many(SIGNAL, max_wait=0)
+
+    assert await survivor.reap_expired(SIGNAL) == 0
+
+    await asyncio.sleep(0.15)
+
+    assert await survivor.reap_expired(SIGNAL) == 2
+    assert await survivor.reap_expired(SIGNAL) == 0
+
+    items = await survivor.dequeue_many(SIGNAL, max_wait=0)
+
+    assert [item.message_id for item in items] == [
+        message.message_id for message in messages[:2]
+    ]
+    assert await pending(survivor) == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_reconnect_keeps_consumer_group(connect, messages):
+    redis = await connect(backend="stream")
+
+    await redis.enqueue_many(SIGNAL, messages)
+    await redis.disconnect()
+    # The group exists now, so XGROUP CREATE answers BUSYGROUP.
+    await redis.connect()
+
+    groups = await redis._redis.xinfo_groups(redis._stream_key(SIGNAL))
+
+    assert len(groups) == 1
+    assert len(await redis.dequeue_many(SIGNAL, max_wait=0)) == 3
+
+
+@pytest.mark.asyncio
+async def test_stream_promotes_due_retries(connect, messages):
+    redis = await connect(backend="stream")
+
+    await redis.schedule_retry(messages[0], 0)
+    await redis.schedule_retry(messages[1], 60)
+
+    assert await redis.promote_due(SIGNAL) == 1
+    assert await redis._redis.zcard(redis._delayed_key(SIGNAL)) == 1
+
+    (item,) = await redis.dequeue_many(SIGNAL, max_wait=0)
+
+    assert item.message_id == messages[0].message_id
+
+
+@pytest.mark.asyncio
+async def test_promote_due_moves_only_due_retries(connect, messages):
+    redis = await connect(reliable_queue=True)
+
+    await redis.enqueue_many(SIGNAL, messages[:2])
+    due, later = await redis.dequeue_many(SIGNAL, max_wait=0)
+
+    await redis.schedule_retry(due, 0)
+    await redis.schedule_retry(later, 60)
+
+    # Parking a retry releases the in-flight item straight away.
+    assert await redis._redis.llen(redis._processing_key(SIGNAL)) == 0
+    assert await redis.promote_due(SIGNAL) == 1
+    assert await redis.promote_due(SIGNAL) == 0
+    assert await redis._redis.zcard(redis._delayed_key(SIGNAL)) == 1
+
+    (item,) = await redis.dequeue_many(SIGNAL, max_wait=0)
+
+    assert item.message_id == due.message_id
+
+
+@pytest.mark.asyncio
+async def test_stream_sub_millisecond_wait_does_not_block_forever(connect):
+    redis = await connect(backend="stream")
+
+    assert await asyncio.wait_for(redis.dequeue_many(SIGNAL, max_wait=0.0004), 1) == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("reliable", [False, True])
+async def test_dequeue_any_rotates_queues(connect, messages, reliable):
+    redis = await connect(reliable_queue=reliable)
+    queues = [SIGNAL, RedisClient.TAK_QUEUE]
+    events = [
+        CotFormatter().create_event(message.geolocation) for message in messages[:2]
+    ]
+
+    await redis.enqueue_many(SIGNAL, messages[:2])
+    await redis.enqueue_many(RedisClient.TAK_QUEUE, events)
+
+    served = [await redis.dequeue_any(queues, 1, max_wait=0) for _ in range(4)]
+
+    assert [queue for batch in served for queue in batch] == queues * 2
+    assert await redis.dequeue_any(queues, max_wait=0) == {}
+
+    if reliable:
+        for queue in queues:
+            assert await redis._redis.llen(redis._processing_key(queue)) == 2
+
+        await redis.ack_many([item for batch in served for (item,) in batch.values()])
+
+        for queue in queues:
+            assert await redis._redis.llen(redis._processing_key(queue)) == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["list", "stream"])
+@pytest.mark.parametrize("reliable", [False, True])
+async def test_dequeue_any_wakes_on_second_queue(connect, messages, backend, reliable):
+    redis = await connect(backend=backend, reliable_queue=reliable)
+    loop = asyncio.get_running_loop()
+    queues = [RedisClient.TAK_QUEUE, SIGNAL]
+    consumer = asyncio.create_task(redis.dequeue_any(queues, max_wait=2))
+
+    await asyncio.sleep(0.05)
+    started = loop.time()
+    await (await connect(backend=backend)).enqueue_many(SIGNAL, messages)
+
+    batches = await consumer
+
+    received = [item.message_id for item in batches[SIGNAL]]
+
+    assert list(batches) == [SIGNAL]
+    # A stream wakes the reader on the first XADD of the pipeline.
+    assert received and received == [m.message_id for m in messages][: len(received)]
+    assert loop.time() - started < 0.5
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("reliable", [False, True])
+async def test_requeue_many_puts_items_back_in_front(connect, messages, reliable):
+    redis = await connect(reliable_queue=reliable)
+
+    await redis.enqueue_many(SIGNAL, messages[:2])
+    taken = await redis.dequeue_many(SIGNAL, max_wait=0)
+    await redis.enqueue_many(SIGNAL, messages[2:])
+
+    await redis.requeue_many(taken)
+
+    items = await redis.dequeue_many(SIGNAL, max_wait=0)
+
+    assert [item.message_id for item in items] == [m.message_id for m in messages]
+
+    if reliable:
+        assert await redis._redis.llen(redis._processing_key(SIGNAL)) == 3
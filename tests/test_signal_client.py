@@ -0,0 +1,262 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, call
+
+import pytest
+
+from models import SignalMessage
+from signal_client import SignalClient, SignalCoalescer, SignalDispatcher
+from fixture import signal_config, sample_geolocation
+
+
+def respond(status: int) -> MagicMock:
+    """Mock session.post returning a response with the given status."""
+    response = MagicMock(status=status)
+    post = MagicMock()
+    post.return_value.__aenter__.return_value = response
+
+    return post
+
+
+@pytest.fixture
+def messages(sample_geolocation):
+    return [SignalMessage(geolocation=sample_geolocation) for _ in range(3)]
+
+
+@pytest.fixture
+def signal_client(signal_config):
+    client = SignalClient(signal_config)
+    client._session = MagicMock()
+    client._session.post = respond(200)
+
+    return client
+
+
+@pytest.mark.asyncio
+async def test_try_send_many_joins_reports(signal_client, signal_config, messages):
+    assert await signal_client.try_send_many(messages)
+
+    body = signal_client._session.post.call_args.kwargs["json"]
+    assert body["message"] == "\n".join(message.content for message in messages)
+    assert body["recipients"] == signal_config.recipients
+    assert [message.status for message in messages] == ["sent"] * 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [None, asyncio.TimeoutError])
+async def test_try_send_many_counts_failures(signal_client, messages, error):
+    signal_client._session.post = respond(500)
+    signal_client._session.post.side_effect = error
+
+    assert not await signal_client.try_send_many(messages)
+    assert [message.retry_count for message in messages] == [1] * 3
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_acks_batch_at_once(signal_client, messages):
+    redis = AsyncMock()
+    dispatcher = SignalDispatcher(signal_client, redis, 2, 3)
+
+    await dispatcher.dispatch(messages)
+    await dispatcher.drain()
+
+    redis.ack_many.assert_awaited_once_with(messages)
+    redis.ack.assert_not_awaited()
+
+
+def failing_client() -> AsyncMock:
+    """Mock SignalClient whose sends all fail, like try_send_many does."""
+
+    async def try_send_many(messages, recipients=None):
+        for message in messages:
+            message.retry_count += 1
+
+        return False
+
+    client = AsyncMock()
+    client.try_send_many.side_effect = try_send_many
+
+    return client
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_schedules_retry_with_backoff(messages):
+    redis = AsyncMock()
+    messages[1].retry_count = 1
+    dispatcher = SignalDispatcher(failing_client(), redis, 2, 3)
+
+    await dispatcher.dispatch(messages[:2])
+    await dispatcher.drain()
+
+    assert redis.schedule_retry.await_args_list == [
+        call(messages[0], 2),
+        call(messages[1], 4),
+    ]
+    redis.nack.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_dead_letters_after_max_attempts(messages):
+    redis = AsyncMock()
+    dispatcher = SignalDispatcher(failing_client(), redis, 2, 3)
+
+    for _ in range(3):
+        await dispatcher.dispatch(messages[:1])
+        await dispatcher.drain()
+
+    assert [args[0][1] for args in redis.schedule_retry.await_args_list] == [2, 4]
+    redis.nack.assert_awaited_once_with(messages[0], requeue=False)
+    assert messages[0].status == "failed"
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_bounds_sends_in_flight(messages):
+    in_flight = peak = 0
+    release = asyncio.Event()
+
+    async def try_send_many(messages, recipients=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+
+        await release.wait()
+        in_flight -= 1
+
+        return True
+
+    client = AsyncMock()
+    client.try_send_many.side_effect = try_send_many
+    dispatcher = SignalDispatcher(client, AsyncMock(), 2, 3)
+
+    async def dispatch_each():
+        for message in messages:
+            await dispatcher.dispatch([message])
+
+    dispatching = asyncio.create_task(dispatch_each())
+    await asyncio.sleep(0.01)
+
+    # The third dispatch waits for a free slot.
+    assert (in_flight, dispatching.done()) == (2, False)
+
+    release.set()
+    await dispatching
+    await dispatcher.drain()
+
+    assert peak == 2
+    assert client.try_send_many.await_count == 3
+
+
+class QueueStub:
+    """Just enough of RedisClient.dequeue_many for the coalescer."""
+
+    block_timeout = 1.0
+
+    def __init__(self):
+        self.items = []
+        self.arrived = asyncio.Event()
+
+    def push(self, *items):
+        self.items += items
+        self.arrived.set()
+
+    async def dequeue_many(self, queue, max_items=None, max_wait=None):
+        max_wait = self.block_timeout if max_wait is None else max_wait
+
+        if not self.items and max_wait > 0:
+            self.arrived.clear()
+
+            try:
+                # Like Redis, which rounds such waits down to 0: forever.
+                await asyncio.wait_for(
+                    self.arrived.wait(), max_wait if max_wait >= 0.001 else None
+                )
+
+            except asyncio.TimeoutError:
+                pass
+
+        batch, self.items = self.items[:max_items], self.items[max_items:]
+
+        return batch
+
+
+def coalescer_for(signal_config, window_ms=50, max_reports=10, max_chars=2000):
+    signal_config.coalesce_window_ms = window_ms
+    signal_config.coalesce_max_reports = max_reports
+    signal_config.coalesce_max_chars = max_chars
+    queue = QueueStub()
+
+    return SignalCoalescer(queue, signal_config), queue
+
+
+@pytest.mark.asyncio
+async def test_coalescer_collects_reports_within_window(signal_config, messages):
+    coalescer, queue = coalescer_for(signal_config)
+    loop = asyncio.get_running_loop()
+
+    queue.push(messages[0])
+    loop.call_later(0.01, queue.push, messages[1])
+    loop.call_later(0.2, queue.push, messages[2])
+
+    started = loop.time()
+
+    assert await coalescer.next_batch() == messages[:2]
+    assert 0.05 <= loop.time() - started < 0.15
+    assert await coalescer.next_batch() == messages[2:]
+
+
+@pytest.mark.asyncio
+async def test_coalescer_closes_batch_at_report_cap(signal_config, messages):
+    coalescer, queue = coalescer_for(signal_config, window_ms=10_000, max_reports=2)
+
+    queue.push(*messages)
+
+    assert await asyncio.wait_for(coalescer.next_batch(), 1) == messages[:2]
+
+
+@pytest.mark.asyncio
+async def test_coalescer_carries_over_past_char_cap(signal_config, messages):
+    two_lines = 2 * len(messages[0].content) + 1
+    coalescer, queue = coalescer_for(signal_config, window_ms=200, max_chars=two_lines)
+    queue.push(*messages)
+
+    assert await coalescer.next_batch() == messages[:2]
+    assert coalescer._pending == messages[2:]
+
+    # The window of the carried-over report has already passed.
+    assert await asyncio.wait_for(coalescer.next_batch(), 0.1) == messages[2:]
+    assert not coalescer._pending
+
+
+@pytest.mark.asyncio
+async def test_coalescer_skips_sub_millisecond_waits(signal_config, messages):
+    coalescer, _ = coalescer_for(signal_config)
+    coalescer._pending = messages[:1]
+    coalescer._deadline = asyncio.get_running_loop().time() + 0.0005
+
+    assert await asyncio.wait_for(coalescer.next_batch(), 1) == messages[:1]
+
+
+@pytest.mark.asyncio
+async def test_coalesced_batch_posted_as_lines(signal_client, signal_config, messages):
+    coalescer, queue = coalescer_for(signal_config, window_ms=10)
+    queue.push(*messages)
+
+    assert await signal_client.try_send_many(await coalescer.next_batch())
+
+    path = signal_client._session.post.call_args.args[0]
+    body = signal_client._session.post.call_args.kwargs["json"]
+
+    assert path == "/v2/send"
+    assert body["message"].split("\n") == [message.content for message in messages]
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_logged_periodically(signal_client, caplog):
+    signal_client.pool_stats.hits, signal_client.pool_stats.misses = 3, 1
+    stats_logger = asyncio.create_task(signal_client.run_pool_stats_logger(0.01))
+
+    with caplog.at_level("INFO"):
+        await asyncio.sleep(0.05)
+
+    stats_logger.cancel()
+
+    assert "pool hits: 3, misses: 1, hit ratio: 0.75" in caplog.text
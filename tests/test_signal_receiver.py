@@ -0,0 +1,182 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+import pytest_asyncio
+
+from config import ThrottleConfig
+from exceptions import MessageValidationError
+from redis_client import RedisClient
+from signal_receiver import SignalReceiver, parse_location
+from throttle import PositionThrottle
+from fixture import signal_config
+from signal_stub import SignalApiStub
+
+
+@pytest_asyncio.fixture
+async def api(signal_config):
+    stub = SignalApiStub(signal_config.phone_number)
+    await stub.start()
+    signal_config.api_url = stub.url
+    signal_config.receive_backoff_max = 0.01
+
+    yield stub
+
+    await stub.stop()
+
+
+@pytest.fixture
+def redis():
+    return AsyncMock(spec=RedisClient)
+
+
+async def received(redis, count: int) -> list:
+    for _ in range(200):
+        events = [e for c in redis.enqueue_many.await_args_list for e in c.args[1]]
+
+        if len(events) >= count:
+            return events
+
+        await asyncio.sleep(0.01)
+
+    raise AssertionError(f"expected {count} events, got {len(events)}")
+
+
+@pytest.mark.parametrize(
+    "text, lat, lon",
+    [
+        (
+            "Eiffel Tower\n\nhttps://maps.google.com/maps?q=48.8583%2C2.2945",
+            48.8583,
+            2.2945,
+        ),
+        ("https://www.google.com/maps/@-33.8568,151.2153,17z", -33.8568, 151.2153),
+        ("geo:40.7128,-74.0060?z=12", 40.7128, -74.006),
+        ("https://www.openstreetmap.org/?mlat=51.5&mlon=-0.12#map=15", 51.5, -0.12),
+        ("https://maps.apple.com/?ll=35.68,139.69&q=Tokyo", 35.68, 139.69),
+        ("2.3522 48.8566 Paris", 48.8566, 2.3522),
+    ],
+)
+def test_parse_location(text, lat, lon):
+    point = parse_location(text, "+100")
+
+    assert (point.lat, point.lon) == (lat, lon)
+
+
+def test_parse_location_description():
+    assert (
+        parse_location("Home https://maps.google.com/maps?q=1,2").description == "Home"
+    )
+    assert parse_location("geo:1,2", "Alice").description == "Alice"
+    assert parse_location("1 2", "Alice").description == "Alice"
+
+
+def test_parse_location_ignores_chat():
+    assert parse_location("see you at 5") is None
+    assert parse_location("https://example.com/page?q=word") is None
+
+
+def test_parse_location_rejects_out_of_range():
+    with pytest.raises(MessageValidationError):
+        parse_location("geo:95.0,10.0")
+
+
+@pytest.mark.asyncio
+async def test_receives_locations(api, signal_config, redis):
+    receiver = SignalReceiver(signal_config, redis)
+    task = asyncio.create_task(receiver.run())
+
+    api.push("hello")
+    api.push("geo:40.7128,-74.0060", timestamp=1_700_000_000_000)
+
+    try:
+        (event,) = await received(redis, 1)
+
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    redis.enqueue_many.assert_awaited_with(RedisClient.TAK_QUEUE, [event])
+    assert (event.point.lat, event.point.description) == (40.7128, "Tester")
+    assert event.point.timestamp.timestamp() == 1_700_000_000
+    assert receiver.stats.ignored == 1
+
+
+@pytest.mark.asyncio
+async def test_reconnects(api, signal_config, redis):
+    receiver = SignalReceiver(signal_config, redis)
+    task = asyncio.create_task(receiver.run())
+
+    try:
+        api.push("1 2 first")
+        await received(redis, 1)
+
+        await api.drop_connections()
+        api.push("3 4 second")
+        await received(redis, 2)
+
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    assert api.connections == 2
+
+
+@pytest.mark.asyncio
+async def test_allowed_senders(api, signal_config, redis):
+    signal_config.receive_allowed_senders = ["+100"]
+    receiver = SignalReceiver(signal_config, redis)
+    task = asyncio.create_task(receiver.run())
+
+    try:
+        api.push("1 2 stranger", source="+999")
+        api.push("3 4 friend", source="+100")
+        (event,) = await received(redis, 1)
+
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    assert event.point.description == "friend"
+
+
+@pytest.mark.asyncio
+async def test_skips_malformed_frames(api, signal_config, redis):
+    receiver = SignalReceiver(signal_config, redis)
+    task = asyncio.create_task(receiver.run())
+
+    try:
+        api.push_frame([1, 2])
+        api.push_frame({"envelope": {"dataMessage": {"message": 5}}})
+        api.push("1 2 late", timestamp="yesterday")
+        api.push("1 2 far", timestamp=10**20)
+        api.push("3 4 fine")
+        (event,) = await received(redis, 1)
+
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    assert event.point.description == "fine"
+    assert api.connections == 1
+
+
+@pytest.mark.asyncio
+async def test_throttles_reports(api, signal_config, redis):
+    positions = PositionThrottle(ThrottleConfig(enabled=True, min_interval=0.05))
+    receiver = SignalReceiver(signal_config, redis, positions)
+    task = asyncio.create_task(receiver.run())
+
+    try:
+        api.push("1 2 Tank")
+        api.push("1 2 Tank")
+        api.push("1 3 Tank")
+        # The moved report is held back until min_interval has passed.
+        first, moved = await received(redis, 2)
+
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    assert [first.point.lat, moved.point.lat] == [2, 3]
+    assert positions.stats.dropped == 1
@@ -0,0 +1,97 @@
+import asyncio
+import os
+import signal
+import time
+
+import pytest
+
+from config import SupervisorConfig
+from supervisor import Supervisor
+
+
+async def drain_on_sigterm():
+    stopping = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopping.set)
+
+    with open(os.path.join(os.environ["NAMES_DIR"], str(os.getpid())), "w") as f:
+        f.write(os.environ["REDIS_CONSUMER_NAME"])
+
+    await stopping.wait()
+
+
+async def crash():
+    raise RuntimeError("boom")
+
+
+async def hang():
+    # Blocks the event loop, so the heartbeat stops.
+    time.sleep(60)
+
+
+@pytest.fixture
+def supervisor_config():
+    return SupervisorConfig(
+        processes=2,
+        heartbeat_interval=0.02,
+        heartbeat_timeout=0.5,
+        drain_timeout=5,
+        restart_backoff_max=0,
+    )
+
+
+def supervise(supervisor: Supervisor, until, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+
+    while not until():
+        assert time.monotonic() < deadline, supervisor.stats
+
+        time.sleep(0.02)
+        supervisor.check()
+
+
+def test_drains_on_stop(supervisor_config, tmp_path, monkeypatch):
+    monkeypatch.setenv("NAMES_DIR", str(tmp_path))
+    monkeypatch.setenv("REDIS_CONSUMER_NAME", "host")
+    supervisor = Supervisor(supervisor_config, drain_on_sigterm)
+    supervisor.start()
+
+    try:
+        supervise(supervisor, lambda: len(list(tmp_path.iterdir())) == 2)
+
+    finally:
+        supervisor.stop()
+
+    assert [p.exitcode for p in supervisor.processes] == [0, 0]
+    assert sorted(p.read_text() for p in tmp_path.iterdir()) == ["host-0", "host-1"]
+    assert supervisor.stats.restarts == 0
+
+
+def test_restarts_crashed_worker(supervisor_config):
+    supervisor_config.processes = 1
+    supervisor = Supervisor(supervisor_config, crash)
+    supervisor.start()
+
+    try:
+        supervise(supervisor, lambda: supervisor.stats.restarts >= 2)
+
+    finally:
+        supervisor.stop()
+
+    assert supervisor.stats.started >= 3
+    assert supervisor.stats.unhealthy == 0
+
+
+def test_kills_unresponsive_worker(supervisor_config):
+    supervisor_config.processes = 1
+    supervisor = Supervisor(supervisor_config, hang)
+    supervisor.start()
+    pid = supervisor.processes[0].pid
+
+    try:
+        supervise(supervisor, lambda: supervisor.stats.restarts >= 1)
+
+    finally:
+        supervisor.stop()
+
+    assert supervisor.stats.unhealthy >= 1
+    assert supervisor.processes[0].pid != pid
@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+
+from cot_formatter import CotFormatter
+from exceptions import TakBackpressureError
+from records import CotEventRecord
+from tak_buffer import SpillFile, WriteBuffer
+from fixture import sample_geolocation
+
+
+@pytest.fixture
+def events(sample_geolocation):
+    formatter = CotFormatter()
+
+    return [formatter.create_record(sample_geolocation) for _ in range(5)]
+
+
+def drain(buffer):
+    sent = []
+
+    while (event := buffer.get_nowait()) is not None:
+        sent.append(event.event_id)
+
+    return sent
+
+
+@pytest.mark.asyncio
+async def test_fifo_in_memory(events):
+    buffer = WriteBuffer(max_events=10)
+
+    for event in events:
+        await buffer.put(event, timeout=0)
+
+    assert len(buffer) == 5
+    assert drain(buffer) == [event.event_id for event in events]
+
+
+@pytest.mark.asyncio
+async def test_full_buffer_reports_backpressure(events):
+    buffer = WriteBuffer(max_events=2)
+    await buffer.put(events[0], timeout=0)
+    await buffer.put(events[1], timeout=0)
+
+    with pytest.raises(TakBackpressureError):
+        await buffer.put(events[2], timeout=0.01)
+
+    assert len(buffer) == 2
+
+
+@pytest.mark.asyncio
+async def test_put_waits_for_room(events):
+    buffer = WriteBuffer(max_events=1)
+    await buffer.put(events[0], timeout=0)
+
+    put = asyncio.create_task(buffer.put(events[1], timeout=1))
+    await asyncio.sleep(0)
+    buffer.get_nowait()
+    await put
+
+    assert buffer.get_nowait().event_id == events[1].event_id
+
+
+@pytest.mark.asyncio
+async def test_spill_keeps_order(events, tmp_path):
+    path = tmp_path / "tak.spill"
+    buffer = WriteBuffer(max_events=2, spill_path=str(path))
+
+    for event in events:
+        await buffer.put(event, timeout=0)
+
+    assert len(buffer) == 5
+    assert path.stat().st_size > 0
+
+    buffer.get_nowait()
+    # Room in memory does not let new events jump the spilled ones.
+    await buffer.put(events[0], timeout=0)
+
+    assert drain(buffer) == [event.event_id for event in events[1:] + events[:1]]
+    assert path.stat().st_size == 0
+
+
+@pytest.mark.asyncio
+async def test_spill_size_limit(events, tmp_path):
+    buffer = WriteBuffer(max_events=1, spill_path=str(tmp_path / "tak.spill"))
+    buffer._spill._max_bytes = 1
+
+    await buffer.put(events[0], timeout=0)
+
+    with pytest.raises(TakBackpressureError):
+        await buffer.put(events[1], timeout=0)
+
+
+@pytest.mark.asyncio
+async def test_close_persists_unsent_events(events, tmp_path):
+    path = str(tmp_path / "tak.spill")
+    buffer = WriteBuffer(max_events=2, spill_path=path)
+
+    for event in events:
+        await buffer.put(event, timeout=0)
+
+    buffer.get_nowait()
+    buffer.close()
+
+    recovered = WriteBuffer(max_events=2, spill_path=path)
+
+    assert len(recovered) == 4
+    assert isinstance(recovered.get_nowait(), CotEventRecord)
+    assert drain(recovered) == [event.event_id for event in events[2:]]
+
+
+@pytest.mark.asyncio
+async def test_requeue_goes_to_head(events):
+    buffer = WriteBuffer(max_events=3)
+
+    for event in events[:3]:
+        await buffer.put(event, timeout=0)
+
+    taken = [buffer.get_nowait(), buffer.get_nowait()]
+    buffer.requeue(taken)
+
+    assert drain(buffer) == [event.event_id for event in events[:3]]
+
+
+def test_torn_tail_is_cut(events, tmp_path):
+    path = tmp_path / "tak.spill"
+    spill = SpillFile(str(path), max_bytes=1024)
+    spill.append(events[0])
+    spill.append(events[1])
+    spill.close()
+
+    path.write_bytes(path.read_bytes()[:-3])
+    spill = SpillFile(str(path), max_bytes=1024)
+
+    assert len(spill) == 1
+    assert spill.pop().event_id == events[0].event_id
@@ -6,7 +6,7 @@ import pytest
 import pytest_asyncio
 
 from tak_client import TakClient
-from exceptions import TakClientError
+from exceptions import ConfigurationError, TakBackpressureError, TakClientError
 from fixture import tak_config, sample_geolocation, mock_stream
 
 
@@ -59,3 +59,302 @@ async def test_send_point_success(tak_client, mock_stream, sample_geolocation):
 
         writer.write.assert_called_once()
         writer.drain.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_send_points_single_write(tak_client, mock_stream, sample_geolocation):
+    reader, writer = mock_stream
+
+    with patch("asyncio.open_connection", return_value=(reader, writer)):
+        await tak_client.connect()
+        await tak_client.send_points([sample_geolocation] * 3)
+
+    writer.write.assert_called_once()
+    writer.drain.assert_called_once()
+    assert writer.write.call_args[0][0].count(b"<?xml") == 3
+
+
+PROTOCOL_SUPPORT = (
+    b'<event version="2.0" uid="protouid" type="t-x-takp-v" how="m-g">'
+    b'<detail><TakControl><TakProtocolSupport version="1"/></TakControl>'
+    b"</detail></event>"
+)
+PROTOCOL_ACCEPTED = (
+    b'<event version="2.0" uid="protouid" type="t-x-takp-r" how="m-g">'
+    b'<detail><TakControl><TakResponse status="true"/></TakControl>'
+    b"</detail></event>"
+)
+
+
+@pytest.mark.asyncio
+async def test_send_point_protobuf(tak_config, mock_stream, sample_geolocation):
+    reader, writer = mock_stream
+    tak_config.protocol = "protobuf"
+    client = TakClient(tak_config)
+
+    with patch("asyncio.open_connection", return_value=(reader, writer)):
+        await client.connect()
+        await client.send_point(sample_geolocation)
+
+    assert client.protocol == "protobuf"
+    assert writer.write.call_args[0][0][0] == 0xBF
+    reader.readuntil.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_negotiate_protobuf(tak_config, mock_stream, sample_geolocation):
+    reader, writer = mock_stream
+    reader.readuntil.side_effect = [PROTOCOL_SUPPORT, PROTOCOL_ACCEPTED]
+    tak_config.protocol = "negotiate"
+    client = TakClient(tak_config)
+
+    with patch("asyncio.open_connection", return_value=(reader, writer)):
+        await client.connect()
+        await client.send_point(sample_geolocation)
+
+    request, event = [c[0][0] for c in writer.write.call_args_list]
+    assert b"t-x-takp-q" in request
+    assert client.protocol == "protobuf"
+    assert event[0] == 0xBF
+
+
+@pytest.mark.asyncio
+async def test_negotiate_falls_back_to_xml(tak_config, mock_stream, sample_geolocation):
+    reader, writer = mock_stream
+    reader.readuntil.side_effect = asyncio.TimeoutError()
+    tak_config.protocol = "negotiate"
+    client = TakClient(tak_config)
+
+    with patch("asyncio.open_connection", return_value=(reader, writer)):
+        await client.connect()
+        await client.send_point(sample_geolocation)
+
+    assert client.protocol == "xml"
+    assert writer.write.call_args[0][0].startswith(b"<?xml")
+
+
+@pytest.mark.asyncio
+async def test_negotiate_rejected(tak_config, mock_stream):
+    reader, writer = mock_stream
+    reader.readuntil.side_effect = [
+        PROTOCOL_SUPPORT,
+        PROTOCOL_ACCEPTED.replace(b'"true"', b'"false"'),
+    ]
+    tak_config.protocol = "negotiate"
+    client = TakClient(tak_config)
+
+    with patch("asyncio.open_connection", return_value=(reader, writer)):
+        await client.connect()
+
+    assert client.protocol == "xml"
+
+
+def test_unknown_protocol(tak_config):
+    tak_config.protocol = "carrier-pigeon"
+
+    with pytest.raises(ConfigurationError):
+        TakClient(tak_config)
+
+
+def supervised_config(tak_config):
+    tak_config.reconnect_backoff_base = 0.001
+    tak_config.backpressure_timeout = 0.01
+
+    return tak_config
+
+
+async def idle(n):
+    await asyncio.sleep(3600)
+
+
+@pytest.mark.asyncio
+async def test_supervised_reconnects_and_flushes(
+    tak_config, mock_stream, sample_geolocation
+):
+    reader, writer = mock_stream
+    reader.read.side_effect = idle
+    client = TakClient(supervised_config(tak_config))
+    event = client._formatter.create_record(sample_geolocation)
+
+    with patch(
+        "asyncio.open_connection",
+        side_effect=[ConnectionError("refused"), (reader, writer)],
+    ) as open_connection:
+        await client.start()
+        await client.submit(event)
+        await client.stop(timeout=1)
+
+    assert open_connection.call_count == 2
+    assert event.event_id.encode() in writer.write.call_args[0][0]
+    assert client.buffered == 0
+
+
+@pytest.mark.asyncio
+async def test_supervised_resends_unsent_bytes_after_drop(
+    tak_config, mock_stream, sample_geolocation
+):
+    reader, writer = mock_stream
+    written = asyncio.Event()
+    writer.write.side_effect = lambda data: written.set()
+    # The first write never leaves the transport buffer before the drop.
+    writer.transport.get_write_buffer_size.return_value = 1
+    drops = [b""]
+
+    async def read(n):
+        if drops:
+            await written.wait()
+            writer.transport.get_write_buffer_size.return_value = 0
+
+            return drops.pop()
+
+        await idle(n)
+
+    reader.read.side_effect = read
+    client = TakClient(supervised_config(tak_config))
+
+    with patch("asyncio.open_connection", return_value=(reader, writer)) as conn:
+        await client.start()
+        await client.submit(client._formatter.create_record(sample_geolocation))
+        await client.stop(timeout=1)
+
+    first, second = [c[0][0] for c in writer.write.call_args_list]
+    assert first == second
+    assert conn.call_count == 2
+    assert client.buffered == 0
+
+
+@pytest.mark.asyncio
+async def test_supervised_coalesces_writes(tak_config, mock_stream, sample_geolocation):
+    reader, writer = mock_stream
+    reader.read.side_effect = idle
+    client = TakClient(supervised_config(tak_config))
+    events = [client._formatter.create_record(sample_geolocation) for _ in range(3)]
+
+    with patch("asyncio.open_connection", return_value=(reader, writer)):
+        await client.start()
+
+        for event in events:
+            await client.submit(event)
+
+        await client.stop(timeout=1)
+
+    writer.write.assert_called_once()
+    assert all(e.event_id.encode() in writer.write.call_args[0][0] for e in events)
+    writer.drain.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_supervised_flush_interval(tak_config, mock_stream, sample_geolocation):
+    reader, writer = mock_stream
+    reader.read.side_effect = idle
+    tak_config.flush_interval_ms = 200
+    client = TakClient(supervised_config(tak_config))
+
+    with patch("asyncio.open_connection", return_value=(reader, writer)):
+        await client.start()
+        await client.submit(client._formatter.create_record(sample_geolocation))
+        await asyncio.sleep(0.02)
+        await client.submit(client._formatter.create_record(sample_geolocation))
+        await client.stop(timeout=1)
+
+    writer.write.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_supervised_drains_past_high_water(
+    tak_config, mock_stream, sample_geolocation
+):
+    reader, writer = mock_stream
+    reader.read.side_effect = idle
+    sizes = iter([100])
+    writer.transport.get_write_buffer_size.side_effect = lambda: next(sizes, 0)
+    tak_config.write_high_water = 10
+    client = TakClient(supervised_config(tak_config))
+
+    with patch("asyncio.open_connection", return_value=(reader, writer)):
+        await client.start()
+        await client.submit(client._formatter.create_record(sample_geolocation))
+        await client.stop(timeout=1)
+
+    writer.transport.set_write_buffer_limits.assert_called_once_with(high=10)
+    writer.drain.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_supervised_reconnects_on_server_close(
+    tak_config, mock_stream, sample_geolocation
+):
+    reader, writer = mock_stream
+    closes = [b""]
+
+    async def read(n):
+        if closes:
+            return closes.pop()
+
+        await idle(n)
+
+    reader.read.side_effect = read
+    client = TakClient(supervised_config(tak_config))
+
+    with patch("asyncio.open_connection", return_value=(reader, writer)) as conn:
+        await client.start()
+
+        while conn.call_count < 2:
+            await asyncio.sleep(0.001)
+
+        await client.submit(client._formatter.create_record(sample_geolocation))
+        await client.stop(timeout=1)
+
+    writer.write.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_submit_reports_backpressure(tak_config, sample_geolocation):
+    tak_config.buffer_max_events = 1
+    client = TakClient(supervised_config(tak_config))
+    event = client._formatter.create_record(sample_geolocation)
+
+    with patch("asyncio.open_connection", side_effect=ConnectionError("refused")):
+        await client.start()
+        await client.submit(event)
+
+        with pytest.raises(TakBackpressureError):
+            await client.submit(event)
+
+        await client.stop(timeout=0)
+
+    assert client.buffered == 1
+
+
+@pytest.mark.asyncio
+async def test_submit_requires_start(tak_client, sample_geolocation):
+    with pytest.raises(TakClientError):
+        await tak_client.submit(tak_client._formatter.create_record(sample_geolocation))
+
+
+@pytest.mark.asyncio
+async def test_supervised_backs_off_when_server_closes(tak_config):
+    connections = 0
+
+    async def accept_and_close(reader, writer):
+        nonlocal connections
+        connections += 1
+        writer.close()
+
+    server = await asyncio.start_server(accept_and_close, "127.0.0.1", 0)
+    tak_config.server_url = "127.0.0.1"
+    tak_config.port = server.sockets[0].getsockname()[1]
+    tak_config.reconnect_backoff_base = 0.05
+    client = TakClient(tak_config)
+
+    await client.start()
+    await asyncio.sleep(0.5)
+    await client.stop(timeout=0)
+    server.close()
+    await server.wait_closed()
+
+    # Delays of up to 0.1, 0.2 and 0.4s leave room for a handful of
+    # connections, not the thousands of a tight reconnect loop.
+    assert 2 <= connections <= 6
+    # The last connection may still be open when the client stops.
+    assert client.stats.connection_drops >= connections - 1
@@ -0,0 +1,144 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from exceptions import ConfigurationError, TakBackpressureError
+from tak_fanout import SharedEncoder, TakFanOut
+from fixture import tak_config, sample_geolocation, make_mock_stream
+
+
+async def idle(n):
+    await asyncio.sleep(3600)
+
+
+@pytest.fixture
+def fanout_config(tak_config):
+    tak_config.extra_servers = ["backup.example.com:8087", "coalition.example.com:8089"]
+    tak_config.reconnect_backoff_base = 0.001
+    tak_config.backpressure_timeout = 0.01
+
+    return tak_config
+
+
+def test_servers_from_config(fanout_config):
+    fanout = TakFanOut(fanout_config)
+
+    assert fanout.servers == [
+        "tak-server.example.com:8087",
+        "backup.example.com:8087",
+        "coalition.example.com:8089",
+    ]
+
+
+def test_servers_named_without_scheme(tak_config):
+    tak_config.server_url = "tcp://tak-server.example.com"
+    tak_config.extra_servers = ["ssl://backup.example.com:8089"]
+    tak_config.buffer_spill_path = "/tmp/tak-spill"
+
+    with patch("tak_tls.create_context"):
+        fanout = TakFanOut(tak_config)
+
+    assert fanout.servers == [
+        "tak-server.example.com:8087",
+        "backup.example.com:8089",
+    ]
+    assert (
+        fanout._clients["backup.example.com:8089"]._cfg.buffer_spill_path
+        == "/tmp/tak-spill.backup.example.com-8089"
+    )
+
+
+def test_invalid_extra_server(tak_config):
+    tak_config.extra_servers = ["backup.example.com"]
+
+    with pytest.raises(ConfigurationError):
+        TakFanOut(tak_config)
+
+
+def test_shared_encoder_encodes_once(tak_config, sample_geolocation):
+    encoder = SharedEncoder("template", max_events=2)
+    event = encoder._formatter.create_record(sample_geolocation)
+
+    with patch.object(
+        encoder._formatter, "format_event", wraps=encoder._formatter.format_event
+    ) as format_event:
+        first = encoder(event, False)
+        second = encoder(event, False)
+
+    assert first is second
+    format_event.assert_called_once()
+    assert encoder(event, True)[0] == 0xBF
+
+
+@pytest.mark.asyncio
+async def test_fanout_writes_shared_bytes(fanout_config, sample_geolocation):
+    streams = {}
+
+    async def open_connection(host, port, **kwargs):
+        reader, writer = make_mock_stream()
+        reader.read.side_effect = idle
+        streams[host] = writer
+
+        return reader, writer
+
+    fanout = TakFanOut(fanout_config)
+    event = fanout._encoder._formatter.create_record(sample_geolocation)
+
+    with patch("asyncio.open_connection", side_effect=open_connection):
+        await fanout.start()
+        await fanout.submit(event)
+        await fanout.stop(timeout=1)
+
+    payloads = [writer.write.call_args[0][0] for writer in streams.values()]
+    assert len(payloads) == 3
+    assert all(payload is payloads[0] for payload in payloads)
+    assert all(lag.sent == 1 for lag in fanout.lag().values())
+
+
+@pytest.mark.asyncio
+async def test_slow_server_does_not_stall_others(fanout_config, sample_geolocation):
+    fanout_config.buffer_max_events = 1
+
+    async def open_connection(host, port, **kwargs):
+        if host == "coalition.example.com":
+            raise ConnectionError("unreachable")
+
+        reader, writer = make_mock_stream()
+        reader.read.side_effect = idle
+
+        return reader, writer
+
+    fanout = TakFanOut(fanout_config)
+    events = [fanout._encoder._formatter.create_record(sample_geolocation)] * 3
+
+    with patch("asyncio.open_connection", side_effect=open_connection):
+        await fanout.start()
+
+        for event in events:
+            await fanout.submit(event)
+            await asyncio.sleep(0.01)
+
+        lag = fanout.lag()
+        await fanout.stop(timeout=0.1)
+
+    assert lag["backup.example.com:8087"].sent == 3
+    assert lag["coalition.example.com:8089"].buffered == 1
+    assert lag["coalition.example.com:8089"].dropped == 2
+    assert lag["coalition.example.com:8089"].lag_seconds > 0
+
+
+@pytest.mark.asyncio
+async def test_backpressure_when_all_servers_full(fanout_config, sample_geolocation):
+    fanout_config.buffer_max_events = 1
+    fanout = TakFanOut(fanout_config)
+    event = fanout._encoder._formatter.create_record(sample_geolocation)
+
+    with patch("asyncio.open_connection", side_effect=ConnectionError("down")):
+        await fanout.start()
+        await fanout.submit(event)
+
+        with pytest.raises(TakBackpressureError):
+            await fanout.submit(event)
+
+        await fanout.stop(timeout=0)
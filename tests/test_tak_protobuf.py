@@ -0,0 +1,131 @@
+import datetime
+import struct
+
+import pytest
+
+from tak_protobuf import (
+    TakProtobufFormatter,
+    parse_protocol_response,
+    parse_protocol_support,
+)
+from fixture import fixed_datetime, sample_geolocation_fixed, sample_cot_event_fixed
+
+
+def read_varint(data, offset):
+    value = shift = 0
+
+    while True:
+        byte = data[offset]
+        value |= (byte & 0x7F) << shift
+        offset += 1
+        shift += 7
+
+        if byte < 0x80:
+            return value, offset
+
+
+def read_fields(data):
+    """Minimal protobuf reader: {field number: value} for the wire types used"""
+    fields = {}
+    offset = 0
+
+    while offset < len(data):
+        key, offset = read_varint(data, offset)
+        number, wire_type = key >> 3, key & 0x7
+
+        if wire_type == 0:
+            fields[number], offset = read_varint(data, offset)
+        elif wire_type == 1:
+            (fields[number],) = struct.unpack_from("<d", data, offset)
+            offset += 8
+        else:
+            length, offset = read_varint(data, offset)
+            fields[number] = data[offset : offset + length]
+            offset += length
+
+    return fields
+
+
+@pytest.fixture
+def formatter():
+    return TakProtobufFormatter()
+
+
+def test_format_event_stream_framing(formatter, sample_cot_event_fixed):
+    framed = formatter.format_event(sample_cot_event_fixed)
+
+    assert framed[0] == 0xBF
+    length, offset = read_varint(framed, 1)
+    assert len(framed) - offset == length
+    assert framed[offset:] == formatter.encode_message(sample_cot_event_fixed)
+
+
+def test_encode_message_fields(formatter, sample_cot_event_fixed, fixed_datetime):
+    message = read_fields(formatter.encode_message(sample_cot_event_fixed))
+    event = read_fields(message[2])
+    millis = int(fixed_datetime.timestamp() * 1000)
+
+    assert event[1] == b"a-f-G-U-C"
+    assert event[5] == b"test-event-id"
+    assert event[6] == event[7] == millis
+    assert event[8] == millis + 5 * 60 * 1000
+    assert event[9] == b"m-g"
+    assert (event[10], event[11], event[12], event[13], event[14]) == (
+        40.7128,
+        -74.0060,
+        100.0,
+        45.0,
+        45.0,
+    )
+    assert read_fields(event[15])[1] == (
+        b'<_flow-tags_ signal-bot-v1="2024-01-01T00:00:00.000000Z" />'
+    )
+
+
+def test_encode_message_missing_values(formatter, sample_cot_event_fixed):
+    point = sample_cot_event_fixed.point.model_copy(
+        update={"hae": None, "ce": None, "le": None}
+    )
+    event = sample_cot_event_fixed.model_copy(update={"point": point})
+
+    fields = read_fields(read_fields(formatter.encode_message(event))[2])
+
+    assert fields[12] == fields[13] == fields[14] == 9999999.0
+
+
+def test_protobuf_is_smaller_than_xml(formatter, sample_cot_event_fixed):
+    xml = super(TakProtobufFormatter, formatter).format_event(sample_cot_event_fixed)
+
+    assert len(formatter.format_event(sample_cot_event_fixed)) < len(xml) / 2
+
+
+def test_frame_mesh(formatter):
+    assert formatter.frame_mesh(b"\x12\x00") == b"\xbf\x01\xbf\x12\x00"
+
+
+def test_format_protocol_request(formatter):
+    request = formatter.format_protocol_request()
+
+    assert b'type="t-x-takp-q"' in request
+    assert b'<TakRequest version="1" />' in request
+
+
+def test_parse_protocol_support():
+    event = (
+        b'<event version="2.0" uid="protouid" type="t-x-takp-v" how="m-g">'
+        b'<detail><TakControl><TakProtocolSupport version="1"/></TakControl>'
+        b"</detail></event>"
+    )
+
+    assert parse_protocol_support(event) == [1]
+    assert parse_protocol_support(event.replace(b"takp-v", b"takp-r")) == []
+
+
+@pytest.mark.parametrize("status,accepted", [("true", True), ("false", False)])
+def test_parse_protocol_response(status, accepted):
+    event = (
+        f'<event version="2.0" type="t-x-takp-r"><detail><TakControl>'
+        f'<TakResponse status="{status}"/></TakControl></detail></event>'
+    ).encode()
+
+    assert parse_protocol_response(event) is accepted
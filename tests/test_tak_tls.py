@@ -0,0 +1,100 @@
+import asyncio
+import shutil
+import ssl
+import subprocess
+
+import pytest
+
+import tak_tls
+from exceptions import ConfigurationError
+from tak_client import TakClient
+from fixture import tak_config, sample_geolocation
+
+
+def test_split_url():
+    assert tak_tls.split_url("ssl://tak.example.com") == ("ssl", "tak.example.com")
+    assert tak_tls.split_url("tcp://tak.example.com") == ("tcp", "tak.example.com")
+    assert tak_tls.split_url("tak.example.com") == ("tcp", "tak.example.com")
+
+
+def test_unknown_scheme(tak_config):
+    tak_config.server_url = "udp://tak.example.com"
+
+    with pytest.raises(ConfigurationError):
+        TakClient(tak_config)
+
+
+def test_missing_certificate(tak_config, tmp_path):
+    tak_config.server_url = "ssl://tak.example.com"
+    tak_config.tls_cert_file = str(tmp_path / "missing.pem")
+
+    with pytest.raises(ConfigurationError):
+        TakClient(tak_config)
+
+
+@pytest.fixture
+def certificate(tmp_path):
+    if not shutil.which("openssl"):
+        pytest.skip("openssl is not installed")
+
+    cert, key = tmp_path / "cert.pem", tmp_path / "key.pem"
+    subprocess.run(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=localhost",
+            "-addext",
+            "subjectAltName=DNS:localhost",
+            "-keyout",
+            str(key),
+            "-out",
+            str(cert),
+        ],
+        check=True,
+        capture_output=True,
+    )
+
+    return str(cert), str(key)
+
+
+@pytest.mark.asyncio
+async def test_tls_session_resumed(tak_config, certificate, sample_geolocation):
+    cert, key = certificate
+    received = []
+
+    async def handle(reader, writer):
+        received.append(await reader.read(65536))
+        writer.close()
+
+    server_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    server_context.load_cert_chain(cert, key)
+    server_context.load_verify_locations(cert)
+    server_context.verify_mode = ssl.CERT_REQUIRED
+    server = await asyncio.start_server(handle, "127.0.0.1", 0, ssl=server_context)
+
+    tak_config.server_url = "ssl://localhost"
+    tak_config.port = server.sockets[0].getsockname()[1]
+    tak_config.tls_ca_file = cert
+    tak_config.tls_cert_file = cert
+    tak_config.tls_key_file = key
+    client = TakClient(tak_config)
+    reused = []
+
+    for _ in range(2):
+        await client.connect()
+        await client.send_point(sample_geolocation)
+        reused.append(client._writer.get_extra_info("ssl_object").session_reused)
+        await client.disconnect()
+
+    server.close()
+    await server.wait_closed()
+
+    assert reused == [False, True]
+    assert all(data.startswith(b"<?xml") for data in received)
@@ -0,0 +1,102 @@
+import asyncio
+import socket
+
+import pytest
+
+from exceptions import ConfigurationError
+from tak_client import TakClient, create_client
+from tak_udp import TakUdpClient, TokenBucket
+from fixture import tak_config, sample_geolocation
+
+
+@pytest.fixture
+def receiver():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(1)
+    yield sock
+    sock.close()
+
+
+@pytest.fixture
+def udp_config(tak_config, receiver):
+    tak_config.server_url = "udp://127.0.0.1"
+    tak_config.port = receiver.getsockname()[1]
+
+    return tak_config
+
+
+def test_create_client(udp_config):
+    assert isinstance(create_client(udp_config), TakUdpClient)
+
+    udp_config.server_url = "tcp://127.0.0.1"
+    assert isinstance(create_client(udp_config), TakClient)
+
+
+def test_negotiate_not_supported(udp_config):
+    udp_config.protocol = "negotiate"
+
+    with pytest.raises(ConfigurationError):
+        TakUdpClient(udp_config)
+
+
+@pytest.mark.asyncio
+async def test_one_event_per_datagram(udp_config, receiver, sample_geolocation):
+    async with TakUdpClient(udp_config) as client:
+        await client.send_points([sample_geolocation] * 2)
+
+    datagrams = [receiver.recv(65536) for _ in range(2)]
+
+    assert all(d.startswith(b"<?xml") and d.count(b"<event") == 1 for d in datagrams)
+    assert client.stats.datagrams == 2
+
+
+@pytest.mark.asyncio
+async def test_packs_events_within_mtu(udp_config, receiver, sample_geolocation):
+    udp_config.udp_pack_events = True
+    udp_config.udp_mtu = 1000
+
+    async with TakUdpClient(udp_config) as client:
+        await client.send_points([sample_geolocation] * 5)
+
+    datagrams = []
+
+    while sum(d.count(b"<event") for d in datagrams) < 5:
+        datagrams.append(receiver.recv(65536))
+
+    assert len(datagrams) == client.stats.datagrams < 5
+    assert all(len(d) <= 1000 - 28 for d in datagrams)
+
+
+@pytest.mark.asyncio
+async def test_skips_oversized_events(udp_config, receiver, sample_geolocation):
+    udp_config.udp_mtu = 200
+
+    async with TakUdpClient(udp_config) as client:
+        await client.send_point(sample_geolocation)
+
+    assert client.stats.oversized == 1
+    assert client.stats.datagrams == 0
+
+
+@pytest.mark.asyncio
+async def test_protobuf_mesh_datagram(udp_config, receiver, sample_geolocation):
+    udp_config.protocol = "protobuf"
+
+    async with TakUdpClient(udp_config) as client:
+        await client.send_point(sample_geolocation)
+
+    assert receiver.recv(65536)[:3] == b"\xbf\x01\xbf"
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_paces_sends():
+    bucket = TokenBucket(rate=10_000, burst=1000)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    for _ in range(3):
+        await bucket.acquire(1000)
+
+    # The burst covers the first send, the other two wait 0.1s each.
+    assert loop.time() - started >= 0.19
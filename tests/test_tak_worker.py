@@ -0,0 +1,139 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from config import GeofenceConfig
+from cot_formatter import CotFormatter
+from geofence import Area, GeofenceRouter
+from redis_client import RedisClient
+from tak_client import TakClient
+from tak_fanout import TakFanOut
+from tak_udp import TakUdpClient
+from tak_worker import TakWorker, create_output
+from fixture import tak_config, sample_geolocation
+
+
+@pytest.fixture
+def router(sample_geolocation):
+    lat, lon = sample_geolocation.lat, sample_geolocation.lon
+    area = Area("here", tak_servers=["b:2"], center=(lat, lon), radius=100.0)
+
+    return GeofenceRouter([area], GeofenceConfig())
+
+
+@pytest.fixture
+def events(sample_geolocation):
+    formatter = CotFormatter()
+
+    return [formatter.create_record(sample_geolocation) for _ in range(3)]
+
+
+@pytest.fixture
+def redis():
+    return AsyncMock(spec=RedisClient)
+
+
+@pytest.mark.asyncio
+async def test_forward_acks_batch(redis, events):
+    client = AsyncMock(spec=TakClient)
+    client.submit_many.return_value = 3
+
+    assert await TakWorker(redis, client).forward(events) == 3
+
+    client.submit_many.assert_awaited_once_with(events)
+    redis.ack_many.assert_awaited_once_with(events)
+    redis.requeue_many.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_stop_settles_batch_in_hand(redis, events):
+    client = AsyncMock(spec=TakClient)
+    client.submit_many.return_value = 3
+    worker = TakWorker(redis, client)
+
+    def dequeue(*args, **kwargs):
+        worker.stop()
+
+        return events
+
+    redis.dequeue_many.side_effect = dequeue
+
+    await worker.run()
+
+    redis.dequeue_many.assert_awaited_once()
+    redis.ack_many.assert_awaited_once_with(events)
+
+
+@pytest.mark.asyncio
+async def test_forward_requeues_refused(redis, events):
+    client = AsyncMock(spec=TakClient)
+    client.submit_many.return_value = 1
+
+    await TakWorker(redis, client).forward(events)
+
+    redis.ack_many.assert_awaited_once_with(events[:1])
+    redis.requeue_many.assert_awaited_once_with(events[1:])
+    redis.nack.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_forward_routes_to_subscribed_servers(redis, events, router):
+    client = AsyncMock(spec=TakFanOut)
+    client.servers = ["a:1", "b:2"]
+    client.submit_many.return_value = 3
+
+    assert await TakWorker(redis, client, router).forward(events) == 3
+
+    client.submit_many.assert_awaited_once_with(events, [{"b:2"}] * 3)
+
+
+@pytest.mark.asyncio
+async def test_forward_routes_to_schemed_server(redis, events, router, tak_config):
+    tak_config.server_url = "tcp://b"
+    tak_config.port = 2
+    client = TakClient(tak_config)
+
+    with patch.object(client, "submit_many", return_value=3) as submit_many:
+        assert await TakWorker(redis, client, router).forward(events) == 3
+
+    submit_many.assert_awaited_once_with(events)
+
+
+@pytest.mark.asyncio
+async def test_forward_acks_unsubscribed(redis, events, router, sample_geolocation):
+    client = AsyncMock(spec=TakClient)
+    client.servers = ["b:2"]
+    far = sample_geolocation.model_copy(update={"lat": sample_geolocation.lat + 1})
+    events.insert(1, CotFormatter().create_record(far))
+    client.submit_many.return_value = 1
+
+    # The first routed event is accepted, so the unrouted one after it is done.
+    assert await TakWorker(redis, client, router).forward(events) == 2
+
+    client.submit_many.assert_awaited_once_with([events[0]] + events[2:])
+    redis.ack_many.assert_awaited_once_with(events[:2])
+
+
+@pytest.mark.asyncio
+async def test_submit_many_stops_at_backpressure(tak_config, events):
+    tak_config.buffer_max_events = 2
+    tak_config.backpressure_timeout = 0.01
+    client = TakClient(tak_config)
+
+    with patch("asyncio.open_connection", side_effect=ConnectionError("down")):
+        await client.start()
+        accepted = await client.submit_many(events)
+        await client.stop(timeout=0)
+
+    assert accepted == 2
+
+
+def test_create_output(tak_config):
+    assert isinstance(create_output(tak_config), TakClient)
+
+    tak_config.extra_servers = ["backup.example.com:8087"]
+    assert isinstance(create_output(tak_config), TakFanOut)
+
+    tak_config.extra_servers = []
+    tak_config.server_url = "udp://239.2.3.1"
+    assert isinstance(create_output(tak_config), TakUdpClient)
@@ -0,0 +1,164 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from config import ThrottleConfig
+from exceptions import RedisError
+from models import GeoLocation
+from redis_client import RedisClient
+from throttle import DEFER, DROP, SEND, PositionThrottle, distance
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def throttle_config():
+    return ThrottleConfig(
+        enabled=True, min_distance=5.0, min_interval=1.0, max_interval=30.0
+    )
+
+
+def point(north_m: float = 0.0, description="Tank") -> GeoLocation:
+    return GeoLocation(
+        lat=40.7128 + north_m / 111_195, lon=-74.0060, description=description
+    )
+
+
+def test_distance():
+    assert distance(40.0, -74.0, 40.0, -74.0) == 0.0
+    assert distance(0.0, 0.0, 1.0, 0.0) == pytest.approx(111_195, rel=1e-3)
+
+
+@pytest.mark.asyncio
+async def test_drops_small_movement(throttle_config, clock):
+    positions = PositionThrottle(throttle_config, clock=clock)
+
+    assert len(await positions.filter([point()])) == 1
+
+    clock.now = 10.0
+
+    assert await positions.filter([point(1.0)]) == []
+    assert positions.stats.dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_sends_movement_after_interval(throttle_config, clock):
+    positions = PositionThrottle(throttle_config, clock=clock)
+    await positions.filter([point()])
+
+    clock.now = 2.0
+    moved = point(10.0)
+
+    assert await positions.filter([moved]) == [moved]
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_after_max_interval(throttle_config, clock):
+    positions = PositionThrottle(throttle_config, clock=clock)
+    await positions.filter([point()])
+
+    clock.now = 30.0
+    still = point()
+
+    assert await positions.filter([still]) == [still]
+
+
+@pytest.mark.asyncio
+async def test_merges_early_updates(throttle_config, clock):
+    positions = PositionThrottle(throttle_config, clock=clock)
+    await positions.filter([point()])
+
+    clock.now = 0.3
+    assert await positions.filter([point(10.0)]) == []
+
+    clock.now = 0.6
+    latest = point(20.0)
+    assert await positions.filter([latest]) == []
+    assert await positions.pop_due() == []
+
+    clock.now = 1.0
+    assert await positions.pop_due() == [latest]
+    assert await positions.pop_due() == []
+    assert positions.stats.merged == 1
+
+
+@pytest.mark.asyncio
+async def test_tracks_are_keyed_by_description(throttle_config, clock):
+    positions = PositionThrottle(throttle_config, clock=clock)
+    points = [point(), point(description="Car"), point(), point(description=None)]
+
+    assert await positions.filter(points) == [points[0], points[1], points[3]]
+
+
+@pytest.mark.asyncio
+async def test_lru_and_ttl_eviction(throttle_config, clock):
+    throttle_config.cache_size = 2
+    throttle_config.ttl = 60.0
+    positions = PositionThrottle(throttle_config, clock=clock)
+
+    await positions.filter([point(description=name) for name in "abc"])
+
+    assert len(positions) == 2
+    assert await positions.filter([point(description="a")]) != []
+
+    clock.now = 60.0
+    await positions.filter([])
+
+    assert len(positions) == 0
+    assert positions.stats.evicted == 4
+
+
+@pytest.mark.asyncio
+async def test_shared_state_rejects(throttle_config, clock):
+    throttle_config.shared = True
+    redis = AsyncMock(spec=RedisClient)
+    redis.update_tracks.return_value = [SEND, DROP, DEFER]
+    positions = PositionThrottle(throttle_config, redis, clock=clock)
+    points = [point(description=name) for name in "abc"]
+
+    assert await positions.filter(points) == [points[0]]
+
+    clock.now = 1.0
+    assert await positions.pop_due() == [points[2]]
+    redis.update_tracks.assert_awaited_with(
+        throttle_config, [("c", points[2].lat, points[2].lon)], force=True
+    )
+
+
+@pytest.mark.asyncio
+async def test_shared_state_unavailable_passes(throttle_config, clock):
+    throttle_config.shared = True
+    redis = AsyncMock(spec=RedisClient)
+    redis.update_tracks.side_effect = RedisError("down")
+    positions = PositionThrottle(throttle_config, redis, clock=clock)
+
+    assert len(await positions.filter([point()])) == 1
+
+
+@pytest.mark.asyncio
+async def test_shared_rejection_keeps_local_track(throttle_config, clock):
+    throttle_config.shared = True
+    redis = AsyncMock(spec=RedisClient)
+    redis.update_tracks.side_effect = [[SEND], [DROP], [SEND]]
+    positions = PositionThrottle(throttle_config, redis, clock=clock)
+    await positions.filter([point()])
+
+    clock.now = 2.0
+    assert await positions.filter([point(10.0)]) == []
+
+    # Measured from the position last sent, not from the rejected one.
+    clock.now = 3.0
+    moved = point(12.0)
+
+    assert await positions.filter([moved]) == [moved]